@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt
 from helper_functions import getDataTypeFromDate, createOutputDict, getAverageValuesForEveryStation, import_dictionaries
+from station_registry import get_station_registry
 
 def calculateAverageTemperatureByRegion(date, district_map):
     """
@@ -18,19 +19,19 @@ def calculateAverageTemperatureByRegion(date, district_map):
         return {}
 
     output_dict = getAverageValuesForEveryStation(temperature_data, createOutputDict("temperature_stations.json", temperature_data))
-    locations = [data[0] for data in output_dict.values()]
-    temperature_values = [data[1] for data in output_dict.values()]
 
     # Prepare a dictionary to store total temperature and count by region
     region_totals = {region: [0, 0] for region in district_map.keys()}  # [total_temperature, station_count]
 
-    # Aggregate temperature values by region
-    for zone, district_locations in district_map.items():
-        for location in district_locations:
-            if location in locations:
-                temperature_index = locations.index(location)
-                region_totals[zone][0] += temperature_values[temperature_index]
-                region_totals[zone][1] += 1
+    # Aggregate temperature values by region, each location counted once
+    registry = get_station_registry(district_map)
+    seen_locations = set()
+    for location, value in output_dict.values():
+        zone = registry.region_for_name(location)
+        if zone in region_totals and location not in seen_locations:
+            seen_locations.add(location)
+            region_totals[zone][0] += value
+            region_totals[zone][1] += 1
 
     # Calculate average temperature for each region
     region_averages = {
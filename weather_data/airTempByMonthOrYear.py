@@ -1,7 +1,5 @@
-import json
-import os
 import matplotlib.pyplot as plt
-from helper_functions import getDataTypeFromDate, createOutputDict, getAverageValuesForEveryStation
+from helper_functions import getDataTypeFromDate, createOutputDict, getAverageValuesForEveryStation, load_daily_cache, append_daily_cache
 from calendar import monthrange
 
 def store_daily_temperature(year, month, output_file):
@@ -20,11 +18,7 @@ def store_daily_temperature(year, month, output_file):
     num_days = monthrange(year, month)[1]  # Get the number of days in the month
 
     # Load existing data if the file exists
-    if os.path.exists(output_file):
-        with open(output_file, 'r') as file:
-            all_data = json.load(file)
-    else:
-        all_data = {}
+    all_data = load_daily_cache(output_file)
 
     monthly_temperature = {}
     for day in range(1, num_days + 1):
@@ -53,9 +47,8 @@ def store_daily_temperature(year, month, output_file):
             # Store the result in the overall data
             all_data[date] = average_temperature
 
-            # Save the updated data to the JSON file
-            with open(output_file, 'w') as file:
-                json.dump(all_data, file, indent=4)
+            # Append the new day to the JSON file's log
+            append_daily_cache(output_file, date, average_temperature)
 
     return monthly_temperature
 
@@ -1,7 +1,6 @@
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
-from helper_functions import getDataTypeFromDate, getDataFromStorage, createOutputDict, getAverageValuesForEveryStation
-import json
+from helper_functions import getDataTypeFromDate, getDataFromStorage, append_daily_cache, createOutputDict, getAverageValuesForEveryStation
 
 def fetch_weekly_temperature(start_date, storage_json_path):
     """
@@ -33,9 +32,8 @@ def fetch_weekly_temperature(start_date, storage_json_path):
             average_temperature = total_temperature / num_stations if num_stations > 0 else 0
         
             storage_data[date] = average_temperature
-            # Save the updated data to the JSON file
-            with open(storage_json_path, 'w') as file:
-                json.dump(storage_data, file, indent=4)
+            # Append the new day to the JSON file's log
+            append_daily_cache(storage_json_path, date, average_temperature)
 
         weekly_temperature[date] = average_temperature
 
@@ -0,0 +1,301 @@
+import glob
+import importlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+# Headless before anything imports pyplot, in this process and in every worker
+import matplotlib
+
+matplotlib.use("Agg")
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from helper_functions import DATA_DIR
+
+# Charts are written to reports/<run date>/ by default; override with WEATHERSG_REPORT_DIR
+REPORT_DIR = os.environ.get("WEATHERSG_REPORT_DIR", os.path.join(DATA_DIR, "reports"))
+MANIFEST_FILE = "manifest.json"
+DEFAULT_FORMATS = ("png",)
+DEFAULT_DPI = 100
+
+# Subplot parameters a reused figure is reset to before each chart
+_SUBPLOT_PARAMS = ("left", "right", "bottom", "top", "wspace", "hspace")
+
+
+# ----------------------------
+# Chart renderers
+# ----------------------------
+# A renderer draws one chart onto a cleared Figure: renderer(fig, **kwargs).
+# Jobs name them by key in RENDERERS, or as "module:function" for any other renderer.
+
+
+def weekly_chart(fig, title, reading_unit, weather_data):
+    from helper_functions import plot_weekly_weather
+
+    plot_weekly_weather(title, reading_unit, next(iter(weather_data)), weather_data, ax=fig.add_subplot())
+
+
+def hourly_chart(fig, title, measurement, date, hourly_data):
+    from helper_functions import convert_to_datetime, plot_weather_hourly
+
+    plot_weather_hourly(title, measurement, date, convert_to_datetime(hourly_data), ax=fig.add_subplot())
+
+
+def _station_totals_by_name(cache_file, start=None, end=None):
+    from helper_functions import load_daily_cache
+    from station_registry import get_station_registry
+
+    registry = get_station_registry()
+    totals = {}
+    for date, daily_dict in load_daily_cache(cache_file).items():
+        if (start and date < start) or (end and date > end):
+            continue
+        for station_id, value in daily_dict.items():
+            name = registry.name(station_id)
+            totals[name] = totals.get(name, 0.0) + value
+    return totals
+
+
+def rainfall_by_zone_chart(fig, cache_file, title, start=None, end=None):
+    from helper_functions import import_dictionaries
+    from rainfallByLocationYearly import plotRainfallByZone
+
+    district_map, zone_color_map = import_dictionaries()
+    plotRainfallByZone(_station_totals_by_name(cache_file, start, end), district_map, zone_color_map, title,
+                       ax=fig.add_subplot())
+
+
+def rainfall_by_region_chart(fig, cache_file, title, start=None, end=None):
+    from helper_functions import import_dictionaries
+    from rainfallByLocationYearly import plotRainfallByRegion
+
+    district_map, zone_color_map = import_dictionaries()
+    plotRainfallByRegion(_station_totals_by_name(cache_file, start, end), district_map, zone_color_map, title,
+                         ax=fig.add_subplot())
+
+
+def region_windspeed_chart(fig, region_values, date, statistic="average"):
+    from windspeedByRegion import plotAverageWindSpeed, plotTotalWindSpeed, zone_color_map
+
+    if statistic == "average":
+        plotAverageWindSpeed(region_values, date, ax=fig.add_subplot())
+    else:
+        plotTotalWindSpeed(region_values, zone_color_map, date, ax=fig.add_subplot())
+
+
+RENDERERS = {
+    "weekly": weekly_chart,
+    "hourly": hourly_chart,
+    "rainfall_by_zone": rainfall_by_zone_chart,
+    "rainfall_by_region": rainfall_by_region_chart,
+    "region_windspeed": region_windspeed_chart,
+}
+
+
+def chart_job(name, chart, figsize=(10, 6), **kwargs):
+    """
+    Describe one chart to render.
+
+    Args:
+        name (str): Output file name without extension, unique within a run.
+        chart (str): Key of RENDERERS, or "module:function".
+        figsize (tuple): Figure size in inches; figures of the same size are reused.
+        **kwargs: Passed to the renderer. Must be picklable (they cross to a worker process).
+    """
+    return {"name": name, "chart": chart, "figsize": tuple(figsize), "kwargs": kwargs}
+
+
+# ----------------------------
+# Worker side
+# ----------------------------
+
+_figures = {}
+
+
+def _get_figure(figsize):
+    """A cleared figure of this size, reused across the charts a worker renders."""
+    fig = _figures.get(figsize)
+    if fig is None:
+        fig = _figures[figsize] = Figure(figsize=figsize, dpi=DEFAULT_DPI)
+        FigureCanvasAgg(fig)
+    else:
+        fig.clear()
+    fig.subplotpars.update(**{param: matplotlib.rcParams[f"figure.subplot.{param}"] for param in _SUBPLOT_PARAMS})
+    return fig
+
+
+def _resolve(chart):
+    if chart in RENDERERS:
+        return RENDERERS[chart]
+    module_name, _, function_name = chart.partition(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def render_chart(job, output_dir, formats=DEFAULT_FORMATS):
+    """
+    Render one job onto a pooled figure and save it in each format.
+
+    Returns:
+        dict: Manifest entry with the files written, timings and any error.
+    """
+    entry = {"name": job["name"], "chart": job["chart"], "files": [], "worker": os.getpid()}
+    started = time.perf_counter()
+    try:
+        fig = _get_figure(job["figsize"])
+        _resolve(job["chart"])(fig, **job["kwargs"])
+        fig.canvas.draw()
+        rendered = time.perf_counter()
+        entry["render_seconds"] = round(rendered - started, 4)
+
+        for file_format in formats:
+            path = os.path.join(output_dir, f"{job['name']}.{file_format}")
+            fig.savefig(path, format=file_format)
+            entry["files"].append(os.path.relpath(path, output_dir))
+        entry["save_seconds"] = round(time.perf_counter() - rendered, 4)
+    except Exception as e:
+        entry["error"] = f"{type(e).__name__}: {e}"
+    entry["seconds"] = round(time.perf_counter() - started, 4)
+    return entry
+
+
+def _render_many(jobs, output_dir, formats):
+    # One task per worker call for a batch of jobs, keeping the pooled figures warm
+    return [render_chart(job, output_dir, formats) for job in jobs]
+
+
+# ----------------------------
+# Batch driver
+# ----------------------------
+
+
+def render_batch(jobs, output_dir=None, formats=DEFAULT_FORMATS, workers=None, jobs_per_task=4):
+    """
+    Render charts in parallel worker processes and write a manifest.
+
+    Args:
+        jobs (list): Outputs of `chart_job`.
+        output_dir (str): Where files go, defaults to REPORT_DIR/<today>.
+        formats (tuple): Any Agg-supported formats, e.g. ("png", "svg").
+        workers (int): Worker processes, defaults to the CPU count. 1 renders in this process.
+        jobs_per_task (int): Charts sent to a worker at a time.
+
+    Returns:
+        dict: The manifest, also saved as manifest.json in output_dir.
+    """
+    output_dir = output_dir or os.path.join(REPORT_DIR, datetime.now().strftime("%Y-%m-%d"))
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+
+    names = [job["name"] for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError("Chart names must be unique within a batch")
+
+    started = time.perf_counter()
+    entries = []
+    if workers == 1:
+        entries = _render_many(jobs, output_dir, formats)
+    else:
+        batches = [jobs[i:i + jobs_per_task] for i in range(0, len(jobs), jobs_per_task)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_render_many, batch, output_dir, formats) for batch in batches]
+            for future in as_completed(futures):
+                entries.extend(future.result())
+    wall_seconds = time.perf_counter() - started
+
+    order = {name: i for i, name in enumerate(names)}
+    entries.sort(key=lambda entry: order[entry["name"]])
+    manifest = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "output_dir": output_dir,
+        "formats": list(formats),
+        "workers": workers,
+        "wall_seconds": round(wall_seconds, 3),
+        "chart_seconds": round(sum(entry["seconds"] for entry in entries), 3),
+        "charts": entries,
+    }
+    temp_file = os.path.join(output_dir, f".{MANIFEST_FILE}.tmp")
+    with open(temp_file, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_file, os.path.join(output_dir, MANIFEST_FILE))
+    return manifest
+
+
+def print_timing_report(manifest, slowest=10):
+    """Print totals, failures and the slowest charts of a manifest."""
+    charts = manifest["charts"]
+    failed = [entry for entry in charts if "error" in entry]
+    print(f"Rendered {len(charts) - len(failed)}/{len(charts)} charts to {manifest['output_dir']} "
+          f"with {manifest['workers']} workers in {manifest['wall_seconds']:.2f}s "
+          f"({manifest['chart_seconds']:.2f}s of chart time)")
+    for entry in failed:
+        print(f"  FAILED {entry['name']}: {entry['error']}")
+    print(f"Slowest {min(slowest, len(charts))}:")
+    for entry in sorted(charts, key=lambda entry: entry["seconds"], reverse=True)[:slowest]:
+        print(f"  {entry['name']:<45} {entry['seconds']:.3f}s "
+              f"(render {entry.get('render_seconds', 0):.3f}s, save {entry.get('save_seconds', 0):.3f}s)")
+
+
+# ----------------------------
+# Nightly report from the local caches
+# ----------------------------
+
+WEEKLY_SERIES = {
+    "daily_total_rainfall_data.json": "Total Rainfall",
+    "daily_average_humidity_data.json": "Average Humidity",
+    "daily_average_temperature_data.json": "Average Temperature",
+    "daily_average_windspeed_data.json": "Average Wind Speed",
+    "daily_total_windspeed_data.json": "Total Wind Speed",
+}
+
+
+def nightly_jobs(data_dir=DATA_DIR, since=None):
+    """
+    Chart jobs for every complete week of the daily series caches and every year of the
+    rainfall-by-location caches. Nothing is fetched from the API.
+
+    Args:
+        since (str): Only weeks starting on or after this "YYYY-MM-DD" date.
+    """
+    from helper_functions import load_daily_cache
+
+    jobs = []
+    for file_name, title in WEEKLY_SERIES.items():
+        path = os.path.join(data_dir, file_name)
+        if not os.path.exists(path):
+            continue
+        series = load_daily_cache(path)
+        reading_unit = series.pop("readingUnit", "N/A")
+        for date in sorted(series):
+            monday = datetime.strptime(date, "%Y-%m-%d")
+            if monday.weekday() != 0 or (since and date < since):
+                continue
+            week = [(monday + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
+            if all(day in series for day in week):
+                jobs.append(chart_job(
+                    f"weekly_{os.path.splitext(file_name)[0]}_{date}", "weekly",
+                    title=title, reading_unit=reading_unit, weather_data={day: series[day] for day in week},
+                ))
+
+    for path in sorted(glob.glob(os.path.join(data_dir, "daily_rainfall_by_location_*.json"))):
+        year = re.search(r"(\d{4})\.json$", path).group(1)
+        jobs.append(chart_job(f"rainfall_by_zone_{year}", "rainfall_by_zone", figsize=(12, 6),
+                              cache_file=path, title=f"Rainfall in {year} (Sorted by Zone)"))
+        jobs.append(chart_job(f"rainfall_by_region_{year}", "rainfall_by_region", figsize=(8, 5),
+                              cache_file=path, title=f"Total Rainfall by Region\n({year})"))
+    return jobs
+
+
+if __name__ == "__main__":
+    # python batch_render.py [since YYYY-MM-DD] [workers] [formats, e.g. png,svg]
+    since = sys.argv[1] if len(sys.argv) > 1 else None
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[2] else None
+    formats = tuple(sys.argv[3].split(",")) if len(sys.argv) > 3 else DEFAULT_FORMATS
+
+    manifest = render_batch(nightly_jobs(since=since), formats=formats, workers=workers)
+    print_timing_report(manifest)
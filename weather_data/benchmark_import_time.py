@@ -0,0 +1,44 @@
+import os
+import statistics
+import subprocess
+import sys
+
+# Cold import time of helper_functions, measured in fresh interpreters.
+#   python benchmark_import_time.py [runs]
+MODULE = "helper_functions"
+BUDGET_MS = 100
+
+SNIPPET = (
+    "import time; start = time.perf_counter(); "
+    f"import {MODULE}; "
+    "print((time.perf_counter() - start) * 1000)"
+)
+
+
+def measureImportTime(runs=10):
+    """
+    Import the module in `runs` fresh interpreters.
+
+    Returns:
+        list: Import times in milliseconds.
+    """
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", SNIPPET],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        timings.append(float(result.stdout.strip()))
+    return timings
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    timings = measureImportTime(runs)
+    median = statistics.median(timings)
+    print(f"import {MODULE}: median {median:.1f} ms, min {min(timings):.1f} ms, max {max(timings):.1f} ms ({runs} runs)")
+    print(f"{'PASS' if median < BUDGET_MS else 'FAIL'}: budget {BUDGET_MS} ms")
+    sys.exit(0 if median < BUDGET_MS else 1)
@@ -0,0 +1,226 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as date_cls, datetime, timedelta
+
+import helper_functions
+from helper_functions import (
+    append_daily_cache,
+    collect_day,
+    get_http_client_stats,
+    summarise_daily_average,
+    summarise_daily_total,
+)
+
+
+def default_max_in_flight():
+    """
+    Requests allowed in flight across every (data type, date) pair: the shared pool size
+    as currently configured, so no request waits on a free connection.
+    """
+    return helper_functions.MAX_CONNECTIONS_PER_HOST
+
+
+class FetchFailed:
+    """
+    Stands in for a day's data when fetching it failed (timeout, 5xx after retries, bad JSON).
+
+    It is falsy like a day without data, so callers that only store truthy days skip it, but
+    it must not be cached as "no data": the day has to be fetched again.
+    """
+
+    def __init__(self, error):
+        self.error = error
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return f"FetchFailed({self.error!r})"
+
+
+def dateRange(start, end):
+    """
+    List every date between start and end (inclusive).
+
+    Args:
+        start (str | date | datetime): First date, "YYYY-MM-DD" if a string.
+        end (str | date | datetime): Last date, "YYYY-MM-DD" if a string.
+
+    Returns:
+        list: Dates as "YYYY-MM-DD" strings.
+    """
+    start = _to_date(start)
+    end = _to_date(end)
+    return [
+        (start + timedelta(days=i)).strftime("%Y-%m-%d")
+        for i in range((end - start).days + 1)
+    ]
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date_cls):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+async def _fetch_day(executor, data_type, date):
+    """
+    Fetch one (data type, date) pair through `collect_day` on one of the executor's threads.
+
+    Returns the same structure as getDataTypeFromDate, or None if the API has no data.
+    Raises TruncatedDayError like `iter_reading_pages`, so a day cut off mid-pagination
+    fails here exactly as it does on the blocking path.
+    """
+    # requests is blocking, so the day's pages are followed on a worker thread
+    return await asyncio.get_running_loop().run_in_executor(executor, collect_day, data_type, date)
+
+
+async def fetch_days(pairs, on_day=None, max_in_flight=None):
+    """
+    Fetch many (data type, date) pairs concurrently.
+
+    Args:
+        pairs (iterable): (data_type, "YYYY-MM-DD") tuples to fetch.
+        on_day (callable): Called as on_day(data_type, date, weather_data) as soon as
+            each pair completes. weather_data is None when the API has no data, and a
+            FetchFailed when the fetch raised.
+        max_in_flight (int): Maximum number of HTTP requests in flight at once, defaults
+            to the shared pool size when the fetch starts.
+
+    Returns:
+        dict: {(data_type, date): weather_data} for every pair. When on_day is given the
+            days are only streamed to it and not kept, so memory stays flat on long ranges.
+    """
+    max_in_flight = max_in_flight or default_max_in_flight()
+    # Each day keeps its next page prefetched, so it can have two requests out at once:
+    # the executor's size caps the days in flight
+    executor = ThreadPoolExecutor(max_workers=max(max_in_flight // 2, 1), thread_name_prefix="fetch-day")
+    results = {}
+
+    async def run(data_type, date):
+        try:
+            weather_data = await _fetch_day(executor, data_type, date)
+        except Exception as e:
+            print(f"Error fetching {data_type} for {date}: {e}")
+            weather_data = FetchFailed(e)
+        return data_type, date, weather_data
+
+    tasks = [asyncio.create_task(run(data_type, date)) for data_type, date in pairs]
+
+    try:
+        # Stream days to the callback in completion order
+        for task in asyncio.as_completed(tasks):
+            data_type, date, weather_data = await task
+            if on_day is not None:
+                on_day(data_type, date, weather_data)
+            else:
+                results[(data_type, date)] = weather_data
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
+
+
+async def fetch_range(data_types, start, end, on_day=None, max_in_flight=None):
+    """
+    Fetch every day between start and end for each data type concurrently.
+
+    Args:
+        data_types (list): Data types to fetch (e.g. ["rainfall", "wind-speed"]).
+        start (str | date | datetime): First date (inclusive).
+        end (str | date | datetime): Last date (inclusive).
+        on_day (callable): Called as on_day(data_type, date, weather_data) per completed day.
+        max_in_flight (int): Maximum number of HTTP requests in flight at once.
+
+    Returns:
+        dict: {(data_type, date): weather_data} for every pair in the range, empty when
+            on_day is given.
+    """
+    pairs = [
+        (data_type, date) for date in dateRange(start, end) for data_type in data_types
+    ]
+    return await fetch_days(pairs, on_day=on_day, max_in_flight=max_in_flight)
+
+
+def _run(coroutine):
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    # Called from inside an event loop (e.g. a Jupyter cell), where asyncio.run raises:
+    # run the fetch on its own loop in a worker thread and block until it is done
+    with ThreadPoolExecutor(max_workers=1) as runner:
+        return runner.submit(asyncio.run, coroutine).result()
+
+
+def run_fetch_days(pairs, on_day=None, max_in_flight=None):
+    """
+    Blocking wrapper around fetch_days for use in scripts.
+
+    Also works inside a running event loop such as a notebook; async code can
+    `await fetch_days(...)` directly instead.
+    """
+    return _run(fetch_days(pairs, on_day=on_day, max_in_flight=max_in_flight))
+
+
+def run_fetch_range(data_types, start, end, on_day=None, max_in_flight=None):
+    """Blocking wrapper around fetch_range, usable from scripts and notebooks alike."""
+    return _run(fetch_range(data_types, start, end, on_day=on_day, max_in_flight=max_in_flight))
+
+
+def backfill_daily_cache(data_type, start, end, cache, cache_filename, data_format="total"):
+    """
+    Fill every missing date of a daily-by-location cache with concurrent fetches.
+
+    Args:
+        data_type (str): The type of data to fetch (e.g. "rainfall", "wind-speed").
+        start (str | date | datetime): First date (inclusive).
+        end (str | date | datetime): Last date (inclusive).
+        cache (dict): The loaded cache, updated in place.
+        cache_filename (str): Path of the cache file.
+        data_format (str): "total" for daily station sums, "average" for daily station means.
+
+    Returns:
+        dict: The updated cache. Days whose fetch failed are left out of it and
+            listed, so running the backfill again retries them.
+    """
+    summarise = summarise_daily_total if data_format == "total" else summarise_daily_average
+    missing = [(data_type, date) for date in dateRange(start, end) if date not in cache]
+    if not missing:
+        return cache
+
+    print(f"Backfilling {len(missing)} days of {data_type} into {cache_filename}...")
+
+    failed = []
+
+    def store_day(data_type, date, weather_data):
+        if isinstance(weather_data, FetchFailed):
+            failed.append(date)
+            return
+        # Empty dicts mark dates the API has no data for so they are not fetched again
+        cache[date] = summarise(weather_data) if weather_data else {}
+        append_daily_cache(cache_filename, date, cache[date])
+
+    run_fetch_days(missing, on_day=store_day)
+    if failed:
+        print(f"Failed to fetch {len(failed)} days of {data_type}, re-run to retry: {', '.join(sorted(failed))}")
+    print(f"HTTP client stats: {get_http_client_stats()}")
+    return cache
+
+
+if __name__ == "__main__":
+    # Backfill a year of all five parameters
+    year = 2024
+    data_types = ["rainfall", "wind-speed", "wind-direction", "relative-humidity", "air-temperature"]
+
+    def report(data_type, date, weather_data):
+        status = "ok" if weather_data else "failed" if isinstance(weather_data, FetchFailed) else "no data"
+        print(f"[DONE] {data_type} {date}: {status}")
+
+    start_time = datetime.now()
+    run_fetch_range(data_types, f"{year}-01-01", f"{year}-12-31", on_day=report)
+    print(f"Fetched {year} in {datetime.now() - start_time}")
+    print(f"HTTP client stats: {get_http_client_stats()}")
@@ -0,0 +1,26 @@
+import argparse
+import glob
+import os
+
+from helper_functions import CACHE_LOG_SUFFIX, compact_daily_cache
+
+# Fold the append-only logs of the daily caches back into their JSON snapshots.
+#   python compact_daily_cache.py                      -> every cache with a pending log
+#   python compact_daily_cache.py daily_rainfall_by_location_2024.json
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact daily weather caches.")
+    parser.add_argument("cache_files", nargs="*", help="JSON cache files to compact")
+    args = parser.parse_args()
+
+    cache_files = args.cache_files or [
+        log_file[: -len(CACHE_LOG_SUFFIX)] for log_file in glob.glob(f"*.json{CACHE_LOG_SUFFIX}")
+    ]
+    if not cache_files:
+        print("No cache logs to compact.")
+
+    for cache_file in cache_files:
+        if not os.path.exists(cache_file) and not os.path.exists(cache_file + CACHE_LOG_SUFFIX):
+            print(f"{cache_file} not found. Skipping...")
+            continue
+        entries = compact_daily_cache(cache_file)
+        print(f"Compacted {cache_file} ({entries} entries).")
@@ -0,0 +1,270 @@
+import numpy as np
+from scipy import stats
+
+from timestamps import SECONDS_PER_HOUR
+
+
+def _to_seconds(timestamp):
+    # Accepts "YYYY-MM-DD HH:MM" labels, ISO strings and datetimes
+    if isinstance(timestamp, str):
+        timestamp = timestamp[:19]
+    return int(np.datetime64(timestamp, "s").astype(np.int64))
+
+
+def build_panel(series_by_variable, regions=None, freq_seconds=SECONDS_PER_HOUR):
+    """
+    Align several {timestamp: {region: value}} series on one regular time index.
+
+    Args:
+        series_by_variable (dict): {variable: {timestamp: {region: value}}}, e.g. the outputs of
+            formatAverageHourlyDataByRegion (string or datetime keys).
+        regions (list): Regions to keep, in order. Defaults to every region seen.
+        freq_seconds (int): Spacing of the index. A regular index keeps lags in whole steps.
+
+    Returns:
+        dict: {
+            "index": datetime64[s] array of the common time index,
+            "regions": list of regions,
+            "variables": list of variables,
+            "values": float64 array [time, region, variable], NaN where a series has no value,
+        }
+    """
+    variables = list(series_by_variable)
+    if regions is None:
+        seen = {}
+        for series in series_by_variable.values():
+            for region_values in series.values():
+                seen.update(dict.fromkeys(region_values))
+        regions = list(seen)
+    region_index = {region: i for i, region in enumerate(regions)}
+
+    parsed = {
+        variable: [(_to_seconds(timestamp), region_values) for timestamp, region_values in series.items()]
+        for variable, series in series_by_variable.items()
+    }
+    all_seconds = [seconds for entries in parsed.values() for seconds, _ in entries]
+    if not all_seconds:
+        return {"index": np.empty(0, "datetime64[s]"), "regions": list(regions),
+                "variables": variables, "values": np.empty((0, len(regions), len(variables)))}
+
+    start = min(all_seconds) // freq_seconds * freq_seconds
+    n_steps = (max(all_seconds) - start) // freq_seconds + 1
+    values = np.full((n_steps, len(regions), len(variables)), np.nan)
+
+    for v, variable in enumerate(variables):
+        for seconds, region_values in parsed[variable]:
+            row = (seconds - start) // freq_seconds
+            for region, value in region_values.items():
+                r = region_index.get(region)
+                if r is not None and value is not None:
+                    values[row, r, v] = value
+
+    index = (start + np.arange(n_steps) * freq_seconds).astype("datetime64[s]")
+    return {"index": index, "regions": list(regions), "variables": variables, "values": values}
+
+
+def pearson_matrix(x, y, min_periods=3):
+    """
+    NaN-aware Pearson correlation of every column of x with every column of y.
+
+    Each pair uses only the time steps where both columns have a value. Leading axes are
+    treated as a batch, so stacks of shifted series are correlated in the same matmuls.
+
+    Args:
+        x (np.ndarray): [..., time, a]
+        y (np.ndarray): [..., time, b]
+        min_periods (int): Pairs with fewer joint observations give NaN.
+
+    Returns:
+        dict: {"r", "p", "n"}, each [..., a, b]. p is the two-sided p-value of r.
+    """
+    x_present = ~np.isnan(x)
+    y_present = ~np.isnan(y)
+    x0 = np.where(x_present, x, 0.0)
+    y0 = np.where(y_present, y, 0.0)
+    mx = x_present.astype(np.float64)
+    my = y_present.astype(np.float64)
+
+    def cross(a, b):
+        return np.swapaxes(a, -1, -2) @ b
+
+    # Pairwise-complete sums, one matmul each
+    n = cross(mx, my)
+    sum_x = cross(x0, my)
+    sum_y = cross(mx, y0)
+    sum_xx = cross(x0 * x0, my)
+    sum_yy = cross(mx, y0 * y0)
+    sum_xy = cross(x0, y0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sum_xy - sum_x * sum_y / n
+        var_x = sum_xx - sum_x ** 2 / n
+        var_y = sum_yy - sum_y ** 2 / n
+        r = cov / np.sqrt(var_x * var_y)
+        r = np.clip(r, -1.0, 1.0)
+        r[n < min_periods] = np.nan
+
+        df = n - 2
+        t = r * np.sqrt(df / (1.0 - r ** 2))
+        p = 2 * stats.t.sf(np.abs(t), df)
+    p = np.where(np.isnan(r), np.nan, p)
+    return {"r": r, "p": p, "n": n.astype(np.int64)}
+
+
+def correlation_matrix(panel, min_periods=3):
+    """
+    Correlate every (region, variable) series with every other one.
+
+    Returns:
+        dict: {"labels": [(region, variable), ...], "r", "p", "n"} with square matrices
+            ordered like labels.
+    """
+    n_steps, n_regions, n_variables = panel["values"].shape
+    columns = panel["values"].reshape(n_steps, n_regions * n_variables)
+    result = pearson_matrix(columns, columns, min_periods)
+    result["labels"] = [(region, variable) for region in panel["regions"] for variable in panel["variables"]]
+    return result
+
+
+def region_correlations(panel, x_variable, y_variable, min_periods=3):
+    """
+    Correlation between two variables within each region.
+
+    Returns:
+        dict: {region: {"r", "p", "n"}}, regions without enough data are left out.
+    """
+    x = panel["values"][:, :, panel["variables"].index(x_variable)]
+    y = panel["values"][:, :, panel["variables"].index(y_variable)]
+    result = pearson_matrix(x, y, min_periods)
+    return {
+        region: {"r": float(result["r"][i, i]), "p": float(result["p"][i, i]), "n": int(result["n"][i, i])}
+        for i, region in enumerate(panel["regions"])
+        if not np.isnan(result["r"][i, i])
+    }
+
+
+def shift(values, lag):
+    """Shift along the time axis by lag steps, filling with NaN (positive lag looks ahead)."""
+    shifted = np.full_like(values, np.nan, dtype=np.float64)
+    if lag > 0:
+        shifted[:-lag] = values[lag:]
+    elif lag < 0:
+        shifted[-lag:] = values[:lag]
+    else:
+        shifted[:] = values
+    return shifted
+
+
+def lagged_correlations(panel, x_variable, y_variable, max_lag=6, min_periods=3):
+    """
+    Cross-correlation of x(t) with y(t + lag) for every region and lag in [-max_lag, max_lag].
+
+    All lags are stacked into one batch and correlated in a single pass.
+
+    Returns:
+        dict: {"lags": int array, "regions": list, "r", "p", "n": [lag, region] arrays}.
+    """
+    x = panel["values"][:, :, panel["variables"].index(x_variable)]
+    y = panel["values"][:, :, panel["variables"].index(y_variable)]
+    lags = np.arange(-max_lag, max_lag + 1)
+
+    # Only the diagonal (same region) is needed, so correlate region by region as [lag, region, time, 1]
+    x_stack = np.broadcast_to(x.T[None, :, :, None], (len(lags), x.shape[1], x.shape[0], 1))
+    y_stack = np.stack([shift(y, lag) for lag in lags]).transpose(0, 2, 1)[..., None]
+    result = pearson_matrix(x_stack, y_stack, min_periods)
+
+    return {
+        "lags": lags,
+        "regions": panel["regions"],
+        "r": result["r"][..., 0, 0],
+        "p": result["p"][..., 0, 0],
+        "n": result["n"][..., 0, 0],
+    }
+
+
+def best_lags(lagged):
+    """{region: (lag, r)} of the strongest absolute correlation per region."""
+    best = {}
+    for i, region in enumerate(lagged["regions"]):
+        r = lagged["r"][:, i]
+        if np.all(np.isnan(r)):
+            continue
+        j = int(np.nanargmax(np.abs(r)))
+        best[region] = (int(lagged["lags"][j]), float(r[j]))
+    return best
+
+
+def archive_panel(data_types, start, end, station_stat="sum", registry=None, freq_seconds=SECONDS_PER_HOUR):
+    """
+    Build a panel of region averages straight from the Parquet archive, for ranges of months.
+
+    Readings are reduced per station and step (sum or mean), then averaged over the stations of
+    each region, matching formatAverageHourlyDataByRegion on the hourly helpers' output.
+
+    Args:
+        data_types (list): Data types to load, they become the panel variables.
+        start (str): First date (inclusive), "YYYY-MM-DD".
+        end (str): Last date (inclusive), "YYYY-MM-DD".
+        station_stat (str): "sum" or "mean" of each station's readings within a step.
+        registry (StationRegistry): Station -> region lookups, defaults to the shared one.
+
+    Returns:
+        dict: The same structure as `build_panel`.
+    """
+    from parquet_archive import scan
+    from station_registry import get_station_registry
+
+    registry = registry or get_station_registry()
+    regions, _ = registry.region_codes()
+    region_index = {region: i for i, region in enumerate(regions)}
+
+    start_seconds = _to_seconds(f"{start} 00:00")
+    n_steps = (_to_seconds(f"{end} 00:00") - start_seconds) // freq_seconds + 86400 // freq_seconds
+    values = np.full((n_steps, len(regions), len(data_types)), np.nan)
+
+    for v, data_type in enumerate(data_types):
+        table = scan(data_type, start, end, columns=["ts", "station", "value"])
+        if not table.num_rows:
+            continue
+        station = table["station"].combine_chunks()
+        station_ids = station.dictionary.to_pylist()
+        station_codes = station.indices.to_numpy()
+        station_region = np.array([region_index[registry.region(station_id)] for station_id in station_ids])
+
+        rows = (table["ts"].to_numpy().astype("datetime64[s]").astype(np.int64) - start_seconds) // freq_seconds
+        reading_values = table["value"].to_numpy().astype(np.float64)
+
+        # Station-step totals, then region means over the stations that reported
+        keys = rows * len(station_ids) + station_codes
+        size = n_steps * len(station_ids)
+        station_sum = np.bincount(keys, reading_values, minlength=size)
+        station_count = np.bincount(keys, minlength=size)
+        reported = station_count > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            station_value = station_sum / station_count if station_stat == "mean" else station_sum
+
+        group = (np.arange(size) // len(station_ids)) * len(regions) + np.tile(station_region, n_steps)
+        region_sum = np.bincount(group[reported], station_value[reported], minlength=n_steps * len(regions))
+        region_count = np.bincount(group[reported], minlength=n_steps * len(regions))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values[:, :, v] = (region_sum / region_count).reshape(n_steps, len(regions))
+
+    index = (start_seconds + np.arange(n_steps) * freq_seconds).astype("datetime64[s]")
+    return {"index": index, "regions": regions, "variables": list(data_types), "values": values}
+
+
+if __name__ == "__main__":
+    from datetime import datetime
+
+    # Correlate three months of archived hourly data in one pass
+    start_time = datetime.now()
+    panel = archive_panel(["rainfall", "wind-speed", "relative-humidity", "air-temperature"],
+                          "2024-10-01", "2024-12-31")
+    matrix = correlation_matrix(panel)
+    print(f"{len(matrix['labels'])}x{len(matrix['labels'])} correlation matrix over "
+          f"{len(panel['index'])} hours in {datetime.now() - start_time}")
+
+    for region, result in region_correlations(panel, "wind-speed", "rainfall").items():
+        print(f"Region: {region}, Correlation: {result['r']:.2f} (p={result['p']:.3g}, n={result['n']})")
+    for region, (lag, r) in best_lags(lagged_correlations(panel, "relative-humidity", "rainfall")).items():
+        print(f"Region: {region}, humidity leads rainfall by {lag}h, Correlation: {r:.2f}")
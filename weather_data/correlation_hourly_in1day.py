@@ -2,8 +2,8 @@ from datetime import datetime
 
 import matplotlib.pyplot as plt
 import numpy as np
-from scipy.stats import pearsonr
 
+from correlation_engine import build_panel, region_correlations
 from helper_functions import *
 
 
@@ -40,17 +40,12 @@ def plot_hourly_trends(avg_ws, total_ws, avg_rf, at, rh, total_rf, region):
 
 
 def calculate_correlations(windspeed_data, rainfall_data):
-    correlations = {}
-    for region in district_map.keys():
-        windspeed_values = [
-            windspeed_data[ts].get(region, 0) for ts in windspeed_data.keys()
-        ]
-        rainfall_values = [
-            rainfall_data[ts].get(region, 0) for ts in rainfall_data.keys()
-        ]
-        if len(windspeed_values) > 1 and len(rainfall_values) > 1:
-            correlations[region], _ = pearsonr(windspeed_values, rainfall_values)
-    return correlations
+    # Aligned on one time index with missing hours masked, all regions in one matrix pass
+    panel = build_panel({"windspeed": windspeed_data, "rainfall": rainfall_data}, regions=list(district_map))
+    return {
+        region: result["r"]
+        for region, result in region_correlations(panel, "windspeed", "rainfall").items()
+    }
 
 
 def detect_extreme_events(aggregated_data, threshold):
@@ -75,21 +70,15 @@ if __name__ == "__main__":
         hourly_humidity_data, district_map
     )
 
-    # Get Average Hourly Rainfall
-    hourly_arf_data = getAverageDataHourly("rainfall", date)
-    aggregated_arf_data = formatAverageHourlyDataByRegion(hourly_arf_data, district_map)
-
-    # Get Total Hourly Rainfall
-    hourly_trf_data = getTotalDataHourly("rainfall", date)
-    aggregated_trf_data = formatTotalHourlyDataByRegion(hourly_trf_data, district_map)
+    # Get Average and Total Hourly Rainfall from one download
+    rainfall_statistics = getHourlyStatistics("rainfall", date, ("mean", "sum"))
+    aggregated_arf_data = formatAverageHourlyDataByRegion(rainfall_statistics["mean"], district_map)
+    aggregated_trf_data = formatTotalHourlyDataByRegion(rainfall_statistics["sum"], district_map)
 
-    # Get Hourly Wind Speeds
-    hourly_ws_data = getAverageDataHourly("wind-speed", date)
-    avg_ws_data = formatAverageHourlyDataByRegion(hourly_ws_data, district_map)
-    
-    # Get Total Hourly Wind Speeds
-    total_ws_data = getTotalDataHourly("wind-speed", date)
-    aggregated_ws_data = formatTotalHourlyDataByRegion(total_ws_data, district_map)
+    # Get Average and Total Hourly Wind Speeds from one download
+    wind_speed_statistics = getHourlyStatistics("wind-speed", date, ("mean", "sum"))
+    avg_ws_data = formatAverageHourlyDataByRegion(wind_speed_statistics["mean"], district_map)
+    aggregated_ws_data = formatTotalHourlyDataByRegion(wind_speed_statistics["sum"], district_map)
 
     # Get Hourly Air Temperature
     hourly_at_data = getAverageDataHourly("air-temperature", date)
@@ -129,7 +118,7 @@ if __name__ == "__main__":
 
     total_ws_correlations = calculate_correlations(aggregated_ws_data, aggregated_trf_data)
     print("Correlations between Total Wind Speeds and Total Rainfall:")
-    for region, corr in ws_correlations.items():
+    for region, corr in total_ws_correlations.items():
         print(f"Region: {region}, Correlation: {corr:.2f}")
 
     for region in district_map.keys():
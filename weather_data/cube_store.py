@@ -0,0 +1,291 @@
+import json
+import os
+from calendar import isleap
+from datetime import datetime
+
+import numpy as np
+
+from bulk_fetch import dateRange, run_fetch_days
+from helper_functions import DATA_DIR, HOURLY_STATISTICS, get_station_metadata
+from hourly_aggregation import flatten_readings, hourly_readings_view
+
+# Dense minute x station grids, one per (data type, year):
+#   cubes/<data type>_<year>.npy            float32 [minutes_in_year, station capacity], NaN = no reading
+#   cubes/<data type>_<year>.stations.json  column order of the station ids, the days filled
+#                                           and the reading unit
+# Override the location with WEATHERSG_CUBE_DIR.
+CUBE_DIR = os.environ.get("WEATHERSG_CUBE_DIR", os.path.join(DATA_DIR, "cubes"))
+
+MINUTES_PER_DAY = 1440
+# Spare columns so stations that appear later do not force a rewrite of the whole year
+DEFAULT_STATION_CAPACITY = 96
+
+
+def cube_paths(data_type, year):
+    """Paths of the cube array and its station index sidecar."""
+    base = os.path.join(CUBE_DIR, f"{data_type}_{year}")
+    return f"{base}.npy", f"{base}.stations.json"
+
+
+class StationCube:
+    """
+    A memory-mapped float32 grid of one data type for one year, rows are local minutes of the
+    year and columns are stations.
+
+    Slices of `data` are views into the mapped file, so reading a time window or one station
+    touches only those pages. Reductions run on the day/hour reshapes of the same memory.
+    """
+
+    def __init__(self, data_type, year, mode="r", capacity=DEFAULT_STATION_CAPACITY):
+        self.data_type = data_type
+        self.year = int(year)
+        self.array_path, self.index_path = cube_paths(data_type, year)
+        self.n_days = 366 if isleap(self.year) else 365
+        self.year_start = int(np.datetime64(f"{self.year}-01-01", "s").astype(np.int64))
+
+        if os.path.exists(self.array_path):
+            self.data = np.load(self.array_path, mmap_mode=mode)
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+        elif mode == "r":
+            raise FileNotFoundError(f"No {data_type} cube for {year} in {CUBE_DIR}")
+        else:
+            os.makedirs(CUBE_DIR, exist_ok=True)
+            self.data = np.lib.format.open_memmap(
+                self.array_path, mode="w+", dtype=np.float32, shape=(self.n_days * MINUTES_PER_DAY, capacity)
+            )
+            self.data[:] = np.nan
+            index = {"station_ids": [], "filled_days": []}
+
+        self.station_ids = index["station_ids"]
+        self.filled_days = set(index["filled_days"])
+        self.reading_unit = index.get("reading_unit")
+        self.columns = {station_id: column for column, station_id in enumerate(self.station_ids)}
+
+    @property
+    def n_stations(self):
+        return len(self.station_ids)
+
+    def _save_index(self):
+        temp_file = self.index_path + ".tmp"
+        with open(temp_file, "w") as f:
+            json.dump({"station_ids": self.station_ids, "filled_days": sorted(self.filled_days),
+                       "reading_unit": self.reading_unit}, f)
+        os.replace(temp_file, self.index_path)
+
+    def _grow(self, capacity):
+        # Rare: copy into a wider file once the spare columns run out
+        grown = np.full((self.data.shape[0], capacity), np.nan, dtype=np.float32)
+        grown[:, : self.data.shape[1]] = self.data
+        del self.data
+        np.save(self.array_path, grown)
+        self.data = np.load(self.array_path, mmap_mode="r+")
+
+    def station_columns(self, station_ids, add=False):
+        """Column index of each station id, registering unseen ids when add is set."""
+        columns = []
+        for station_id in station_ids:
+            column = self.columns.get(station_id)
+            if column is None:
+                if not add:
+                    raise KeyError(f"Station {station_id} is not in the {self.data_type} {self.year} cube")
+                column = self.columns[station_id] = len(self.station_ids)
+                self.station_ids.append(station_id)
+            columns.append(column)
+        if self.n_stations > self.data.shape[1]:
+            self._grow(max(self.n_stations, self.data.shape[1] * 2))
+        return np.array(columns, dtype=np.int64)
+
+    def write_day(self, date, readings, reading_unit=None, complete=True):
+        """
+        Store one day of API readings. Each reading lands in the row of its local minute.
+
+        Args:
+            reading_unit (str): The API's readingUnit, kept in the index when given.
+            complete (bool): Whether the day is over. Only complete days are recorded as
+                filled, so a day still in progress is fetched again next time.
+
+        Returns:
+            int: Number of values written.
+        """
+        columns = flatten_readings(readings)
+        station_columns = self.station_columns(columns["station_ids"], add=True)
+        rows = (columns["timestamps"] - self.year_start) // 60
+        # Readings stamped outside this year (none in practice) are dropped
+        inside = (rows >= 0) & (rows < self.data.shape[0])
+        self.data[rows[inside], station_columns[columns["stations"][inside]]] = columns["values"][inside]
+        if reading_unit:
+            self.reading_unit = reading_unit
+        if complete:
+            self.filled_days.add(date)
+        self._save_index()
+        return int(inside.sum())
+
+    def flush(self):
+        if isinstance(self.data, np.memmap):
+            self.data.flush()
+
+    def minute_row(self, moment):
+        """Row of a "YYYY-MM-DD HH:MM" string, date or datetime (local time)."""
+        seconds = int(np.datetime64(moment, "s").astype(np.int64))
+        return (seconds - self.year_start) // 60
+
+    def time_slice(self, start, end):
+        """Zero-copy [minutes, stations] view from start (inclusive) to end (exclusive)."""
+        return self.data[self.minute_row(start) : self.minute_row(end), : self.n_stations]
+
+    def station_series(self, station_id):
+        """Zero-copy strided view of one station over the whole year."""
+        return self.data[:, self.columns[station_id]]
+
+    def days(self):
+        """Zero-copy [days, minutes_per_day, stations] view."""
+        return self.data[:, : self.n_stations].reshape(self.n_days, MINUTES_PER_DAY, self.n_stations)
+
+    def hours(self):
+        """Zero-copy [hours, 60, stations] view."""
+        return self.data[:, : self.n_stations].reshape(self.n_days * 24, 60, self.n_stations)
+
+    def region_columns(self, registry):
+        """{region: column indices} of the cube's stations, using a StationRegistry."""
+        columns = {}
+        for station_id, column in self.columns.items():
+            columns.setdefault(registry.region(station_id), []).append(column)
+        return {region: np.array(indices, dtype=np.int64) for region, indices in columns.items()}
+
+    def day_index(self, date):
+        """Day of the year (0-based) of a "YYYY-MM-DD" date."""
+        return int((np.datetime64(date, "D") - np.datetime64(f"{self.year}-01-01", "D")).astype(int))
+
+    def dates(self):
+        """Every date of the cube's year as "YYYY-MM-DD" strings."""
+        return np.datetime_as_string(
+            np.datetime64(f"{self.year}-01-01", "D") + np.arange(self.n_days), unit="D"
+        ).tolist()
+
+
+def reduce(values, stat="sum", axis=1):
+    """
+    NaN-aware reduction: missing readings are skipped, all-missing groups give NaN.
+
+    Args:
+        stat (str): "sum", "mean", "count", "min" or "max".
+    """
+    present = ~np.isnan(values)
+    count = present.sum(axis=axis)
+    if stat == "count":
+        return count
+    if stat in ("min", "max"):
+        fill = np.inf if stat == "min" else -np.inf
+        result = getattr(np, stat)(np.where(present, values, fill), axis=axis)
+        return np.where(count > 0, result, np.nan)
+
+    total = np.where(present, values, 0).sum(axis=axis, dtype=np.float64)
+    if stat == "sum":
+        return np.where(count > 0, total, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / count
+
+
+def region_reduce(cube, values, registry, stat="mean"):
+    """
+    Reduce the station axis (last) of a cube view to regions.
+
+    Returns:
+        dict: {region: array over the remaining axes}.
+    """
+    return {
+        region: reduce(values[..., columns], stat, axis=-1)
+        for region, columns in cube.region_columns(registry).items()
+    }
+
+
+def fill_cube(data_type, start, end, refill=False):
+    """
+    Fetch every day between start and end into the cubes of their years. Today and later
+    dates are fetched on every call and never recorded as filled.
+
+    Returns:
+        dict: {year: StationCube} of the cubes touched.
+    """
+    today = datetime.now().strftime("%Y-%m-%d")
+    cubes = {}
+    pairs = []
+    for date in dateRange(start, end):
+        year = int(date[:4])
+        if year not in cubes:
+            cubes[year] = StationCube(data_type, year, mode="r+")
+        if refill or date not in cubes[year].filled_days:
+            pairs.append((data_type, date))
+
+    def store_day(data_type, date, weather_data):
+        if weather_data:
+            cubes[int(date[:4])].write_day(date, weather_data["readings"], weather_data["readingUnit"],
+                                           complete=date < today)
+
+    if pairs:
+        print(f"Filling {len(pairs)} days of {data_type} into {CUBE_DIR}...")
+        run_fetch_days(pairs, on_day=store_day)
+    for cube in cubes.values():
+        cube.flush()
+    return cubes
+
+
+def hourly_statistics(data_type, date, stats=HOURLY_STATISTICS):
+    """
+    One day's per-station hourly statistics, read from the cube of its year.
+
+    The day is fetched into the cube first unless it is already there, so repeated calls
+    for a past day do not touch the API. Missing readings are skipped.
+
+    Args:
+        data_type (str): The type of data to read (e.g. "rainfall", "wind-speed").
+        date (str): The date to read (YYYY-MM-DD).
+        stats (tuple): Any of "sum", "mean", "count", "min" and "max".
+
+    Returns:
+        dict: {stat: {"stations", "readings", "readingUnit"}} as returned by
+            getHourlyStatistics, or None if the API has no data for the day.
+    """
+    cube = fill_cube(data_type, date, date)[int(date[:4])]
+    day = cube.days()[cube.day_index(date)]  # [minutes, stations] view
+    hours = day.reshape(24, 60, cube.n_stations)
+    count = reduce(hours, "count", axis=1)  # [hours, stations]
+    if not count.any():
+        return None
+
+    # One row per (hour, station) with readings, sorted by hour then station as aggregate_hourly does
+    hour_index, station_index = np.nonzero(count)
+    day_start = cube.year_start + cube.day_index(date) * MINUTES_PER_DAY * 60
+    aggregate = {
+        "hours": day_start + hour_index.astype(np.int64) * 3600,
+        "stations": station_index.astype(np.int32),
+        "count": count[hour_index, station_index],
+        "station_ids": cube.station_ids,
+    }
+    for stat in ("sum", "mean", "min", "max"):
+        aggregate[stat] = reduce(hours, stat, axis=1)[hour_index, station_index].astype(np.float64)
+
+    present = {cube.station_ids[column] for column in np.unique(station_index).tolist()}
+    stations = [station for station in get_station_metadata(data_type) if station["id"] in present]
+    return {
+        stat: {
+            "stations": stations,
+            "readings": hourly_readings_view(aggregate, stat),
+            "readingUnit": cube.reading_unit,
+        }
+        for stat in stats
+    }
+
+
+if __name__ == "__main__":
+    from station_registry import get_station_registry
+
+    # Fill a year of rainfall, then reduce it to daily region totals with array ops
+    year = 2024
+    cube = fill_cube("rainfall", f"{year}-01-01", f"{year}-12-31")[year]
+
+    start_time = datetime.now()
+    daily_station_totals = reduce(cube.days(), "sum", axis=1)  # [days, stations]
+    daily_region_means = region_reduce(cube, daily_station_totals, get_station_registry(), "mean")
+    print(f"Daily region rainfall for {len(daily_region_means)} regions in {datetime.now() - start_time}")
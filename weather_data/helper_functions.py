@@ -1,28 +1,316 @@
 import json
 import os
+import threading
 from calendar import monthrange
 from collections import defaultdict
 from datetime import datetime, timedelta
 
-import matplotlib.pyplot as plt
-import requests
+# matplotlib, requests and the NumPy-based helpers are imported inside the functions
+# that use them, so headless and batch jobs only pay for what they call.
 
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_dictionaries_cache = {}
 
-def convert_to_datetime(aggregated_data):
-    return {
-        datetime.strptime(ts, "%Y-%m-%d %H:%M"): data
-        for ts, data in aggregated_data.items()
-    }
 
 # Function to import dictionaries from the JSON file
 def import_dictionaries(file_path="sg_districts_and_colors.json"):
-    with open(file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data["district_map"], data["zone_color_map"]
+    """
+    Load the district and zone color maps, once per file.
+
+    Args:
+        file_path (str): JSON file path, relative paths resolve next to this module.
+
+    Returns:
+        tuple: (district_map, zone_color_map), shared between callers.
+    """
+    file_path = os.path.join(DATA_DIR, file_path)
+    if file_path not in _dictionaries_cache:
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        _dictionaries_cache[file_path] = (data["district_map"], data["zone_color_map"])
+    return _dictionaries_cache[file_path]
+
+
+# district_map and zone_color_map are loaded on first access
+def __getattr__(name):
+    if name == "district_map":
+        return import_dictionaries()[0]
+    if name == "zone_color_map":
+        return import_dictionaries()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ----------------------------
+# Shared HTTP Client
+# ----------------------------
+
+API_BASE_URL = "https://api-open.data.gov.sg/v2/real-time/api"
+
+# Connection pool settings, override the per-host limit with WEATHERSG_MAX_CONNECTIONS
+MAX_CONNECTIONS_PER_HOST = int(os.environ.get("WEATHERSG_MAX_CONNECTIONS", "10"))
+MAX_RETRIES = 5
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_http_session = None
+_http_stats = {"requests": 0, "retries": 0}
+# Guards session creation and the counters when fetching from worker threads
+_http_lock = threading.Lock()
+
+
+def configure_http_client(max_connections_per_host=None, max_retries=None, backoff_factor=None):
+    """
+    Change the shared HTTP client settings. The session is rebuilt on the next request.
+
+    Args:
+        max_connections_per_host (int): Keep-alive connections kept open per host.
+        max_retries (int): Retries for connection errors and 429/5xx responses.
+        backoff_factor (float): Exponential backoff factor between retries, in seconds.
+    """
+    global _http_session, MAX_CONNECTIONS_PER_HOST, MAX_RETRIES, RETRY_BACKOFF_FACTOR
+
+    with _http_lock:
+        if max_connections_per_host is not None:
+            MAX_CONNECTIONS_PER_HOST = max_connections_per_host
+        if max_retries is not None:
+            MAX_RETRIES = max_retries
+        if backoff_factor is not None:
+            RETRY_BACKOFF_FACTOR = backoff_factor
+
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+
+
+def get_http_session():
+    """
+    Return the module-level requests session used for every data.gov.sg call.
+
+    The session keeps connections alive between paginated calls, asks for gzip
+    responses and retries failed requests with exponential backoff.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _http_session
+
+    with _http_lock:
+        if _http_session is None:
+            _http_session = _create_http_session()
+
+    return _http_session
 
 
-# Import the dictionaries
-district_map, zone_color_map = import_dictionaries()
+def _create_http_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        # Hand the last response back to the caller instead of raising
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=MAX_CONNECTIONS_PER_HOST,
+        pool_maxsize=MAX_CONNECTIONS_PER_HOST,
+        max_retries=retry,
+        pool_block=True,
+    )
+    session = requests.Session()
+    session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def http_get(url, params=None, **kwargs):
+    """
+    GET a URL through the shared session and record retry counts.
+
+    Args:
+        url (str): The URL to fetch.
+        params (dict): Optional query parameters.
+
+    Returns:
+        requests.Response: The response of the last attempt.
+    """
+    response = get_http_session().get(url, params=params, **kwargs)
+
+    retries = getattr(response.raw, "retries", None)
+    with _http_lock:
+        _http_stats["requests"] += 1
+        if retries is not None:
+            _http_stats["retries"] += len(retries.history)
+
+    return response
+
+
+def get_http_client_stats():
+    """
+    Report how well the shared client is reusing connections.
+
+    Returns:
+        dict: Request, retry, connection and connection-reuse counters.
+    """
+    connections_opened = 0
+    pool_requests = 0
+
+    if _http_session is not None:
+        # The same adapter is mounted for http:// and https://
+        for adapter in set(_http_session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                connections_opened += pool.num_connections
+                pool_requests += pool.num_requests
+
+    return {
+        "requests": _http_stats["requests"],
+        "retries": _http_stats["retries"],
+        "connections_opened": connections_opened,
+        "connections_reused": max(pool_requests - connections_opened, 0),
+    }
+
+
+# ----------------------------
+# Station Metadata Cache
+# ----------------------------
+
+# Station lists live beside this module as <data type>_stations.json, with the
+# fetch time and ETag in <data type>_stations.meta.json. Override the TTL with
+# WEATHERSG_STATION_TTL (seconds).
+STATION_CACHE_TTL = int(os.environ.get("WEATHERSG_STATION_TTL", str(7 * 24 * 3600)))
+
+_station_cache = {}
+_station_lock = threading.Lock()
+
+
+def station_cache_path(data_type):
+    """Path of the persisted station list for a data type."""
+    return os.path.join(DATA_DIR, f"{data_type}_stations.json")
+
+
+def _station_meta_path(data_type):
+    return os.path.join(DATA_DIR, f"{data_type}_stations.meta.json")
+
+
+def merge_stations(stations_by_id, stations, overwrite=False):
+    """
+    Add station objects to an id-keyed dict, keeping the first copy of each id.
+
+    Args:
+        overwrite (bool): Replace ids already in stations_by_id with the passed copy, for
+            a fresh response that may rename or move stations. Within `stations` itself the
+            first copy of an id still wins.
+
+    Returns:
+        bool: True if any station id was new (or, with overwrite, changed).
+    """
+    changed = False
+    seen = set()
+    for station in stations:
+        station_id = station["id"]
+        if station_id in seen:
+            continue
+        seen.add(station_id)
+        if station_id not in stations_by_id or (overwrite and stations_by_id[station_id] != station):
+            stations_by_id[station_id] = station
+            changed = True
+    return changed
+
+
+def _load_station_entry(data_type):
+    entry = _station_cache.get(data_type)
+    if entry is not None:
+        return entry
+
+    entry = {"stations": {}, "fetched_at": 0, "etag": None}
+    path = station_cache_path(data_type)
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            merge_stations(entry["stations"], json.load(f))
+        # Files written before the metadata sidecar count from their mtime
+        entry["fetched_at"] = os.path.getmtime(path)
+    if os.path.exists(_station_meta_path(data_type)):
+        with open(_station_meta_path(data_type), "r") as f:
+            entry.update(json.load(f))
+
+    _station_cache[data_type] = entry
+    return entry
+
+
+def _save_station_entry(data_type, entry):
+    for path, payload in (
+        (station_cache_path(data_type), list(entry["stations"].values())),
+        (_station_meta_path(data_type), {"fetched_at": entry["fetched_at"], "etag": entry["etag"]}),
+    ):
+        temp_file = path + ".tmp"
+        with open(temp_file, "w") as f:
+            json.dump(payload, f, indent=4)
+        os.replace(temp_file, path)
+
+
+def get_station_metadata(data_type, refresh=False):
+    """
+    Return the station list of a data type, refreshing it from the API only when stale.
+
+    A stale list is revalidated with If-None-Match, so an unchanged list costs one
+    304 response. Stations are merged by id: a refresh updates the ones it lists and
+    keeps the ones that stopped reporting.
+
+    Args:
+        data_type (str): The type of data (e.g. "rainfall", "wind-speed").
+        refresh (bool): Revalidate even if the cached list is within the TTL.
+
+    Returns:
+        list: Deduplicated station objects ({"id", "name", "location", ...}).
+    """
+    with _station_lock:
+        entry = _load_station_entry(data_type)
+        now = datetime.now().timestamp()
+        if entry["stations"] and not refresh and now - entry["fetched_at"] < STATION_CACHE_TTL:
+            return list(entry["stations"].values())
+
+        headers = {"If-None-Match": entry["etag"]} if entry["etag"] and entry["stations"] else {}
+        try:
+            response = http_get(f"{API_BASE_URL}/{data_type}", headers=headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+                data = response.json().get("data") or {}
+                # The fresh list wins for known ids, so renamed or moved stations are updated
+                merge_stations(entry["stations"], data.get("stations", []), overwrite=True)
+                entry["etag"] = response.headers.get("ETag")
+            entry["fetched_at"] = now
+            _save_station_entry(data_type, entry)
+        except Exception as e:
+            # Fall back to the stale list rather than failing the caller
+            print(f"Error refreshing {data_type} stations: {e}")
+
+        return list(entry["stations"].values())
+
+
+def update_station_metadata(data_type, stations):
+    """
+    Merge stations seen in an API response into the cache, persisting only new ids.
+
+    Returns:
+        list: The deduplicated stations that were passed in.
+    """
+    stations_by_id = {}
+    merge_stations(stations_by_id, stations)
+    with _station_lock:
+        entry = _load_station_entry(data_type)
+        if merge_stations(entry["stations"], stations_by_id.values()):
+            _save_station_entry(data_type, entry)
+    return list(stations_by_id.values())
 
 
 def createStationsJsonFromResponse(data_type, date, output_file):
@@ -37,10 +325,12 @@ def createStationsJsonFromResponse(data_type, date, output_file):
     Returns:
         str: File name of the saved JSON containing station information, or error message if failed.
     """
-    url = f"https://api-open.data.gov.sg/v2/real-time/api/{data_type}?date={date}"
+    import requests
+
+    url = f"{API_BASE_URL}/{data_type}?date={date}"
 
     try:
-        response = requests.get(url)
+        response = http_get(url)
         response.raise_for_status()  # Raise an exception for HTTP errors
         data = response.json()
 
@@ -69,198 +359,177 @@ def createStationsJsonFromResponse(data_type, date, output_file):
         return None
 
 
-def getDataTypeFromDate(data_type, date):
+class TruncatedDayError(Exception):
+    """A page after the first came back without data, so the day is incomplete."""
+
+
+def _get_page(url, pagination_token):
+    params = {"paginationToken": pagination_token} if pagination_token else {}
+    return http_get(url, params=params).json()
+
+
+def iter_reading_pages(data_type, date):
     """
-    Fetch data from API.
+    Yield the API pages of one day as they arrive, without keeping earlier pages.
+
+    The request for the next page is sent before the current one is yielded, so the
+    caller's aggregation overlaps the download of the following page.
 
     Args:
         data_type (str): The type of data to fetch (e.g. "rainfall", "wind-speed").
         date (str): The date for which to fetch data (YYYY-MM-DD).
 
-    Returns:
-        dict: A dictionary containing stations metadata and hourly aggregated readings.
+    Yields:
+        dict: The "data" payload of each page ("stations", "readings", "readingUnit",
+            "paginationToken"). Yields nothing if the first page has no data.
+
+    Raises:
+        TruncatedDayError: A later page came back without data. Whatever was aggregated
+            from the earlier pages is partial and must not be cached.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    url = f"{API_BASE_URL}/{data_type}?date={date}"
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        next_page = prefetcher.submit(_get_page, url, None)
+        page_number = 0
+        while next_page is not None:
+            data = next_page.result().get("data")
+            if data is None:
+                if page_number:
+                    raise TruncatedDayError(f"{data_type} for {date} stopped after {page_number} pages")
+                return
+            page_number += 1
+            pagination_token = data.get("paginationToken")
+            next_page = prefetcher.submit(_get_page, url, pagination_token) if pagination_token else None
+            yield data
+
+
+def collect_day(data_type, date):
     """
+    Fetch every page of one day and gather its readings.
 
-    url = f"https://api-open.data.gov.sg/v2/real-time/api/{data_type}?date={date}"
+    Args:
+        data_type (str): The type of data to fetch (e.g. "rainfall", "wind-speed").
+        date (str): The date for which to fetch data (YYYY-MM-DD).
+
+    Returns:
+        dict: Stations metadata and the day's readings (see `getDataTypeFromDate`), or None
+            if the API has no data for the day.
+
+    Raises:
+        TruncatedDayError: A page after the first came back without data.
+    """
     all_readings = []
-    all_stations = []
-    pagination_token = None
+    stations_by_id = {}
     complete_data = True
     partial_data_dates = []
+    page = None
 
-    while True:
-        # Make the request with paginationToken if it exists
-        params = {"paginationToken": pagination_token} if pagination_token else {}
-        response = requests.get(url, params=params)
-        data = response.json()
-
-        if data.get("data") is None:
-            return None
+    for page_number, page in enumerate(iter_reading_pages(data_type, date)):
         # Check if 1st page does not contain a pagination token - means missing data
-        if not pagination_token and not data["data"].get("paginationToken"):
+        if page_number == 0 and not page.get("paginationToken"):
             complete_data = False
             partial_data_dates.append(date)
 
-        # Collect readings from the current response
-        all_stations.extend(data["data"]["stations"])
-        all_readings.extend(data["data"]["readings"])
-        readingUnit = data["data"]["readingUnit"]
+        # Every page repeats the station list, keep one copy per station id
+        merge_stations(stations_by_id, page["stations"])
+        all_readings.extend(page["readings"])
 
-        # Check if there's a next page
-        pagination_token = data["data"].get("paginationToken")
-        if not pagination_token:
-            break
+    if page is None:
+        return None
 
     return {
-        "stations": all_stations,
+        "stations": update_station_metadata(data_type, stations_by_id.values()),
         "readings": all_readings,
         "complete_data": complete_data,
         "partial_data_dates": partial_data_dates,
-        "readingUnit": readingUnit,
+        "readingUnit": page["readingUnit"],
     }
 
 
-def getDataFromStorage(output_file):
-    # Load existing data if the file exists
-    if os.path.exists(output_file):
-        with open(output_file, "r") as file:
-            all_data = json.load(file)
-    else:
-        all_data = {}
-    return all_data
-
-
-# Fetches Total weather data for a specific date - at 1 hour intervals
-
-
-def getTotalDataHourly(data_type, date):
+def getDataTypeFromDate(data_type, date):
     """
-    Fetch windspeed data and aggregate within each hour.
+    Fetch data from API.
 
     Args:
         data_type (str): The type of data to fetch (e.g. "rainfall", "wind-speed").
-        date (str): The date for which to fetch windspeed data (YYYY-MM-DD).
+        date (str): The date for which to fetch data (YYYY-MM-DD).
 
     Returns:
-        dict: A dictionary containing stations metadata and hourly aggregated readings.
+        dict: A dictionary containing stations metadata and hourly aggregated readings,
+            or None if the API has no data or the day stopped part-way through its pages.
     """
+    try:
+        return collect_day(data_type, date)
+    except TruncatedDayError as e:
+        print(f"Incomplete day: {e}")
+        return None
 
-    url = f"https://api-open.data.gov.sg/v2/real-time/api/{data_type}?date={date}"
-    all_readings = []
-    pagination_token = None
 
-    while True:
-        # Make the request with paginationToken if it exists
-        params = {"paginationToken": pagination_token} if pagination_token else {}
-        response = requests.get(url, params=params)
-        data = response.json()
+def getDataFromStorage(output_file):
+    # Load existing data (snapshot plus appended days) if the file exists
+    return load_daily_cache(output_file)
 
-        # Collect readings from the current response
-        all_readings.extend(data["data"]["readings"])
 
-        # Check if there's a next page
-        pagination_token = data["data"].get("paginationToken")
-        if not pagination_token:
-            break
+HOURLY_STATISTICS = ("sum", "mean", "count", "min", "max")
 
-    # Group readings by hour and station
-    # Use float for direct summing
-    hourly_data = defaultdict(lambda: defaultdict(float))
 
-    for entry in all_readings:
-        timestamp = entry["timestamp"]
-        hour = datetime.strptime(timestamp.split("+")[0], "%Y-%m-%dT%H:%M:%S").strftime(
-            "%Y-%m-%d %H:00"
-        )
+def getHourlyStatistics(data_type, date, stats=HOURLY_STATISTICS):
+    """
+    Aggregate every requested statistic of one day per hour.
 
-        for data_point in entry["data"]:
-            station_id = data_point["stationId"]
-            value = data_point["value"]
-            # Add value directly to the hourly total for the station
-            hourly_data[hour][station_id] += value
+    The day is read from the minute cube of its year (see cube_store), fetching it into the
+    cube first when it is not there yet, so past days are only downloaded once.
 
-    # Summarize the hourly data
-    formatted_readings = []
-    for hour, stations in sorted(hourly_data.items()):
-        aggregated_data = []
-        for station_id, total_value in stations.items():
-            aggregated_data.append({"stationId": station_id, "value": total_value})
+    Args:
+        data_type (str): The type of data to fetch (e.g. "rainfall", "wind-speed").
+        date (str): The date for which to fetch data (YYYY-MM-DD).
+        stats (tuple): Any of "sum", "mean", "count", "min" and "max".
 
-        formatted_readings.append({"timestamp": hour, "data": aggregated_data})
+    Returns:
+        dict: {stat: {"stations", "readings", "readingUnit"}}, each value shaped like the
+            output of getTotalDataHourly, or None if the API has no data.
+    """
+    from cube_store import hourly_statistics
 
-    # Return the structured data with hourly aggregation
-    return {
-        "stations": data["data"]["stations"],
-        "readings": formatted_readings,
-        "readingUnit": data["data"]["readingUnit"],
-    }
+    return hourly_statistics(data_type, date, stats)
 
 
-# Fetches Average weather data for a specific date - at 1 hour intervals
+# Fetches Total weather data for a specific date - at 1 hour intervals
 
 
-def getAverageDataHourly(data_type, date):
+def getTotalDataHourly(data_type, date):
     """
-    Fetch weather data and calculate hourly averages.
+    Fetch windspeed data and aggregate within each hour.
 
     Args:
         data_type (str): The type of data to fetch (e.g. "rainfall", "wind-speed").
-        date (str): The date for which to fetch weather data (YYYY-MM-DD).
+        date (str): The date for which to fetch windspeed data (YYYY-MM-DD).
 
     Returns:
         dict: A dictionary containing stations metadata and hourly aggregated readings.
     """
+    hourly_statistics = getHourlyStatistics(data_type, date, ("sum",))
+    return hourly_statistics["sum"] if hourly_statistics else None
 
-    url = f"https://api-open.data.gov.sg/v2/real-time/api/{data_type}?date={date}"
-    all_readings = []
-    pagination_token = None
-
-    while True:
-        # Make the request with paginationToken if it exists
-        params = {"paginationToken": pagination_token} if pagination_token else {}
-        response = requests.get(url, params=params)
-        data = response.json()
 
-        # Collect readings from the current response
-        all_readings.extend(data["data"]["readings"])
-
-        # Check if there's a next page
-        pagination_token = data["data"].get("paginationToken")
-        if not pagination_token:
-            break
-
-    # Group readings by hour and station
-    hourly_data = defaultdict(lambda: defaultdict(lambda: [0, 0]))  # [sum, count]
-
-    for entry in all_readings:
-        timestamp = entry["timestamp"]
-        hour = datetime.strptime(timestamp.split("+")[0], "%Y-%m-%dT%H:%M:%S").strftime(
-            "%Y-%m-%d %H:00"
-        )
+# Fetches Average weather data for a specific date - at 1 hour intervals
 
-        for data_point in entry["data"]:
-            station_id = data_point["stationId"]
-            value = data_point["value"]
-            # Add value and increment count for the hourly total at the station
-            hourly_data[hour][station_id][0] += value  # Sum
-            hourly_data[hour][station_id][1] += 1  # Count
 
-    # Calculate averages and format the hourly data
-    formatted_readings = []
-    for hour, stations in sorted(hourly_data.items()):
-        aggregated_data = []
-        for station_id, (total_value, count) in stations.items():
-            average_value = total_value / count if count > 0 else 0
-            aggregated_data.append({"stationId": station_id, "value": average_value})
+def getAverageDataHourly(data_type, date):
+    """
+    Fetch weather data and calculate hourly averages.
 
-        formatted_readings.append({"timestamp": hour, "data": aggregated_data})
+    Args:
+        data_type (str): The type of data to fetch (e.g. "rainfall", "wind-speed").
+        date (str): The date for which to fetch weather data (YYYY-MM-DD).
 
-    # Return the structured data with hourly averages
-    return {
-        "stations": data["data"]["stations"],
-        "readings": formatted_readings,
-        "readingUnit": data["data"]["readingUnit"],
-    }
+    Returns:
+        dict: A dictionary containing stations metadata and hourly aggregated readings.
+    """
+    hourly_statistics = getHourlyStatistics(data_type, date, ("mean",))
+    return hourly_statistics["mean"] if hourly_statistics else None
 
 
 def formatTotalHourlyDataByRegion(hourly_data, district_map):
@@ -275,12 +544,10 @@ def formatTotalHourlyDataByRegion(hourly_data, district_map):
         dict: A dictionary with timestamps as keys and total windspeed by region.
     """
 
-    # Create a mapping from station_id to region using district_map and station metadata
-    station_to_region = {}
-    for region, station_names in district_map.items():
-        for station in hourly_data["stations"]:
-            if station["name"] in station_names:
-                station_to_region[station["id"]] = region
+    from station_registry import get_station_registry
+
+    # Look up station_id -> region in the registry built once per district_map
+    registry = get_station_registry(district_map).add_stations(hourly_data["stations"])
 
     # Aggregate data by hour and region
     # {hour: {region: total_windspeed}}
@@ -291,7 +558,7 @@ def formatTotalHourlyDataByRegion(hourly_data, district_map):
         for data_point in reading["data"]:
             station_id = data_point["stationId"]
             value = data_point["value"]
-            region = station_to_region.get(station_id, "Unknown")
+            region = registry.region(station_id)
             hourly_region_totals[timestamp][region] += value
 
     # Convert defaultdict to a regular dictionary for better readability
@@ -313,12 +580,10 @@ def formatAverageHourlyDataByRegion(hourly_data, district_map):
         dict: A dictionary with timestamps as keys and average values by region.
     """
 
-    # Create a mapping from station_id to region using district_map and station metadata
-    station_to_region = {}
-    for region, station_names in district_map.items():
-        for station in hourly_data["stations"]:
-            if station["name"] in station_names:
-                station_to_region[station["id"]] = region
+    from station_registry import get_station_registry
+
+    # Look up station_id -> region in the registry built once per district_map
+    registry = get_station_registry(district_map).add_stations(hourly_data["stations"])
 
     # Aggregate data by hour and region
     # {hour: {region: [sum, count]}}
@@ -329,7 +594,7 @@ def formatAverageHourlyDataByRegion(hourly_data, district_map):
         for data_point in reading["data"]:
             station_id = data_point["stationId"]
             value = data_point["value"]
-            region = station_to_region.get(station_id, "Unknown")
+            region = registry.region(station_id)
             hourly_region_totals[timestamp][region][0] += value
             hourly_region_totals[timestamp][region][1] += 1
 
@@ -491,40 +756,52 @@ def cleanupStationNames(stations_list: list, output_dict: dict):
     return locations, rainfall_values
 
 
-def plot_weather_hourly(title: str, measurement: str, date: str, hourly_data: dict):
+def plot_weather_hourly(title: str, measurement: str, date: str, hourly_data: dict, ax=None):
+    """
+    Line chart of hourly values.
+
+    Args:
+        ax (matplotlib.axes.Axes): Axes to draw on. Without one a new pyplot figure is
+            created and shown; with one nothing is shown (e.g. for batch_render).
+    """
     import matplotlib.dates as mdates
 
     timestamps = sorted(hourly_data.keys())
     rainfall_values = [hourly_data[ts] for ts in timestamps]
 
-    plt.figure(figsize=(12, 6))
-    plt.plot(
+    show = ax is None
+    if show:
+        import matplotlib.pyplot as plt
+
+        ax = plt.figure(figsize=(12, 6)).gca()
+
+    ax.plot(
         timestamps,
         rainfall_values,
         label=f"{title} ({measurement})",
         marker="x",
         color="blue",
     )
-    plt.title(f"{title} ({measurement}) in Singapore - {date}")
-    plt.xlabel("Time")
-    plt.ylabel(f"{measurement}")
-    plt.legend()
-    plt.grid(True)
-
-    # Get the current axes
-    ax = plt.gca()
+    ax.set_title(f"{title} ({measurement}) in Singapore - {date}")
+    ax.set_xlabel("Time")
+    ax.set_ylabel(f"{measurement}")
+    ax.legend()
+    ax.grid(True)
 
     # Set a custom date format on the x-axis
     ax.xaxis.set_major_formatter(mdates.DateFormatter("%H:%M:%S"))
 
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    plt.show()
+    ax.tick_params(axis="x", labelrotation=45)
+    ax.figure.tight_layout()
+    if show:
+        plt.show()
 
 
 def convert_to_datetime(aggregated_data):
+    from timestamps import parse_hour_label
+
     return {
-        datetime.strptime(ts, "%Y-%m-%d %H:%M"): data
+        parse_hour_label(ts): data
         for ts, data in aggregated_data.items()
     }
 
@@ -583,6 +860,30 @@ def convert_to_datetime(aggregated_data):
 #     return weekly_weather, readingUnit
 
 
+def summarise_day_value(weather_data, station_json_path: str, data_format: str):
+    """
+    Reduce one day of readings to a single value.
+
+    Args:
+        weather_data (dict): The output from `getDataTypeFromDate`.
+        station_json_path (str): Path to the station JSON file.
+        data_format (str): "total" for the sum of every station's total, "average" for the
+            mean of the station averages.
+
+    Returns:
+        float: The day's value.
+    """
+    output_dict = createOutputDict(station_json_path, weather_data)
+    if data_format == "total":
+        output_dict = sumValuesForEveryStation(weather_data, output_dict)
+        return sum([data[1] for data in output_dict.values()])
+
+    output_dict = getAverageValuesForEveryStation(weather_data, output_dict)
+    total_weather = sum([data[1] for data in output_dict.values()])
+    num_stations = len(output_dict)
+    return total_weather / num_stations if num_stations > 0 else 0
+
+
 def fetch_weekly_weather(
     start_date: str,
     storage_json_path: str,
@@ -608,78 +909,83 @@ def fetch_weekly_weather(
 
     # Load storage data if it exists
     try:
-        with open(storage_json_path, "r") as file:
-            storage_data = json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError):
+        storage_data = load_daily_cache(storage_json_path)
+    except json.JSONDecodeError:
         storage_data = {}
 
     # Extract reading unit if available
     readingUnit = storage_data.get("readingUnit", "N/A")
 
-    # Process data for each day in the week
-    for i in range(7):  # Loop for 7 days (Monday to Sunday)
-        date = (datetime.strptime(start_date, "%Y-%m-%d") + timedelta(days=i)).strftime(
-            "%Y-%m-%d"
-        )
-        print(f"Fetching data for {date}...")
+    from bulk_fetch import run_fetch_days
 
-        # Use cached data if available
+    week_dates = [
+        (datetime.strptime(start_date, "%Y-%m-%d") + timedelta(days=i)).strftime("%Y-%m-%d")
+        for i in range(7)  # Loop for 7 days (Monday to Sunday)
+    ]
+
+    def store_day(weather_type, date, weather_data):
+        if not weather_data:
+            # None or a failed fetch; neither is stored, so a failed day is fetched again next time
+            print(f"No data available for {date}.")
+            return
+        # Only the day's value is kept, the raw readings are dropped here
+        storage_data[date] = summarise_day_value(weather_data, station_json_path, data_format)
+        append_daily_cache(storage_json_path, date, storage_data[date])
+
+    for date in week_dates:
         if date in storage_data:
             print(f"Data for {date} already exists. Skipping...")
-            weekly_weather[date] = storage_data[date]
-            continue
 
-        # Fetch new data if not cached
-        weather_data = getDataTypeFromDate(weather_type, date)
-
-        if data_format == "total":
-            output_dict = sumValuesForEveryStation(
-                weather_data, createOutputDict(station_json_path, weather_data)
-            )
-            total_weather = sum([data[1] for data in output_dict.values()])
-            storage_data[date] = total_weather
-            weekly_weather[date] = total_weather
-
-        elif data_format == "average":
-            output_dict = getAverageValuesForEveryStation(
-                weather_data, createOutputDict(station_json_path, weather_data)
-            )
-            total_weather = sum([data[1] for data in output_dict.values()])
-            num_stations = len(output_dict)
-            average_weather = total_weather / num_stations if num_stations > 0 else 0
-            storage_data[date] = average_weather
-            weekly_weather[date] = average_weather
-
-        # Update the storage data file
-        with open(storage_json_path, "w") as file:
-            json.dump(storage_data, file, indent=4)
+    # Fetch every uncached day of the week concurrently, summarising each as it arrives
+    run_fetch_days(
+        [(weather_type, date) for date in week_dates if date not in storage_data],
+        on_day=store_day,
+    )
+
+    for date in week_dates:
+        if date in storage_data:
+            weekly_weather[date] = storage_data[date]
 
     return weekly_weather, readingUnit
 
 
-def plot_weekly_weather(title: str, readingUnit: str, date: str, weather_data: dict):
+def plot_weekly_weather(title: str, readingUnit: str, date: str, weather_data: dict, ax=None):
+    """
+    Bar chart of daily values, labelled with each bar's value.
+
+    Args:
+        ax (matplotlib.axes.Axes): Axes to draw on. Without one a new pyplot figure is
+            created and shown; with one nothing is shown (e.g. for batch_render).
+    """
     # Prepare data for plotting
     days = list(weather_data.keys())
     total_weather = list(weather_data.values())
 
+    show = ax is None
+    if show:
+        import matplotlib.pyplot as plt
+
+        ax = plt.figure(figsize=(10, 6)).gca()
+
     # Plot the bar chart for weekly weather
-    plt.figure(figsize=(10, 6))
-    bars = plt.bar(days, total_weather, color="skyblue")
+    bars = ax.bar(days, total_weather, color="skyblue")
 
     # Add labels and title
-    plt.xlabel("Date")
-    plt.ylabel(readingUnit)
-    plt.title(f"{title} from {days[0]} to {days[-1]}")
+    ax.set_xlabel("Date")
+    ax.set_ylabel(readingUnit)
+    ax.set_title(f"{title} from {days[0]} to {days[-1]}")
 
     # Rotate x-axis labels for readability
-    plt.xticks(rotation=45, ha="right")
+    ax.tick_params(axis="x", labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment("right")
 
     # Adjust layout to prevent label cut-off
-    plt.tight_layout()
+    ax.figure.tight_layout()
 
     # Add weather values on top of the bars
     for bar, value in zip(bars, total_weather):
-        plt.text(
+        ax.text(
             bar.get_x() + bar.get_width() / 2,
             bar.get_height(),
             f"{value:.1f}",
@@ -688,7 +994,8 @@ def plot_weekly_weather(title: str, readingUnit: str, date: str, weather_data: d
         )
 
     # Show the plot
-    plt.show()
+    if show:
+        plt.show()
 
 
 def store_daily_weather(year, month, output_file, weather_type: str, data_format: str, station_json_path: str):
@@ -707,58 +1014,31 @@ def store_daily_weather(year, month, output_file, weather_type: str, data_format
     # Get the number of days in the month
     num_days = monthrange(year, month)[1]
     # Load existing data if the file exists
-    if os.path.exists(output_file):
-        with open(output_file, "r") as file:
-            all_data = json.load(file)
-    else:
-        all_data = {}
+    all_data = load_daily_cache(output_file)
 
-    monthly_weather = {}
-    for day in range(1, num_days + 1):
-        date = f"{year}-{month:02d}-{day:02d}"
-        print(f"Fetching data for {date}...")
+    from bulk_fetch import run_fetch_days
 
-        if date in all_data:
-            print(f"Data for {date} already exists. Skipping...")
-            monthly_weather[date] = all_data[date]
-            continue
-        elif data_format == "average":
-            # Fetch weather data for the date
-            weather_data = getDataTypeFromDate(weather_type, date)
-            if weather_data is None:
-                print(f"No data available for {date}.")
-                continue
+    month_dates = [f"{year}-{month:02d}-{day:02d}" for day in range(1, num_days + 1)]
 
-            output_dict = getAverageValuesForEveryStation(
-                weather_data, createOutputDict(station_json_path, weather_data)
-            )
-
-            # Aggregate average weather for the day
-            total_weather = sum([data[1] for data in output_dict.values()])
-            num_stations = len(output_dict)
-            average_weather = total_weather / num_stations if num_stations > 0 else 0
-            monthly_weather[date] = average_weather
-            all_data[date] = average_weather
-
-        elif data_format == "total":
-            # Fetch rainfall data for the date
-            weather_data = getDataTypeFromDate(weather_type, date)
-            if weather_data is None:
-                print(f"No data available for {date}.")
-                continue
-            output_dict = sumValuesForEveryStation(
-                weather_data, createOutputDict(station_json_path, weather_data)
-            )
+    def store_day(weather_type, date, weather_data):
+        if not weather_data:
+            print(f"No data available for {date}.")
+            return
+        # Only the day's value is kept, the raw readings are dropped here
+        all_data[date] = summarise_day_value(weather_data, station_json_path, data_format)
+        append_daily_cache(output_file, date, all_data[date])
 
-            # Aggregate total rainfall for the day
-            total_weather = sum([data[1] for data in output_dict.values()])
-            monthly_weather[date] = total_weather
-            all_data[date] = total_weather
+    for date in month_dates:
+        if date in all_data:
+            print(f"Data for {date} already exists. Skipping...")
 
-        # Save the updated data to the JSON file
-        with open(output_file, "w") as file:
-            json.dump(all_data, file, indent=4)
+    # Fetch every uncached day of the month concurrently, summarising each as it arrives
+    run_fetch_days(
+        [(weather_type, date) for date in month_dates if date not in all_data],
+        on_day=store_day,
+    )
 
+    monthly_weather = {date: all_data[date] for date in month_dates if date in all_data}
     return monthly_weather
 
 
@@ -767,6 +1047,12 @@ def store_daily_weather(year, month, output_file, weather_type: str, data_format
 # ----------------------------
 
 
+# Daily caches are a JSON snapshot plus an append-only JSON-lines log beside it
+# ("<cache>.json.log"). Each fetched day appends one line instead of rewriting
+# the whole snapshot; compact_daily_cache folds the log back into the snapshot.
+CACHE_LOG_SUFFIX = ".log"
+
+
 def load_daily_cache(cache_filename):
     """
     Loads the JSON file that stores daily data in the form:
@@ -777,34 +1063,175 @@ def load_daily_cache(cache_filename):
       },
       ...
     }
+    and replays any entries appended to its log since the last compaction.
     Returns a dict, or empty if file not found.
     """
-    if not os.path.exists(cache_filename):
-        return {}
-    with open(cache_filename, 'r') as f:
-        return json.load(f)
-    
+    cache = {}
+    if os.path.exists(cache_filename):
+        with open(cache_filename, 'r') as f:
+            cache = json.load(f)
+
+    log_filename = cache_filename + CACHE_LOG_SUFFIX
+    if os.path.exists(log_filename):
+        # Read-only: a torn line left by an interrupted append is skipped here and
+        # repaired by the next append or compaction, that day is simply refetched
+        with open(log_filename, 'r') as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                cache[entry["key"]] = entry["value"]
+    return cache
+
+
+def _repair_cache_log(log_filename):
+    # Cut a torn last line so the next entry starts on a line of its own
+    with open(log_filename, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        if not size:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        # Torn lines are short, scan back for the previous newline
+        position = size
+        while position > 0:
+            start = max(position - 4096, 0)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline != -1:
+                f.truncate(start + newline + 1)
+                return
+            position = start
+        f.truncate(0)
+
+
+def append_daily_cache(cache_filename, key, value):
+    """
+    Appends one cache entry (usually a date) to the cache's log in O(1).
+
+    Args:
+        cache_filename (str): Path of the JSON cache snapshot.
+        key (str): Cache key, e.g. "YYYY-MM-DD".
+        value: JSON-serialisable value stored for the key.
+    """
+    line = json.dumps({"key": key, "value": value}, separators=(",", ":"))
+    log_filename = cache_filename + CACHE_LOG_SUFFIX
+    if os.path.exists(log_filename):
+        _repair_cache_log(log_filename)
+    with open(log_filename, 'a') as f:
+        f.write(line + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
 def save_daily_cache(cache, cache_filename):
     """
-    Saves 'cache' (a dict) to the specified JSON file.
+    Atomically saves 'cache' (a dict) to the specified JSON file and drops its log.
     """
-    with open(cache_filename, 'w') as f:
+    directory = os.path.dirname(os.path.abspath(cache_filename))
+    tmp_filename = os.path.join(directory, f".{os.path.basename(cache_filename)}.tmp")
+    with open(tmp_filename, 'w') as f:
         json.dump(cache, f, indent=2)
-        
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_filename, cache_filename)
+
+    # The snapshot now holds every logged entry
+    log_filename = cache_filename + CACHE_LOG_SUFFIX
+    if os.path.exists(log_filename):
+        os.remove(log_filename)
+
+
+def compact_daily_cache(cache_filename):
+    """
+    Folds the cache's append log into its JSON snapshot.
+
+    Returns:
+        int: Number of entries in the compacted cache.
+    """
+    cache = load_daily_cache(cache_filename)
+    save_daily_cache(cache, cache_filename)
+    return len(cache)
+
+
 # ----------------------------
 # 3) Get or Load Daily Data
 # ----------------------------
 
 
+def accumulate_station_values(readings, totals, counts):
+    """
+    Add one page of readings to running per-station totals and counts, in place.
+    """
+    for entry in readings:
+        for station_reading in entry.get("data", []):
+            station_id = station_reading["stationId"]
+            totals[station_id] = totals.get(station_id, 0.0) + station_reading["value"]
+            counts[station_id] = counts.get(station_id, 0) + 1
+
+
+def summarise_daily_pages(pages, data_format="total"):
+    """
+    Sum or average a day of readings by station, one page at a time.
+
+    Args:
+        pages (iterable): Lists of readings, e.g. each page's "readings" from `iter_reading_pages`.
+        data_format (str): "total" for daily station sums, "average" for daily station means.
+
+    Returns:
+        dict: { stationId: float_daily_value }
+    """
+    daily_dict = {}
+    station_counts = {}
+    for readings in pages:
+        accumulate_station_values(readings, daily_dict, station_counts)
+
+    if data_format == "average":
+        for station_id in daily_dict:
+            daily_dict[station_id] /= station_counts[station_id]
+    return daily_dict
+
+
+def summarise_daily_total(weather_data):
+    """
+    Sum one day of readings by station.
+
+    Args:
+        weather_data (dict): The output from `getDataTypeFromDate`.
+
+    Returns:
+        dict: { stationId: float_daily_total }
+    """
+    return summarise_daily_pages([weather_data.get("readings", [])], "total")
+
+
+def summarise_daily_average(weather_data):
+    """
+    Average one day of readings by station.
+
+    Args:
+        weather_data (dict): The output from `getDataTypeFromDate`.
+
+    Returns:
+        dict: { stationId: float_daily_average }
+    """
+    return summarise_daily_pages([weather_data.get("readings", [])], "average")
+
+
 def get_or_load_daily_total_data(date_str, cache, cache_filename, weather_type: str):
     """
     Returns a dict of { stationId: float_daily_value } for the given date_str.
 
     - Checks if date_str is already in the 'cache' (daily_rainfall_by_location_{year}.json).
     - If found, returns it directly (avoiding a new API call).
-    - Otherwise, calls getDataTypeFromDate("rainfall", date_str), sums up that day's data,
-      stores the result in the cache, writes to file, and returns it.
+    - Otherwise, streams that day's pages from the API and sums them by station as they arrive,
+      stores the result in the cache, appends it to the cache log, and returns it.
     - If no data from the API, store an empty dict for that date_str so we don't repeatedly call.
+    - If the day stops part-way through its pages, return an empty dict without caching it.
     """
     if date_str in cache:
         # Already cached -> no new API call
@@ -812,28 +1239,18 @@ def get_or_load_daily_total_data(date_str, cache, cache_filename, weather_type:
         return cache[date_str]
 
     print(f"[CACHE-MISS] Fetching daily data for {date_str} from API...")
-    # Call your existing helper function
-    weather_data = getDataTypeFromDate(weather_type, date_str)
-    if not weather_data or "stations" not in weather_data:
-        # Store an empty dict to skip future calls for this date
-        cache[date_str] = {}
-        save_daily_cache(cache, cache_filename)
+    # Sum the day by station page by page; no data gives an empty dict so the date is skipped next time
+    try:
+        daily_dict = summarise_daily_pages(
+            (page["readings"] for page in iter_reading_pages(weather_type, date_str)), "total")
+    except TruncatedDayError as e:
+        # Not cached, so the day is fetched again next time
+        print(f"Incomplete day, not cached: {e}")
         return {}
 
-    # We have a day's worth of data -> sum it by station
-    # We'll replicate some logic of sumValuesForEveryStation, but for just a single day.
-    # Or you can adapt your function directly. For clarity, let's do it inline:
-    daily_dict = {}
-    readings = weather_data.get("readings", [])
-    for entry in readings:
-        for station_reading in entry.get("data", []):
-            station_id = station_reading["stationId"]
-            station_val = station_reading["value"]
-            daily_dict[station_id] = daily_dict.get(station_id, 0.0) + station_val
-
     # Store in cache
     cache[date_str] = daily_dict
-    save_daily_cache(cache, cache_filename)
+    append_daily_cache(cache_filename, date_str, daily_dict)
     return daily_dict
 
 # ----------------------------
@@ -846,29 +1263,13 @@ def get_or_load_daily_average_data(date_str, cache, cache_filename, data_type):
         return cache[date_str]
 
     print(f"[CACHE-MISS] Fetching daily data for {date_str} from API...")
-    weather_data = getDataTypeFromDate(data_type, date_str)
-    if not weather_data or "readings" not in weather_data:
-        cache[date_str] = {}
-        save_daily_cache(cache, cache_filename)
+    try:
+        daily_dict = summarise_daily_pages(
+            (page["readings"] for page in iter_reading_pages(data_type, date_str)), "average")
+    except TruncatedDayError as e:
+        print(f"Incomplete day, not cached: {e}")
         return {}
 
-    daily_dict = {}
-    station_counts = {}
-    readings = weather_data.get("readings", [])
-    for entry in readings:
-        for station_reading in entry.get("data", []):
-            station_id = station_reading["stationId"]
-            station_val = station_reading["value"]
-            if station_id not in daily_dict:
-                daily_dict[station_id] = 0.0
-                station_counts[station_id] = 0
-            daily_dict[station_id] += station_val
-            station_counts[station_id] += 1
-
-    # Calculate daily averages for each station
-    for station_id in daily_dict:
-        daily_dict[station_id] /= station_counts[station_id]
-
     cache[date_str] = daily_dict
-    save_daily_cache(cache, cache_filename)
+    append_daily_cache(cache_filename, date_str, daily_dict)
     return daily_dict
\ No newline at end of file
@@ -0,0 +1,217 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.ipc as ipc
+
+from bulk_fetch import _to_date
+from helper_functions import DATA_DIR
+
+# Daily station records from 2009 onwards (station names, "na" for missing values).
+# The parsed table is cached beside it as an uncompressed Arrow IPC file that is
+# memory-mapped on load; it is rebuilt whenever the CSV's mtime or size changes.
+CSV_FILE = os.path.join(DATA_DIR, "HistoricalDailyWeatherRecords.csv")
+CACHE_SUFFIX = ".arrow"
+
+VALUE_COLUMNS = [
+    "daily_rainfall_total",
+    "highest_30_min_rainfall",
+    "highest_60_min_rainfall",
+    "highest_120_min_rainfall",
+    "mean_temperature",
+    "maximum_temperature",
+    "minimum_temperature",
+    "mean_wind_speed",
+    "max_wind_speed",
+]
+
+
+def cache_path(csv_file=CSV_FILE):
+    directory, name = os.path.split(csv_file)
+    return os.path.join(directory, f".{os.path.splitext(name)[0]}{CACHE_SUFFIX}")
+
+
+def _source_key(csv_file):
+    stat = os.stat(csv_file)
+    return {b"source_mtime_ns": str(stat.st_mtime_ns).encode(), b"source_size": str(stat.st_size).encode()}
+
+
+def parse_csv(csv_file=CSV_FILE):
+    """
+    Parse the CSV into a typed table sorted by (station, date).
+
+    "na" (and empty cells) become NaN in float32 value columns; station names are
+    dictionary-encoded.
+    """
+    convert_options = pa_csv.ConvertOptions(
+        column_types={"date": pa.date32(), "station": pa.string(),
+                      **{column: pa.float32() for column in VALUE_COLUMNS}},
+        null_values=["na", ""],
+        strings_can_be_null=False,
+    )
+    table = pa_csv.read_csv(csv_file, convert_options=convert_options)
+    table = table.take(pc.sort_indices(table, [("station", "ascending"), ("date", "ascending")]))
+
+    # Encoded after sorting, so station codes follow station order; NaN instead of nulls
+    # so the value columns map straight onto NumPy arrays
+    return pa.table({
+        "station": pc.dictionary_encode(table["station"]),
+        "date": table["date"],
+        **{column: pc.fill_null(table[column], np.float32(np.nan)) for column in VALUE_COLUMNS},
+    })
+
+
+def load_table(csv_file=CSV_FILE, rebuild=False):
+    """
+    The parsed records, from the binary cache when it matches the CSV.
+
+    Returns:
+        pyarrow.Table: station, date and the float32 VALUE_COLUMNS.
+    """
+    path = cache_path(csv_file)
+    key = _source_key(csv_file)
+    if not rebuild and os.path.exists(path):
+        table = ipc.open_file(pa.memory_map(path, "r")).read_all()
+        metadata = table.schema.metadata or {}
+        if all(metadata.get(name) == value for name, value in key.items()):
+            return table
+
+    table = parse_csv(csv_file)
+    table = table.replace_schema_metadata(key)
+    temp_file = path + ".tmp"
+    with pa.OSFile(temp_file, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            # One record batch so every column is a single contiguous buffer
+            writer.write_table(table.combine_chunks(), max_chunksize=max(table.num_rows, 1))
+    os.replace(temp_file, path)
+    return table
+
+
+class HistoricalRecords:
+    """
+    The historical daily records as NumPy columns with a (station, date) index.
+
+    Rows are sorted by station then date, so each station is one contiguous run and a date
+    range within it is found with two binary searches. Value columns are zero-copy views of
+    the memory-mapped cache.
+    """
+
+    def __init__(self, table):
+        table = table.combine_chunks()
+        station = table["station"].chunk(0) if table.num_rows else pa.array([], pa.dictionary(pa.int32(), pa.string()))
+        self.table = table
+        self.stations = station.dictionary.to_pylist()
+        station_codes = station.indices.to_numpy()
+        self.dates = table["date"].to_numpy().astype("datetime64[D]") if table.num_rows else np.empty(0, "datetime64[D]")
+        self.columns = {
+            column: table[column].chunk(0).to_numpy() if table.num_rows else np.empty(0, np.float32)
+            for column in VALUE_COLUMNS
+        }
+
+        # Codes are assigned in first-appearance order, which after sorting is station order
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(station_codes)) + 1)) if len(station_codes) else []
+        ends = np.append(starts[1:], len(station_codes)) if len(station_codes) else []
+        self.station_rows = {
+            self.stations[station_codes[start]]: (int(start), int(end)) for start, end in zip(starts, ends)
+        }
+
+    def covers(self, start, end):
+        """Whether the records span every date from start to end (inclusive)."""
+        if not len(self.dates):
+            return False
+        return bool(self.dates.min() <= np.datetime64(_to_date(start), "D")
+                    and np.datetime64(_to_date(end), "D") <= self.dates.max())
+
+    def rows(self, station, start=None, end=None):
+        """Row slice of one station between start and end dates (inclusive)."""
+        first, last = self.station_rows.get(station, (0, 0))
+        dates = self.dates[first:last]
+        lo = np.searchsorted(dates, np.datetime64(_to_date(start), "D")) if start is not None else 0
+        hi = np.searchsorted(dates, np.datetime64(_to_date(end), "D"), side="right") if end is not None else len(dates)
+        return slice(first + lo, first + hi)
+
+    def station_series(self, station, column, start=None, end=None):
+        """
+        Daily values of one station.
+
+        Returns:
+            tuple: (datetime64[D] dates, float32 values with NaN for missing days), both views.
+        """
+        rows = self.rows(station, start, end)
+        return self.dates[rows], self.columns[column][rows]
+
+    def query(self, stations=None, start=None, end=None, columns=None):
+        """
+        Rows for some stations over a date range.
+
+        Args:
+            stations (list): Station names, defaults to every station.
+            start, end (str | date | datetime): Inclusive date bounds, None for open.
+            columns (list): Value columns to return, defaults to VALUE_COLUMNS.
+
+        Returns:
+            dict: {"station": list of names, "date": datetime64[D] array, column: float32 array, ...}
+        """
+        columns = columns or VALUE_COLUMNS
+        slices = [self.rows(station, start, end) for station in (stations or self.stations)]
+        names = []
+        for station, rows in zip(stations or self.stations, slices):
+            names.extend([station] * (rows.stop - rows.start))
+        result = {"station": names, "date": np.concatenate([self.dates[rows] for rows in slices] or [self.dates[:0]])}
+        for column in columns:
+            result[column] = np.concatenate([self.columns[column][rows] for rows in slices] or [self.columns[column][:0]])
+        return result
+
+    def yearly(self, column, stat="mean", stations=None, start=None, end=None):
+        """
+        Per-station yearly statistic of a column, skipping missing days.
+
+        Args:
+            stat (str): "sum", "mean", "count", "min" or "max".
+
+        Returns:
+            dict: {station: {year: value}}, years with no data are left out.
+        """
+        from cube_store import reduce
+
+        trends = {}
+        for station in stations or self.stations:
+            dates, values = self.station_series(station, column, start, end)
+            if not len(dates):
+                continue
+            years = dates.astype("datetime64[Y]").astype(int) + 1970
+            starts = np.concatenate(([0], np.flatnonzero(np.diff(years)) + 1))
+            ends = np.append(starts[1:], len(years))
+            by_year = {}
+            for first, last in zip(starts, ends):
+                value = reduce(values[first:last], stat, axis=0)
+                if stat == "count" or not np.isnan(value):
+                    by_year[int(years[first])] = float(value)
+            trends[station] = by_year
+        return trends
+
+
+_records = {}
+
+
+def get_historical_records(csv_file=CSV_FILE):
+    """Return the memoized HistoricalRecords for a CSV, parsing it only when the cache is stale."""
+    key = (csv_file, _source_key(csv_file)[b"source_mtime_ns"])
+    if key not in _records:
+        _records.clear()
+        _records[key] = HistoricalRecords(load_table(csv_file))
+    return _records[key]
+
+
+if __name__ == "__main__":
+    start_time = datetime.now()
+    records = get_historical_records()
+    print(f"Loaded {records.table.num_rows} records for {len(records.stations)} stations "
+          f"in {datetime.now() - start_time}")
+
+    for station, by_year in records.yearly("daily_rainfall_total", "sum").items():
+        for year, total in by_year.items():
+            print(f"{station} {year}: {total:.1f} mm")
@@ -0,0 +1,210 @@
+import numpy as np
+
+from timestamps import SECONDS_PER_HOUR, format_hour_labels, hour_bucket, to_local_seconds
+
+
+def flatten_readings(readings, station_ids=None):
+    """
+    Flatten API readings into columnar NumPy arrays.
+
+    Args:
+        readings (list): The "readings" list from the API, each entry holding a
+            "timestamp" and a "data" list of {"stationId", "value"}.
+        station_ids (list): Optional known station ids. Codes follow this order and
+            unseen stations are appended in order of first appearance.
+
+    Returns:
+        dict: {
+            "timestamps": int64 local wall-clock epoch seconds per data point,
+            "stations": int32 station code per data point,
+            "values": float64 value per data point,
+            "station_ids": list mapping station code -> stationId,
+        }
+    """
+    station_ids = list(station_ids) if station_ids else []
+    station_codes = {station_id: code for code, station_id in enumerate(station_ids)}
+
+    entry_timestamps = []
+    entry_sizes = []
+    codes = []
+    values = []
+    for entry in readings:
+        data_points = entry["data"]
+        entry_timestamps.append(entry["timestamp"])
+        entry_sizes.append(len(data_points))
+        for data_point in data_points:
+            station_id = data_point["stationId"]
+            code = station_codes.get(station_id)
+            if code is None:
+                code = station_codes[station_id] = len(station_ids)
+                station_ids.append(station_id)
+            codes.append(code)
+            values.append(data_point["value"])
+
+    # Keep the local wall-clock time, hours are bucketed as the API reports them
+    entry_seconds = to_local_seconds(entry_timestamps)
+
+    return {
+        "timestamps": np.repeat(entry_seconds, entry_sizes),
+        "stations": np.array(codes, dtype=np.int32),
+        "values": np.array(values, dtype=np.float64),
+        "station_ids": station_ids,
+    }
+
+
+def aggregate_hourly(columns):
+    """
+    Reduce flattened readings to per-station hourly statistics in one grouped pass.
+
+    Args:
+        columns (dict): The output from `flatten_readings`.
+
+    Returns:
+        dict: One row per (hour, station) sorted by hour then station code: {
+            "hours": int64 epoch seconds at the start of each hour,
+            "stations": int32 station codes,
+            "sum", "mean", "min", "max": float64 arrays,
+            "count": int64 array,
+            "station_ids": list mapping station code -> stationId,
+        }
+    """
+    n_stations = max(len(columns["station_ids"]), 1)
+    hours = hour_bucket(columns["timestamps"]) // SECONDS_PER_HOUR
+    keys = hours * n_stations + columns["stations"]
+
+    # Sort once, then every statistic is a reduceat over the same group boundaries
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = _group_starts(sorted_keys)
+    sorted_values = columns["values"][order]
+
+    if len(starts):
+        total = np.add.reduceat(sorted_values, starts)
+        minimum = np.minimum.reduceat(sorted_values, starts)
+        maximum = np.maximum.reduceat(sorted_values, starts)
+        count = np.diff(np.append(starts, len(sorted_keys)))
+    else:
+        total = minimum = maximum = np.empty(0, dtype=np.float64)
+        count = np.empty(0, dtype=np.int64)
+
+    return _grouped_aggregate(sorted_keys[starts], n_stations, total, count, minimum, maximum,
+                              columns["station_ids"])
+
+
+def merge_hourly(aggregates, station_ids):
+    """
+    Combine hourly aggregates of parts of the same readings (e.g. API pages).
+
+    Args:
+        aggregates (list): Outputs of `aggregate_hourly` whose station codes all follow
+            `station_ids` (codes only ever appended, as `flatten_readings` does).
+        station_ids (list): The shared station code -> stationId list.
+
+    Returns:
+        dict: The same structure as `aggregate_hourly` over all the parts.
+    """
+    n_stations = max(len(station_ids), 1)
+    hours = np.concatenate([aggregate["hours"] for aggregate in aggregates] or [np.empty(0, np.int64)])
+    stations = np.concatenate([aggregate["stations"] for aggregate in aggregates] or [np.empty(0, np.int32)])
+    keys = hours // SECONDS_PER_HOUR * n_stations + stations
+
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = _group_starts(sorted_keys)
+
+    def combine(stat, ufunc, dtype):
+        values = np.concatenate([aggregate[stat] for aggregate in aggregates] or [np.empty(0, dtype)])
+        return ufunc.reduceat(values[order], starts) if len(starts) else np.empty(0, dtype)
+
+    return _grouped_aggregate(
+        sorted_keys[starts],
+        n_stations,
+        combine("sum", np.add, np.float64),
+        combine("count", np.add, np.int64),
+        combine("min", np.minimum, np.float64),
+        combine("max", np.maximum, np.float64),
+        station_ids,
+    )
+
+
+class HourlyAggregator:
+    """
+    Fold pages of readings into hourly statistics without keeping the readings.
+
+    Each page is reduced to its (hour, station) groups on arrival; partial results are
+    merged every few pages so memory stays at about one day of hourly groups.
+    """
+
+    MERGE_EVERY = 8
+
+    def __init__(self, station_ids=None):
+        self.station_ids = list(station_ids) if station_ids else []
+        self.partials = []
+
+    def add(self, readings):
+        """Aggregate one page of API readings."""
+        columns = flatten_readings(readings, self.station_ids)
+        self.station_ids = columns["station_ids"]
+        self.partials.append(aggregate_hourly(columns))
+        if len(self.partials) >= self.MERGE_EVERY:
+            self.partials = [merge_hourly(self.partials, self.station_ids)]
+        return self
+
+    def result(self):
+        """The `aggregate_hourly` structure over every page added so far."""
+        return merge_hourly(self.partials, self.station_ids)
+
+
+def _group_starts(sorted_keys):
+    if not len(sorted_keys):
+        return np.empty(0, dtype=np.int64)
+    return np.concatenate(([0], np.flatnonzero(np.diff(sorted_keys)) + 1))
+
+
+def _grouped_aggregate(group_keys, n_stations, total, count, minimum, maximum, station_ids):
+    return {
+        "hours": (group_keys // n_stations) * SECONDS_PER_HOUR,
+        "stations": (group_keys % n_stations).astype(np.int32),
+        "sum": total,
+        "mean": total / count if len(count) else total,
+        "count": count,
+        "min": minimum,
+        "max": maximum,
+        "station_ids": station_ids,
+    }
+
+
+def hourly_readings_view(aggregate, stat="sum"):
+    """
+    Present an hourly aggregate in the dict shape returned by getTotalDataHourly.
+
+    Args:
+        aggregate (dict): The output from `aggregate_hourly`.
+        stat (str): Which statistic to expose: "sum", "mean", "count", "min" or "max".
+
+    Returns:
+        list: [{"timestamp": "YYYY-MM-DD HH:00", "data": [{"stationId", "value"}, ...]}, ...]
+    """
+    hours = aggregate["hours"]
+    if not len(hours):
+        return []
+
+    station_ids = aggregate["station_ids"]
+    values = aggregate[stat].tolist()
+    stations = aggregate["stations"].tolist()
+
+    # Format each distinct hour once instead of once per reading
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(hours)) + 1))
+    ends = np.append(starts[1:], len(hours))
+    labels = format_hour_labels(hours[starts])
+
+    formatted_readings = []
+    for label, start, end in zip(labels, starts.tolist(), ends.tolist()):
+        formatted_readings.append({
+            "timestamp": label,
+            "data": [
+                {"stationId": station_ids[stations[i]], "value": values[i]}
+                for i in range(start, end)
+            ],
+        })
+    return formatted_readings
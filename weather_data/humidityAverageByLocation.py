@@ -1,5 +1,3 @@
-import json
-import os
 from datetime import datetime, timedelta
 
 import matplotlib.pyplot as plt
@@ -8,13 +6,14 @@ import matplotlib.pyplot as plt
 # 1) Import your helper funcs
 # ----------------------------
 from helper_functions import cleanupStationNames  # returns [locations],[rain_values]
-from helper_functions import getDataTypeFromDate  # Already defined, uses pagination
+from helper_functions import get_station_metadata  # TTL-cached station list
 from helper_functions import (
     createOutputDict,
     get_or_load_daily_average_data,
     import_dictionaries,
     load_daily_cache,
 )
+from bulk_fetch import backfill_daily_cache
 
 # ----------------------------
 # 4) Main Logic Example
@@ -31,11 +30,19 @@ if __name__ == "__main__":
 
     daily_cache = load_daily_cache(f"daily_{data_type}_by_location_{year}.json")
 
-    initial_data = getDataTypeFromDate(data_type, start_date.strftime("%Y-%m-%d"))
-    if not initial_data:
-        initial_data = {"stations": []}
+    # Fetch every uncached day of the range concurrently
+    backfill_daily_cache(
+        data_type,
+        start_date,
+        end_date,
+        daily_cache,
+        f"daily_{data_type}_by_location_{year}.json",
+        data_format="average",
+    )
 
-    yearly_output_dict = createOutputDict(f"{data_type}_stations.json", initial_data)
+    # Station metadata comes from the TTL cache instead of a live call for the first day
+    stations_list = get_station_metadata(data_type)
+    yearly_output_dict = createOutputDict(None, {"stations": stations_list})
 
     station_day_counts = {st_id: 0 for st_id in yearly_output_dict.keys()}
 
@@ -63,12 +70,6 @@ if __name__ == "__main__":
         count = station_day_counts.get(st_id, 0)
         values[1] = total_value / count if count > 0 else 0
 
-    if os.path.exists(f"{data_type}_stations.json"):
-        with open(f"{data_type}_stations.json", "r") as f:
-            stations_list = json.load(f)
-    else:
-        stations_list = []
-
     locations, average_values = cleanupStationNames(stations_list, yearly_output_dict)
 
     location_to_avg_value = dict(zip(locations, average_values))
@@ -120,7 +121,6 @@ if __name__ == "__main__":
     )
     plt.subplots_adjust(right=0.8)
 
-
     # Plot 2: Average humidity per region
     region_averages = {}
     for zone_name, district_locations in district_map.items():
@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt
 from helper_functions import getDataTypeFromDate, createOutputDict, getAverageValuesForEveryStation, import_dictionaries
+from station_registry import get_station_registry
 
 def calculateAverageHumidityByRegion(date, district_map):
     """
@@ -18,19 +19,19 @@ def calculateAverageHumidityByRegion(date, district_map):
         return {}
 
     output_dict = getAverageValuesForEveryStation(humidity_data, createOutputDict("humidity_stations.json", humidity_data))
-    locations = [data[0] for data in output_dict.values()]
-    humidity_values = [data[1] for data in output_dict.values()]
 
     # Prepare a dictionary to store total humidity and count by region
     region_totals = {region: [0, 0] for region in district_map.keys()}  # [total_humidity, station_count]
 
-    # Aggregate humidity values by region
-    for zone, district_locations in district_map.items():
-        for location in district_locations:
-            if location in locations:
-                humidity_index = locations.index(location)
-                region_totals[zone][0] += humidity_values[humidity_index]
-                region_totals[zone][1] += 1
+    # Aggregate humidity values by region, each location counted once
+    registry = get_station_registry(district_map)
+    seen_locations = set()
+    for location, value in output_dict.values():
+        zone = registry.region_for_name(location)
+        if zone in region_totals and location not in seen_locations:
+            seen_locations.add(location)
+            region_totals[zone][0] += value
+            region_totals[zone][1] += 1
 
     # Calculate average humidity for each region
     region_averages = {
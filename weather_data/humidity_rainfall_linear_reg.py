@@ -1,3 +1,5 @@
+import sys
+
 import matplotlib.pyplot as plt
 import numpy as np
 from scipy.stats import pearsonr
@@ -88,6 +90,15 @@ def plotLinearRegression(
 
 
 if __name__ == "__main__":
+    # python humidity_rainfall_linear_reg.py START END fits over every day in the range from the
+    # daily caches, updating the saved model with only the days it has not seen
+    if len(sys.argv) > 2:
+        from streaming_regression import fit_range
+
+        model = fit_range(["humidity", "windspeed", "temperature"], "rainfall", sys.argv[1], sys.argv[2])
+        print(model.equation())
+        sys.exit()
+
     # Specify the date for data
     date = "2025-01-05"
 
@@ -0,0 +1,190 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+
+from bulk_fetch import _to_date, dateRange, run_fetch_days
+from helper_functions import DATA_DIR, get_http_client_stats
+from hourly_aggregation import flatten_readings
+
+# Raw readings as Parquet, one file per (data type, day):
+#   archive/<data type>/year=YYYY/month=M/<YYYY-MM-DD>.parquet
+# The month directory is not zero-padded (month=1 ... month=12).
+# Override the location with WEATHERSG_ARCHIVE_DIR.
+ARCHIVE_DIR = os.environ.get("WEATHERSG_ARCHIVE_DIR", os.path.join(DATA_DIR, "archive"))
+
+ARCHIVE_SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("ts", pa.timestamp("s")),  # Local wall-clock time, as the API reports it
+    ("station", pa.dictionary(pa.int32(), pa.string())),
+    ("value", pa.float32()),
+])
+
+PARTITIONING = ds.partitioning(pa.schema([("year", pa.int16()), ("month", pa.int8())]), flavor="hive")
+
+
+def archive_path(data_type, date):
+    """Path of the Parquet file holding one day of a data type."""
+    return os.path.join(ARCHIVE_DIR, data_type, f"year={date[:4]}", f"month={int(date[5:7])}", f"{date}.parquet")
+
+
+def readings_to_table(date, readings):
+    """
+    Convert one day of API readings to an Arrow table in the archive schema.
+
+    Station ids are dictionary-encoded straight from the station codes of `flatten_readings`.
+    """
+    columns = flatten_readings(readings)
+    n_rows = len(columns["values"])
+    return pa.table({
+        "date": pa.array(np.full(n_rows, np.datetime64(date, "D")), pa.date32()),
+        "ts": pa.array(columns["timestamps"].astype("datetime64[s]"), pa.timestamp("s")),
+        "station": pa.DictionaryArray.from_arrays(
+            pa.array(columns["stations"], pa.int32()), pa.array(columns["station_ids"], pa.string())
+        ),
+        "value": pa.array(columns["values"], pa.float32()),
+    }, schema=ARCHIVE_SCHEMA)
+
+
+def write_day(data_type, date, readings):
+    """
+    Write one day of readings to the archive, replacing any earlier copy atomically.
+
+    Returns:
+        int: Number of rows written.
+    """
+    table = readings_to_table(date, readings)
+    path = archive_path(data_type, date)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Dot-prefixed so a scan never picks up a half-written file
+    temp_file = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.tmp")
+    pq.write_table(table, temp_file, use_dictionary=["station"], compression="zstd")
+    os.replace(temp_file, path)
+    return table.num_rows
+
+
+def export_range(data_types, start, end, overwrite=False):
+    """
+    Fetch every day between start and end for each data type and archive it.
+
+    Days already in the archive are skipped unless overwrite is set.
+
+    Returns:
+        dict: {data_type: rows written}.
+    """
+    pairs = [
+        (data_type, date) for date in dateRange(start, end) for data_type in data_types
+        if overwrite or not os.path.exists(archive_path(data_type, date))
+    ]
+    rows_written = {data_type: 0 for data_type in data_types}
+
+    def archive_day(data_type, date, weather_data):
+        if weather_data:
+            rows_written[data_type] += write_day(data_type, date, weather_data["readings"])
+
+    if pairs:
+        print(f"Archiving {len(pairs)} days to {ARCHIVE_DIR}...")
+        run_fetch_days(pairs, on_day=archive_day)
+        print(f"HTTP client stats: {get_http_client_stats()}")
+    return rows_written
+
+
+def _month_filter(start, end):
+    # Lets the scanner skip whole year=/month= directories before opening any file
+    start_key = start.year * 12 + start.month - 1
+    end_key = end.year * 12 + end.month - 1
+    month_key = ds.field("year").cast(pa.int32()) * 12 + ds.field("month").cast(pa.int32()) - 1
+    return (month_key >= start_key) & (month_key <= end_key)
+
+
+def scan(data_type, start=None, end=None, stations=None, columns=None):
+    """
+    Read archived readings with the date range and stations pushed down into the scan.
+
+    Args:
+        data_type (str): The type of data (e.g. "rainfall", "wind-speed").
+        start (str | date | datetime): First date (inclusive), None for no lower bound.
+        end (str | date | datetime): Last date (inclusive), None for no upper bound.
+        stations (list): Optional station ids to keep.
+        columns (list): Optional columns to read, defaults to all of them.
+
+    Returns:
+        pyarrow.Table: Matching rows with date, ts, station and value columns.
+    """
+    root = os.path.join(ARCHIVE_DIR, data_type)
+    if not os.path.isdir(root):
+        return ARCHIVE_SCHEMA.empty_table().select(columns or ARCHIVE_SCHEMA.names)
+
+    dataset = ds.dataset(
+        root,
+        schema=ARCHIVE_SCHEMA.append(pa.field("year", pa.int16())).append(pa.field("month", pa.int8())),
+        format="parquet",
+        partitioning=PARTITIONING,
+        # Column chunks are read straight from the page cache
+        filesystem=pafs.LocalFileSystem(use_mmap=True),
+    )
+
+    expression = None
+    if start is not None or end is not None:
+        start_date = _to_date(start) if start is not None else datetime.min.date()
+        end_date = _to_date(end) if end is not None else datetime.max.date()
+        expression = _month_filter(start_date, end_date) & \
+            (ds.field("date") >= pa.scalar(start_date, pa.date32())) & \
+            (ds.field("date") <= pa.scalar(end_date, pa.date32()))
+    if stations is not None:
+        station_filter = ds.field("station").isin(list(stations))
+        expression = station_filter if expression is None else expression & station_filter
+
+    return dataset.to_table(columns=columns or ARCHIVE_SCHEMA.names, filter=expression)
+
+
+def station_totals(data_type, start=None, end=None, stations=None, stat="sum"):
+    """
+    Aggregate archived readings per station over a date range.
+
+    Args:
+        stat (str): Arrow aggregation: "sum", "mean", "count", "min" or "max".
+
+    Returns:
+        dict: {stationId: value}.
+    """
+    table = scan(data_type, start, end, stations, columns=["station", "value"])
+    grouped = table.group_by("station").aggregate([("value", stat)])
+    return dict(zip(
+        grouped["station"].to_pylist(),
+        grouped[f"value_{stat}"].cast(pa.float64()).to_pylist(),
+    ))
+
+
+def daily_station_totals(data_type, start=None, end=None, stations=None, stat="sum"):
+    """
+    Aggregate archived readings per day and station, in the shape of the daily caches.
+
+    Returns:
+        dict: {"YYYY-MM-DD": {stationId: value}}.
+    """
+    table = scan(data_type, start, end, stations, columns=["date", "station", "value"])
+    grouped = table.group_by(["date", "station"]).aggregate([("value", stat)])
+
+    daily = {}
+    dates = pc.strftime(grouped["date"].cast(pa.timestamp("s")), format="%Y-%m-%d").to_pylist()
+    for date, station_id, value in zip(
+        dates, grouped["station"].to_pylist(), grouped[f"value_{stat}"].cast(pa.float64()).to_pylist()
+    ):
+        daily.setdefault(date, {})[station_id] = value
+    return daily
+
+
+if __name__ == "__main__":
+    # Archive a year of rainfall, then time a year-long per-station total from disk
+    year = 2024
+    export_range(["rainfall"], f"{year}-01-01", f"{year}-12-31")
+
+    start_time = datetime.now()
+    totals = station_totals("rainfall", f"{year}-01-01", f"{year}-12-31")
+    print(f"Yearly rainfall totals for {len(totals)} stations in {datetime.now() - start_time}")
@@ -1,14 +1,7 @@
-from datetime import datetime
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.stats import pearsonr
-from helper_functions import import_dictionaries, getTotalDataHourly, formatTotalHourlyDataByRegion
-
-def convert_to_datetime(aggregated_data):
-    return {
-        datetime.strptime(ts, "%Y-%m-%d %H:%M"): data
-        for ts, data in aggregated_data.items()
-    }
+from correlation_engine import build_panel, region_correlations
+from helper_functions import import_dictionaries, getTotalDataHourly, formatTotalHourlyDataByRegion, convert_to_datetime
 
 
 def calculate_hourly_averages(aggregated_data):
@@ -36,13 +29,12 @@ def plot_hourly_trends(aggregated_windspeed, aggregated_rainfall, region):
 
 
 def calculate_correlations(windspeed_data, rainfall_data):
-    correlations = {}
-    for region in district_map.keys():
-        windspeed_values = [windspeed_data[ts].get(region, 0) for ts in windspeed_data.keys()]
-        rainfall_values = [rainfall_data[ts].get(region, 0) for ts in rainfall_data.keys()]
-        if len(windspeed_values) > 1 and len(rainfall_values) > 1:
-            correlations[region], _ = pearsonr(windspeed_values, rainfall_values)
-    return correlations
+    # Aligned on one time index with missing hours masked, all regions in one matrix pass
+    panel = build_panel({"windspeed": windspeed_data, "rainfall": rainfall_data}, regions=list(district_map))
+    return {
+        region: result["r"]
+        for region, result in region_correlations(panel, "windspeed", "rainfall").items()
+    }
 
 def detect_extreme_events(aggregated_data, threshold):
     extreme_events = []
@@ -79,8 +71,8 @@ if __name__ == "__main__":
     print(f"Peak Windspeed: {hourly_avg_windspeed[peak_windspeed]} at {peak_windspeed}")
     print(f"Peak Rainfall: {hourly_avg_rainfall[peak_rainfall]} at {peak_rainfall}")
 
-    region_correlations = calculate_correlations(aggregated_windspeed_data, aggregated_rainfall_data)
-    for region, corr in region_correlations.items():
+    correlations = calculate_correlations(aggregated_windspeed_data, aggregated_rainfall_data)
+    for region, corr in correlations.items():
         print(f"Region: {region}, Correlation: {corr:.2f}")
 
     for region in district_map.keys():
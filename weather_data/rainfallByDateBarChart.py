@@ -1,6 +1,5 @@
-import requests
 import matplotlib.pyplot as plt
-from helper_functions import getDataTypeFromDate, import_dictionaries, sumValuesForEveryStation, createOutputDict, cleanupStationNames
+from helper_functions import http_get, getDataTypeFromDate, import_dictionaries, sumValuesForEveryStation, createOutputDict, cleanupStationNames
 import json
 
 '''
@@ -12,7 +11,7 @@ def getStationsJson():
     # Create the URL to get station list
     locations_url = f"https://api.data.gov.sg/v1/environment/rainfall"
     # Fetch locations list from the API
-    locations_response = requests.get(locations_url)
+    locations_response = http_get(locations_url)
     locations_list = locations_response.json()['metadata']['stations']
     return locations_list
 
@@ -1,21 +1,31 @@
-import requests
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import matplotlib.pyplot as plt
+import numpy as np
 from matplotlib.animation import FuncAnimation
-import geopandas as gpd
-from shapely.geometry import Point
-import os
+
+from helper_functions import http_get
+from sg_boundary import draw_boundary, load_boundary_arrays
+
+# Marker area per mm of rainfall
+MARKER_SCALE = 10
 
 
 # Helper functions
 def getRainfallByDateJson(date):
     url = f"https://api.data.gov.sg/v1/environment/rainfall?date={date}"
-    response = requests.get(url)
+    response = http_get(url)
     return response.json()
 
 
 def getStationsJson():
     url = "https://api.data.gov.sg/v1/environment/rainfall"
-    response = requests.get(url)
+    response = http_get(url)
     return response.json()['metadata']['stations']
 
 
@@ -41,6 +51,146 @@ def createTotalRainfallDict(rainfall_data):
     return station_rainfall
 
 
+def buildRainfallFrames(rainfall_by_time, coordinates):
+    """
+    Precompute the animation as one array per quantity.
+
+    Args:
+        rainfall_by_time (list): The output from `createRainfallDictByTime`.
+        coordinates (dict): station_id -> (lon, lat).
+
+    Returns:
+        dict: {
+            "times": list of "HH:MM:SS" labels per frame,
+            "station_ids": fixed station order,
+            "offsets": float64 [n_stations, 2] lon/lat,
+            "sizes": float32 [n_frames, n_stations] marker areas, 0 where a station did not report,
+        }
+    """
+    station_ids = list(coordinates)
+    columns = {station_id: column for column, station_id in enumerate(station_ids)}
+    rainfall = np.zeros((len(rainfall_by_time), len(station_ids)), dtype=np.float32)
+    for frame, (_, station_readings) in enumerate(rainfall_by_time):
+        for station_id, value in station_readings.items():
+            column = columns.get(station_id)
+            if column is not None:
+                rainfall[frame, column] = value
+
+    return {
+        "times": [time_label for time_label, _ in rainfall_by_time],
+        "station_ids": station_ids,
+        "offsets": np.array([coordinates[station_id] for station_id in station_ids], dtype=np.float64).reshape(-1, 2),
+        "sizes": rainfall * MARKER_SCALE,
+    }
+
+
+def createRainfallMap(ax, frames, date):
+    """
+    Draw the boundary and the fixed station scatter once.
+
+    Returns:
+        tuple: (scatter, time_text), the only artists a frame update touches.
+    """
+    draw_boundary(ax)
+    scatter = ax.scatter(frames["offsets"][:, 0], frames["offsets"][:, 1],
+                         s=np.zeros(len(frames["station_ids"])), c='blue', alpha=0.6)
+    time_text = ax.text(
+        0.02, 0.95, '', transform=ax.transAxes, fontsize=12, weight='bold')
+    ax.set_title(f"Rainfall on {date} in Singapore (Animated)", fontsize=16)
+    ax.set_xlabel("Longitude")
+    ax.set_ylabel("Latitude")
+    ax.grid(True)
+    return scatter, time_text
+
+
+def showFrame(frames, frame, scatter, time_text):
+    # A frame is just a new size vector and label
+    scatter.set_sizes(frames["sizes"][frame])
+    time_text.set_text(f"Time: {frames['times'][frame]}")
+    return scatter, time_text
+
+
+# ----------------------------
+# Offline export
+# ----------------------------
+
+_export = {}
+
+
+def _init_export_worker(frames, date, frame_dir, dpi):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    # Each worker builds the map once and then only swaps sizes per frame
+    fig = Figure(figsize=(10, 10), dpi=dpi)
+    FigureCanvasAgg(fig)
+    scatter, time_text = createRainfallMap(fig.add_subplot(), frames, date)
+    _export.update(frames=frames, fig=fig, scatter=scatter, time_text=time_text, frame_dir=frame_dir)
+
+
+def _render_frames(frame_indices):
+    for frame in frame_indices:
+        showFrame(_export["frames"], frame, _export["scatter"], _export["time_text"])
+        _export["fig"].savefig(os.path.join(_export["frame_dir"], f"frame_{frame:05d}.png"))
+    return len(frame_indices)
+
+
+def exportRainfallAnimation(frames, date, output_file, fps=20, workers=None, dpi=100):
+    """
+    Render the animation offline to an MP4 (needs ffmpeg on PATH) or GIF (Pillow).
+
+    Frames are rendered to PNGs in parallel worker processes, then encoded in order.
+
+    Returns:
+        dict: {"frames", "render_seconds", "encode_seconds"}.
+    """
+    extension = os.path.splitext(output_file)[1].lower()
+    if extension not in (".mp4", ".gif"):
+        raise ValueError("Export to a .mp4 or .gif file")
+    ffmpeg = shutil.which("ffmpeg")
+    if extension == ".mp4" and ffmpeg is None:
+        raise RuntimeError("MP4 export needs ffmpeg on PATH; export a .gif instead")
+
+    n_frames = len(frames["times"])
+    workers = workers or os.cpu_count() or 1
+    # Build the boundary cache once here rather than in every worker's initializer
+    load_boundary_arrays()
+    frame_dir = tempfile.mkdtemp(prefix="rainfall_frames_")
+    try:
+        started = time.perf_counter()
+        chunks = [chunk.tolist() for chunk in np.array_split(np.arange(n_frames), workers * 4) if len(chunk)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_export_worker,
+                                 initargs=(frames, date, frame_dir, dpi)) as executor:
+            list(executor.map(_render_frames, chunks))
+        rendered = time.perf_counter()
+
+        if extension == ".mp4":
+            subprocess.run(
+                [ffmpeg, "-y", "-loglevel", "error", "-framerate", str(fps),
+                 "-i", os.path.join(frame_dir, "frame_%05d.png"),
+                 "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2", "-pix_fmt", "yuv420p", output_file],
+                check=True,
+            )
+        else:
+            from PIL import Image
+
+            images = [
+                Image.open(os.path.join(frame_dir, f"frame_{frame:05d}.png")).convert("P", palette=Image.ADAPTIVE)
+                for frame in range(n_frames)
+            ]
+            images[0].save(output_file, save_all=True, append_images=images[1:],
+                           duration=int(1000 / fps), loop=0)
+        encoded = time.perf_counter()
+    finally:
+        shutil.rmtree(frame_dir, ignore_errors=True)
+
+    return {
+        "frames": n_frames,
+        "render_seconds": round(rendered - started, 3),
+        "encode_seconds": round(encoded - rendered, 3),
+    }
+
+
 # Main program
 if __name__ == "__main__":
     # Load station and rainfall data
@@ -55,40 +205,27 @@ if __name__ == "__main__":
                    for station in stations}
     station_names = {station['id']: station['name'] for station in stations}
 
-    # Load Singapore GeoJSON map
-    file_path = os.path.join(os.path.dirname(
-        __file__), "singapore-boundary.geojson")
-    singapore_map = gpd.read_file(file_path)
-
     # User choice for visualization
     print("Choose visualization mode:")
     print("1. View Total Rainfall")
     print("2. View Animated Rainfall Over Time")
-    choice = input("Enter your choice (1 or 2): ")
+    print("3. Export Animated Rainfall to MP4/GIF")
+    choice = input("Enter your choice (1, 2 or 3): ")
 
     if choice == "1":
         # Total Rainfall Plot
-        coordinates_list = []
-        rainfall_values = []
-        for station_id, rainfall in total_rainfall.items():
-            if station_id in coordinates:
-                lon, lat = coordinates[station_id]
-                coordinates_list.append((lon, lat))
-                rainfall_values.append(rainfall)
-
-        # Create GeoDataFrame
-        geometry = [Point(lon, lat) for lon, lat in coordinates_list]
-        gdf = gpd.GeoDataFrame(
-            {'Rainfall': rainfall_values}, geometry=geometry, crs="EPSG:4326")
+        station_ids = [station_id for station_id in total_rainfall if station_id in coordinates]
+        lons = np.array([coordinates[station_id][0] for station_id in station_ids])
+        lats = np.array([coordinates[station_id][1] for station_id in station_ids])
+        rainfall_values = np.array([total_rainfall[station_id] for station_id in station_ids])
 
         # Plot
         fig, ax = plt.subplots(figsize=(10, 10))
-        singapore_map.plot(ax=ax, color='lightgrey', edgecolor='black')
-        gdf.plot(ax=ax, markersize=gdf['Rainfall']
-                 * 10, color='blue', alpha=0.6, legend=True)
+        draw_boundary(ax)
+        ax.scatter(lons, lats, s=rainfall_values * MARKER_SCALE, color='blue', alpha=0.6)
 
         # Add labels
-        for x, y, label in zip(gdf.geometry.x, gdf.geometry.y, gdf['Rainfall']):
+        for x, y, label in zip(lons, lats, rainfall_values):
             ax.annotate(f"{label:.1f}", (x, y), fontsize=10,
                         ha='center', color='red', weight='bold')
 
@@ -100,37 +237,22 @@ if __name__ == "__main__":
 
     elif choice == "2":
         # Animated Rainfall Over Time
+        frames = buildRainfallFrames(rainfall_by_time, coordinates)
         fig, ax = plt.subplots(figsize=(10, 10))
-        singapore_map.plot(ax=ax, color='lightgrey', edgecolor='black')
-
-        scatter = ax.scatter([], [], s=[], c='blue', alpha=0.6)
-        time_text = ax.text(
-            0.02, 0.95, '', transform=ax.transAxes, fontsize=12, weight='bold')
+        scatter, time_text = createRainfallMap(ax, frames, date)
 
         def update(frame):
-            time, station_readings = rainfall_by_time[frame]
-            lons = []
-            lats = []
-            sizes = []
-            for station_id, rainfall in station_readings.items():
-                if station_id in coordinates:
-                    lon, lat = coordinates[station_id]
-                    lons.append(lon)
-                    lats.append(lat)
-                    sizes.append(rainfall * 10)
-
-            scatter.set_offsets(list(zip(lons, lats)))
-            scatter.set_sizes(sizes)
-            time_text.set_text(f"Time: {time}")
-            return scatter, time_text
+            return showFrame(frames, frame, scatter, time_text)
 
         ani = FuncAnimation(fig, update, frames=len(
-            rainfall_by_time), interval=50, blit=True)
-        plt.title(f"Rainfall on {date} in Singapore (Animated)", fontsize=16)
-        plt.xlabel("Longitude")
-        plt.ylabel("Latitude")
-        plt.grid(True)
+            frames["times"]), interval=50, blit=True)
         plt.show()
 
+    elif choice == "3":
+        frames = buildRainfallFrames(rainfall_by_time, coordinates)
+        output_file = input("Output file (.mp4 or .gif): ") or f"rainfall_{date}.gif"
+        timings = exportRainfallAnimation(frames, date, output_file)
+        print(f"Wrote {output_file}: {timings}")
+
     else:
-        print("Invalid choice. Please restart the program and enter 1 or 2.")
+        print("Invalid choice. Please restart the program and enter 1, 2 or 3.")
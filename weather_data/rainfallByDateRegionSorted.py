@@ -8,6 +8,7 @@ from helper_functions import (
     import_dictionaries,
     sumValuesForEveryStation,
 )
+from station_registry import get_station_registry
 from windspeedByRegion import (
     calculateAverageWindSpeedByRegion,
     calculateTotalWindSpeedByRegion,
@@ -35,12 +36,14 @@ def calculateTotalRainfallByRegion(date, district_map):
     # Prepare a dictionary to store total rainfall by region
     region_totals = {region: 0 for region in district_map.keys()}
 
-    # Aggregate rainfall values by region
-    for zone, district_locations in district_map.items():
-        for location in district_locations:
-            if location in locations:
-                rainfall_index = locations.index(location)
-                region_totals[zone] += rainfall_values[rainfall_index]
+    # Aggregate rainfall values by region, each location counted once
+    registry = get_station_registry(district_map)
+    seen_locations = set()
+    for location, rainfall in zip(locations, rainfall_values):
+        zone = registry.region_for_name(location)
+        if zone in region_totals and location not in seen_locations:
+            seen_locations.add(location)
+            region_totals[zone] += rainfall
     return region_totals
 
 
@@ -75,14 +78,13 @@ def calculateAverageRainfallByRegion(date, district_map):
     region_totals = {region: 0 for region in district_map.keys()}
     region_counts = {region: 0 for region in district_map.keys()}
 
-    # Iterate through the district map and aggregate rainfall data
-    for region, station_names in district_map.items():
-        for station_name in station_names:
-            # Check if the station is in station_averages
-            for station_id, station_data in station_averages.items():
-                if station_data[0] == station_name:  # Compare station name
-                    region_totals[region] += station_data[1]  # Add rainfall value
-                    region_counts[region] += 1
+    # Aggregate rainfall data by each station's region
+    registry = get_station_registry(district_map)
+    for station_name, station_value in station_averages.values():
+        region = registry.region_for_name(station_name)
+        if region in region_totals:
+            region_totals[region] += station_value  # Add rainfall value
+            region_counts[region] += 1
 
     # Calculate averages for each region
     region_averages = {
@@ -1,6 +1,6 @@
-import requests
 import matplotlib.pyplot as plt
 from rainfallByDateBarChart import getStationsJson
+from helper_functions import http_get
 
 # Run helper functions to get rainfall data and prepare for plotting
 
@@ -20,7 +20,7 @@ def getRainfallByDateJson(date):
     # Create the URL for the specific date
     url = f"https://api-open.data.gov.sg/v2/real-time/api/rainfall?date={date}"
     # Fetch specific date data from the API
-    response = requests.get(url)
+    response = http_get(url)
     data = response.json()
     return data
 
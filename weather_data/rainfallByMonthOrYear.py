@@ -1,12 +1,12 @@
-import json
-import os
 from calendar import monthrange
 
 import matplotlib.pyplot as plt
 
 from helper_functions import (
+    append_daily_cache,
     createOutputDict,
     getDataTypeFromDate,
+    load_daily_cache,
     sumValuesForEveryStation,
 )
 
@@ -27,11 +27,7 @@ def store_daily_rainfall(year, month, output_file):
     num_days = monthrange(year, month)[1]  # Get the number of days in the month
 
     # Load existing data if the file exists
-    if os.path.exists(output_file):
-        with open(output_file, "r") as file:
-            all_data = json.load(file)
-    else:
-        all_data = {}
+    all_data = load_daily_cache(output_file)
 
     monthly_rainfall = {}
     for day in range(1, num_days + 1):
@@ -60,9 +56,8 @@ def store_daily_rainfall(year, month, output_file):
             # Store the result in the overall data
             all_data[date] = total_rainfall
 
-            # Save the updated data to the JSON file
-            with open(output_file, "w") as file:
-                json.dump(all_data, file, indent=4)
+            # Append the new day to the JSON file's log
+            append_daily_cache(output_file, date, total_rainfall)
 
     return monthly_rainfall
 
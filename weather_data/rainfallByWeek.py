@@ -1,7 +1,6 @@
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
-from helper_functions import getDataTypeFromDate, sumValuesForEveryStation, createOutputDict, getDataFromStorage
-import json
+from helper_functions import getDataTypeFromDate, sumValuesForEveryStation, createOutputDict, getDataFromStorage, append_daily_cache
 
 def fetch_weekly_rainfall(start_date, storage_json_path):
     """
@@ -29,9 +28,8 @@ def fetch_weekly_rainfall(start_date, storage_json_path):
             total_rainfall = sum([data[1] for data in output_dict.values()])
         
             storage_data[date] = total_rainfall
-            # Save the updated data to the JSON file
-            with open(storage_json_path, 'w') as file:
-                json.dump(storage_data, file, indent=4)
+            # Append the new day to the JSON file's log
+            append_daily_cache(storage_json_path, date, total_rainfall)
 
         weekly_rainfall[date] = total_rainfall
 
@@ -1,19 +1,103 @@
-import requests
+import sys
+
 import matplotlib.pyplot as plt
-import geopandas as gpd
-from shapely.geometry import Point
-import os
+import numpy as np
+from helper_functions import http_get
+from sg_boundary import draw_boundary
+from spatial_interpolation import get_interpolator, plot_heatmap
 
 
 # Helper function to fetch wind speed data
 def getWindSpeedData():
     url = "https://api-open.data.gov.sg/v2/real-time/api/wind-speed"
-    response = requests.get(url)
+    response = http_get(url)
     return response.json()
 
 
+def drawWindspeedMap(ax, stations, windspeed_dict, title="Windspeed in Singapore (Real-Time) - Knots"):
+    """
+    Draw the interpolated windspeed heatmap with each station's reading.
+
+    Args:
+        stations (list): Station metadata from the API.
+        windspeed_dict (dict): stationId -> windspeed in knots.
+
+    Returns:
+        AxesImage: The heatmap, for a colorbar.
+    """
+    # Prepare data for plotting
+    reporting_stations = [station for station in stations if station["id"] in windspeed_dict]
+    coordinates = [(station["location"]["longitude"], station["location"]["latitude"])
+                   for station in reporting_stations]
+    windspeed_values = [windspeed_dict[station["id"]] for station in reporting_stations]
+
+    # Interpolate the readings over the island (weights are reused while the stations stay the same)
+    interpolator = get_interpolator(reporting_stations)
+    windspeed_raster = interpolator.interpolate(np.array(windspeed_values))
+
+    # Plot the map with a windspeed heatmap and text
+    draw_boundary(ax)
+    heatmap = plot_heatmap(ax, windspeed_raster, interpolator.grid, cmap="YlGnBu", alpha=0.8)
+
+    # Add windspeed values as text
+    for (x, y), label in zip(coordinates, windspeed_values):
+        ax.text(x, y, f"{label:.1f} knots", fontsize=10,
+                ha='center', color='blue', weight='bold')
+
+    # Customize the plot
+    ax.set_title(title, fontsize=16)
+    ax.set_xlabel("Longitude")
+    ax.set_ylabel("Latitude")
+    ax.grid(True)
+    return heatmap
+
+
+def showLiveWindspeedMap():
+    """
+    Keep the map updated from the real-time poller instead of refetching the payload.
+
+    The poller thread only queues deltas; the figure is redrawn here on the main thread.
+    """
+    import queue
+
+    from realtime_poller import RealtimePoller
+
+    deltas = queue.Queue()
+    poller = RealtimePoller(["wind-speed"])
+    poller.subscribe(deltas.put)
+    poller.start()
+
+    fig, ax = plt.subplots(figsize=(10, 10))
+    colorbar = None
+    plt.ion()
+    plt.show()
+    try:
+        while plt.fignum_exists(fig.number):
+            try:
+                delta = deltas.get_nowait()
+            except queue.Empty:
+                plt.pause(1)
+                continue
+            latest = delta["readings"][-1]
+            ax.clear()
+            heatmap = drawWindspeedMap(ax, delta["stations"], latest["data"],
+                                       f"Windspeed in Singapore at {latest['timestamp'][11:16]} - Knots")
+            if colorbar is None:
+                colorbar = fig.colorbar(heatmap, ax=ax, shrink=0.6, label="Windspeed (knots)")
+            else:
+                colorbar.update_normal(heatmap)
+            fig.canvas.draw_idle()
+    finally:
+        poller.stop()
+
+
 # Main program
 if __name__ == "__main__":
+    # python realtimeWindspeedMap.py [--live]
+    if "--live" in sys.argv[1:]:
+        showLiveWindspeedMap()
+        sys.exit()
+
     # Fetch wind speed data
     wind_data = getWindSpeedData()
 
@@ -22,47 +106,13 @@ if __name__ == "__main__":
     # Take the latest readings
     readings = wind_data["data"]["readings"][0]["data"]
 
-    # Prepare data for plotting
-    coordinates = []
-    windspeed_values = []
-    station_names = []
-
     # Create a mapping of station IDs to wind speed values
     windspeed_dict = {reading["stationId"]: reading["value"]
                       for reading in readings}
 
-    for station in stations:
-        station_id = station["id"]
-        if station_id in windspeed_dict:
-            coordinates.append(
-                (station["location"]["longitude"], station["location"]["latitude"]))
-            windspeed_values.append(windspeed_dict[station_id])
-            station_names.append(station["name"])
-
-    # Create GeoDataFrame
-    geometry = [Point(lon, lat) for lon, lat in coordinates]
-    gdf = gpd.GeoDataFrame({"Windspeed (knots)": windspeed_values, "Station": station_names},
-                           geometry=geometry, crs="EPSG:4326")
-
-    # Load Singapore GeoJSON map
-    file_path = os.path.join(os.path.dirname(
-        __file__), "singapore-boundary.geojson")
-    singapore_map = gpd.read_file(file_path)
-
-    # Plot the map with windspeed text
     fig, ax = plt.subplots(figsize=(10, 10))
-    singapore_map.plot(ax=ax, color='lightgrey', edgecolor='black')
-
-    # Add windspeed values as text
-    for x, y, label in zip(gdf.geometry.x, gdf.geometry.y, gdf["Windspeed (knots)"]):
-        ax.text(x, y, f"{label:.1f} knots", fontsize=10,
-                ha='center', color='blue', weight='bold')
-
-    # Customize the plot
-    plt.title("Windspeed in Singapore (Real-Time) - Knots", fontsize=16)
-    plt.xlabel("Longitude")
-    plt.ylabel("Latitude")
-    plt.grid(True)
+    heatmap = drawWindspeedMap(ax, stations, windspeed_dict)
+    fig.colorbar(heatmap, ax=ax, shrink=0.6, label="Windspeed (knots)")
 
     # Show plot
     plt.show()
@@ -0,0 +1,343 @@
+import hashlib
+import heapq
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+from helper_functions import API_BASE_URL, DATA_DIR, http_get, update_station_metadata
+from timestamps import offset_seconds, to_epoch_seconds
+
+# Upstream update cadence per parameter, in seconds: rainfall is published every 5 minutes,
+# the other parameters every minute
+POLL_INTERVALS = {
+    "rainfall": 300,
+    "wind-speed": 60,
+    "wind-direction": 60,
+    "air-temperature": 60,
+    "relative-humidity": 60,
+}
+# A reading is normally published within this many seconds of its timestamp
+PUBLISH_LAG_SECONDS = 15
+# Wait before asking again when the next reading is overdue or a request failed
+RETRY_SECONDS = 20
+
+# Restored readings are labelled in the API's fixed +08:00 offset
+SG_TIMEZONE = timezone(timedelta(seconds=offset_seconds()))
+
+# Latest timestamps kept in memory per parameter (a day of minute readings)
+RING_SIZE = 1440
+
+# Every new reading is appended here; override with WEATHERSG_REALTIME_DB
+REALTIME_DB = os.environ.get("WEATHERSG_REALTIME_DB", os.path.join(DATA_DIR, "realtime.db"))
+
+
+def connect_realtime_db(db_path=REALTIME_DB):
+    """Open the real-time database, creating its tables on first use."""
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    # ts is UTC epoch seconds; one row per (parameter, timestamp, station)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS readings (
+            parameter TEXT NOT NULL,
+            ts INTEGER NOT NULL,
+            station TEXT NOT NULL,
+            value REAL,
+            PRIMARY KEY (parameter, ts, station)
+        ) WITHOUT ROWID
+    """)
+    # Validators and the newest stored timestamp, so a restart resumes with conditional requests
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS poller_state (
+            parameter TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            digest TEXT,
+            last_ts INTEGER
+        )
+    """)
+    conn.commit()
+    return conn
+
+
+class RealtimePoller:
+    """
+    Polls the real-time endpoints and hands only new readings to subscribers.
+
+    Each parameter is fetched with If-None-Match / If-Modified-Since, so an unchanged
+    payload usually costs a 304. A 200 whose body hashes the same as the last one is also
+    dropped. Otherwise only readings newer than the last seen timestamp are applied to the
+    ring buffer, appended to SQLite and sent to subscribers as a delta:
+
+        {"parameter", "stations", "readings": [{"timestamp", "ts", "data": {stationId: value}}]}
+
+    Polls are scheduled just after the next reading is due, from the latest reading's
+    timestamp and the parameter's update cadence.
+    """
+
+    def __init__(self, parameters=None, db_path=REALTIME_DB, ring_size=RING_SIZE):
+        self.intervals = {parameter: POLL_INTERVALS[parameter] for parameter in (parameters or POLL_INTERVALS)}
+        self.db_path = db_path
+        self.buffers = {parameter: deque(maxlen=ring_size) for parameter in self.intervals}
+        self.stations = {parameter: {} for parameter in self.intervals}
+        self.state = {
+            parameter: {"etag": None, "last_modified": None, "digest": None, "last_ts": None}
+            for parameter in self.intervals
+        }
+        self.stats = {
+            parameter: {"requests": 0, "not_modified": 0, "unchanged": 0, "updates": 0, "readings": 0, "errors": 0}
+            for parameter in self.intervals
+        }
+        self.subscribers = []
+        self._conn = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ----------------------------
+    # Subscribers and buffers
+    # ----------------------------
+
+    def subscribe(self, callback, parameters=None):
+        """
+        Call callback(delta) for every delta of the given parameters (all when None).
+
+        Callbacks run on the polling thread and should hand work off rather than block.
+
+        Returns:
+            function: Removes the subscription.
+        """
+        subscription = (callback, set(parameters) if parameters else None)
+        with self._lock:
+            self.subscribers.append(subscription)
+
+        def unsubscribe():
+            with self._lock:
+                if subscription in self.subscribers:
+                    self.subscribers.remove(subscription)
+
+        return unsubscribe
+
+    def latest(self, parameter):
+        """The newest buffered reading of a parameter, or None."""
+        with self._lock:
+            buffer = self.buffers[parameter]
+            return buffer[-1] if buffer else None
+
+    def history(self, parameter, since_ts=None):
+        """Buffered readings of a parameter, oldest first, optionally only those after since_ts."""
+        with self._lock:
+            return [reading for reading in self.buffers[parameter] if since_ts is None or reading["ts"] > since_ts]
+
+    # ----------------------------
+    # Storage
+    # ----------------------------
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = connect_realtime_db(self.db_path)
+        return self._conn
+
+    def restore(self):
+        """Reload validators and refill the ring buffers from the database."""
+        # A connection of its own: the polling thread opens the one it writes with
+        conn = connect_realtime_db(self.db_path)
+        for parameter, etag, last_modified, digest, last_ts in conn.execute(
+            "SELECT parameter, etag, last_modified, digest, last_ts FROM poller_state"
+        ):
+            if parameter in self.state:
+                self.state[parameter].update(etag=etag, last_modified=last_modified, digest=digest, last_ts=last_ts)
+
+        for parameter, buffer in self.buffers.items():
+            rows = conn.execute(
+                """
+                SELECT ts, station, value FROM readings
+                WHERE parameter = ? AND ts >= (
+                    SELECT MIN(ts) FROM (
+                        SELECT DISTINCT ts FROM readings WHERE parameter = ? ORDER BY ts DESC LIMIT ?
+                    )
+                )
+                ORDER BY ts
+                """,
+                (parameter, parameter, buffer.maxlen),
+            ).fetchall()
+            readings = {}
+            for ts, station, value in rows:
+                readings.setdefault(ts, {})[station] = value
+            with self._lock:
+                buffer.extend(
+                    {"timestamp": datetime.fromtimestamp(ts, SG_TIMEZONE).isoformat(), "ts": ts, "data": data}
+                    for ts, data in readings.items()
+                )
+        conn.close()
+        return self
+
+    def _store(self, parameter, readings):
+        conn = self._db()
+        state = self.state[parameter]
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO readings (parameter, ts, station, value) VALUES (?, ?, ?, ?)",
+                [
+                    (parameter, reading["ts"], station, value)
+                    for reading in readings
+                    for station, value in reading["data"].items()
+                ],
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO poller_state VALUES (?, ?, ?, ?, ?)",
+                (parameter, state["etag"], state["last_modified"], state["digest"], state["last_ts"]),
+            )
+
+    # ----------------------------
+    # Polling
+    # ----------------------------
+
+    def poll(self, parameter):
+        """
+        Fetch one parameter and apply what is new.
+
+        Returns:
+            dict: The delta passed to subscribers, or None when nothing changed.
+        """
+        state = self.state[parameter]
+        stats = self.stats[parameter]
+        headers = {}
+        if state["etag"]:
+            headers["If-None-Match"] = state["etag"]
+        if state["last_modified"]:
+            headers["If-Modified-Since"] = state["last_modified"]
+
+        stats["requests"] += 1
+        response = http_get(f"{API_BASE_URL}/{parameter}", headers=headers)
+        if response.status_code == 304:
+            stats["not_modified"] += 1
+            return None
+        response.raise_for_status()
+
+        state["etag"] = response.headers.get("ETag")
+        state["last_modified"] = response.headers.get("Last-Modified")
+        digest = hashlib.sha1(response.content).hexdigest()
+        if digest == state["digest"]:
+            stats["unchanged"] += 1
+            # Persist the new validators so a restart does not send stale ones
+            self._store(parameter, [])
+            return None
+        state["digest"] = digest
+
+        data = response.json().get("data") or {}
+        entries = data.get("readings", [])
+        epochs = to_epoch_seconds([entry["timestamp"] for entry in entries]).tolist()
+        new_readings = sorted(
+            (
+                {
+                    "timestamp": entry["timestamp"],
+                    "ts": ts,
+                    "data": {data_point["stationId"]: data_point["value"] for data_point in entry["data"]},
+                }
+                for entry, ts in zip(entries, epochs)
+                if state["last_ts"] is None or ts > state["last_ts"]
+            ),
+            key=lambda reading: reading["ts"],
+        )
+
+        new_stations = [station for station in data.get("stations", []) if station["id"] not in self.stations[parameter]]
+        if new_stations:
+            for station in new_stations:
+                self.stations[parameter][station["id"]] = station
+            update_station_metadata(parameter, new_stations)
+
+        if new_readings:
+            state["last_ts"] = new_readings[-1]["ts"]
+        # Keep the validators even when no reading is new
+        self._store(parameter, new_readings)
+        if not new_readings:
+            stats["unchanged"] += 1
+            return None
+
+        with self._lock:
+            self.buffers[parameter].extend(new_readings)
+            subscribers = [callback for callback, wanted in self.subscribers if wanted is None or parameter in wanted]
+        stats["updates"] += 1
+        stats["readings"] += len(new_readings)
+
+        delta = {"parameter": parameter, "stations": list(self.stations[parameter].values()), "readings": new_readings}
+        for callback in subscribers:
+            try:
+                callback(delta)
+            except Exception as e:
+                print(f"Error in {parameter} subscriber {getattr(callback, '__name__', callback)}: {e}")
+        return delta
+
+    def next_due(self, parameter, now=None):
+        """When to poll next: just after the next reading should be published."""
+        now = time.time() if now is None else now
+        last_ts = self.state[parameter]["last_ts"]
+        if last_ts is None:
+            return now + RETRY_SECONDS
+        due = last_ts + self.intervals[parameter] + PUBLISH_LAG_SECONDS
+        # Overdue readings are retried at a fixed pace instead of in a tight loop
+        return due if due > now else now + RETRY_SECONDS
+
+    def run(self):
+        """Poll every parameter at its cadence until stop() is called."""
+        schedule = [(0.0, parameter) for parameter in self.intervals]
+        heapq.heapify(schedule)
+        try:
+            while not self._stop.is_set():
+                due, parameter = schedule[0]
+                if self._stop.wait(max(due - time.time(), 0)):
+                    break
+                heapq.heappop(schedule)
+                try:
+                    self.poll(parameter)
+                    due = self.next_due(parameter)
+                except Exception as e:
+                    self.stats[parameter]["errors"] += 1
+                    print(f"Error polling {parameter}: {e}")
+                    due = time.time() + RETRY_SECONDS
+                heapq.heappush(schedule, (due, parameter))
+        finally:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def start(self):
+        """Run the poller on a daemon thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="realtime-poller", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop polling and close the database."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def print_delta(delta):
+    """Subscriber printing a one-line summary of each delta."""
+    for reading in delta["readings"]:
+        values = list(reading["data"].values())
+        print(f"{delta['parameter']:<18} {reading['timestamp']} {len(values)} stations, "
+              f"mean {sum(values) / len(values) if values else float('nan'):.2f}")
+
+
+if __name__ == "__main__":
+    # python realtime_poller.py [parameter ...]
+    poller = RealtimePoller(sys.argv[1:] or None).restore()
+    poller.subscribe(print_delta)
+    poller.start()
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        poller.stop()
+        for parameter, stats in poller.stats.items():
+            print(f"{parameter:<18} {stats}")
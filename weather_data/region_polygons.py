@@ -0,0 +1,153 @@
+import json
+import os
+
+import numpy as np
+
+from sg_boundary import _polygons
+from station_registry import DATA_DIR, UNKNOWN_REGION
+
+# Region outlines: a FeatureCollection whose features carry the region name (matching the
+# district map keys) in properties["region"]. Without it, stations the district map does not
+# name stay "Unknown": there is no reliable way to place them from coordinates alone.
+REGION_FILE = os.path.join(DATA_DIR, "sg-regions.geojson")
+REGION_PROPERTY = "region"
+
+
+class RegionPolygonIndex:
+    """
+    Region polygons behind a shapely STRtree.
+
+    A query first takes the polygons whose bounding box holds each point from the tree, so a
+    point is only tested against the one or two polygons around it, and the tests run
+    vectorised against prepared polygons.
+    """
+
+    def __init__(self, polygons_by_region):
+        import shapely
+
+        regions = []
+        polygons = []
+        for region, region_polygons in polygons_by_region.items():
+            for rings in region_polygons:
+                regions.append(region)
+                polygons.append(shapely.Polygon(
+                    np.asarray(rings[0], dtype=np.float64)[:, :2],
+                    [np.asarray(hole, dtype=np.float64)[:, :2] for hole in rings[1:]],
+                ))
+        self.regions = np.array(regions, dtype=object)
+        self.polygons = np.array(polygons, dtype=object)
+        shapely.prepare(self.polygons)
+        self.tree = shapely.STRtree(self.polygons)
+
+    @classmethod
+    def from_geojson(cls, region_file=REGION_FILE, region_property=REGION_PROPERTY):
+        with open(region_file, "r") as f:
+            geojson = json.load(f)
+        polygons_by_region = {}
+        for feature in geojson.get("features", [geojson]):
+            region = (feature.get("properties") or {}).get(region_property, UNKNOWN_REGION)
+            polygons_by_region.setdefault(region, []).extend(_polygons(feature))
+        return cls(polygons_by_region)
+
+    def assign(self, lons, lats):
+        """Region of every point, "Unknown" outside all polygons. The first matching polygon wins."""
+        import shapely
+
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        assigned = np.full(len(lons), UNKNOWN_REGION, dtype=object)
+        # (point, polygon) pairs whose bounding boxes meet
+        points, candidates = self.tree.query(shapely.points(lons, lats))
+        inside = shapely.contains_xy(self.polygons[candidates], lons[points], lats[points])
+        points, candidates = points[inside], candidates[inside]
+        # Keep the lowest polygon index per point
+        order = np.lexsort((candidates, points))
+        points, candidates = points[order], candidates[order]
+        _, first = np.unique(points, return_index=True)
+        assigned[points[first]] = self.regions[candidates[first]]
+        return assigned
+
+
+_indexes = {}
+_assignments = {}
+
+
+def get_region_index():
+    """
+    The region index of REGION_FILE, or None when the file does not exist. Memoized and
+    rebuilt when REGION_FILE changes.
+    """
+    if not os.path.exists(REGION_FILE):
+        return None
+    region_mtime = os.path.getmtime(REGION_FILE)
+    cached = _indexes.get(REGION_FILE)
+    if cached is not None and cached[0] == region_mtime:
+        return cached[1]
+
+    index = RegionPolygonIndex.from_geojson()
+    _indexes[REGION_FILE] = (region_mtime, index)
+    return index
+
+
+def locate_regions(stations):
+    """
+    Regions of stations from their coordinates.
+
+    Args:
+        stations (list): Station metadata ({"id", "location": {"latitude", "longitude"}}).
+
+    Returns:
+        list: Region per station, "Unknown" for stations without a location, outside every
+            region polygon, or when there is no REGION_FILE. Results are cached per station
+            set (ids and positions), so repeated calls are dict lookups.
+    """
+    index = get_region_index()
+    if index is None:
+        return [UNKNOWN_REGION] * len(stations)
+    key = tuple(
+        (station["id"], station.get("location", {}).get("longitude"), station.get("location", {}).get("latitude"))
+        for station in stations
+    )
+    cached = _assignments.get(key)
+    if cached is not None and cached[0] is index:
+        return cached[1]
+
+    located = [i for i, station in enumerate(stations) if station.get("location")]
+    regions = [UNKNOWN_REGION] * len(stations)
+    if located:
+        assigned = index.assign(
+            [stations[i]["location"]["longitude"] for i in located],
+            [stations[i]["location"]["latitude"] for i in located],
+        )
+        for i, region in zip(located, assigned):
+            regions[i] = region
+    _assignments[key] = (index, regions)
+    return regions
+
+
+if __name__ == "__main__":
+    import time
+
+    from station_registry import get_station_registry
+
+    if get_region_index() is None:
+        raise SystemExit(f"No region outlines at {REGION_FILE}, unnamed stations stay {UNKNOWN_REGION}")
+
+    registry = get_station_registry()
+    stations = list(registry.stations.values())
+
+    # How often the polygons agree with the district map for the stations it names
+    named = [station for station in stations if station["name"] in registry.region_by_name]
+    agree = sum(
+        region == registry.region_for_name(station["name"])
+        for station, region in zip(named, locate_regions(named))
+    )
+    print(f"Region polygons agree with the district map for {agree}/{len(named)} stations")
+
+    start_time = time.perf_counter()
+    locate_regions(stations)
+    first = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    locate_regions(stations)
+    print(f"Located {len(stations)} stations in {first * 1000:.2f}ms, "
+          f"{(time.perf_counter() - start_time) * 1000:.2f}ms cached")
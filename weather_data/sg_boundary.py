@@ -0,0 +1,134 @@
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from helper_functions import DATA_DIR
+
+# Singapore outline in lon/lat (EPSG:4326), the same coordinates the station metadata uses,
+# so no reprojection is needed to draw stations over it. The parsed rings are cached as a
+# matplotlib path (vertices + codes) beside the GeoJSON and rebuilt when the GeoJSON changes.
+BOUNDARY_FILE = os.path.join(DATA_DIR, "singapore-boundary.geojson")
+
+# matplotlib.path.Path codes, kept here so loading the cache does not import matplotlib
+MOVETO, LINETO, CLOSEPOLY = 1, 2, 79
+
+
+def _cache_path(boundary_file):
+    directory, name = os.path.split(boundary_file)
+    return os.path.join(directory, f".{os.path.splitext(name)[0]}.path.npz")
+
+
+def _polygons(geojson):
+    # Feature, FeatureCollection or bare geometry -> list of polygons (lists of rings)
+    if geojson["type"] == "FeatureCollection":
+        return [polygon for feature in geojson["features"] for polygon in _polygons(feature)]
+    if geojson["type"] == "Feature":
+        return _polygons(geojson["geometry"])
+    if geojson["type"] == "Polygon":
+        return [geojson["coordinates"]]
+    if geojson["type"] == "MultiPolygon":
+        return geojson["coordinates"]
+    if geojson["type"] == "GeometryCollection":
+        return [polygon for geometry in geojson["geometries"] for polygon in _polygons(geometry)]
+    return []
+
+
+def _build_path_arrays(boundary_file):
+    with open(boundary_file, "r") as f:
+        polygons = _polygons(json.load(f))
+
+    vertices = []
+    codes = []
+    polygon_starts = []
+    for polygon in polygons:
+        polygon_starts.append(len(vertices))
+        for ring in polygon:
+            ring = np.asarray(ring, dtype=np.float64)[:, :2]
+            vertices.append(ring)
+            ring_codes = np.full(len(ring), LINETO, dtype=np.uint8)
+            ring_codes[0] = MOVETO
+            ring_codes[-1] = CLOSEPOLY
+            codes.append(ring_codes)
+
+    ring_sizes = np.array([len(ring) for ring in vertices], dtype=np.int64)
+    return {
+        "vertices": np.concatenate(vertices) if vertices else np.empty((0, 2)),
+        "codes": np.concatenate(codes) if codes else np.empty(0, np.uint8),
+        # Ring i is vertices[ring_offsets[i]:ring_offsets[i + 1]]
+        "ring_offsets": np.concatenate(([0], np.cumsum(ring_sizes))),
+        # Polygon j owns rings polygon_rings[j]:polygon_rings[j + 1], its first ring is the exterior
+        "polygon_rings": np.array(polygon_starts + [len(vertices)], dtype=np.int64),
+    }
+
+
+_boundaries = {}
+
+
+def load_boundary_arrays(boundary_file=BOUNDARY_FILE):
+    """
+    The boundary as flat arrays, from the .npz cache when it is newer than the GeoJSON.
+
+    Returns:
+        dict: {"vertices": float64 [n, 2] lon/lat, "codes": uint8 path codes,
+               "ring_offsets": int64, "polygon_rings": int64}
+    """
+    mtime = os.path.getmtime(boundary_file)
+    cached = _boundaries.get(boundary_file)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    cache_file = _cache_path(boundary_file)
+    if os.path.exists(cache_file) and os.path.getmtime(cache_file) >= mtime:
+        with np.load(cache_file) as npz:
+            arrays = {name: npz[name] for name in npz.files}
+    else:
+        arrays = _build_path_arrays(boundary_file)
+        # A temp file of its own per writer, as pool workers may build the cache at once
+        fd, temp_file = tempfile.mkstemp(suffix=".npz", prefix=os.path.basename(cache_file) + ".",
+                                         dir=os.path.dirname(cache_file))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(temp_file, cache_file)
+        except BaseException:
+            os.remove(temp_file)
+            raise
+
+    _boundaries[boundary_file] = (mtime, arrays)
+    return arrays
+
+
+def load_boundary_path(boundary_file=BOUNDARY_FILE):
+    """The whole boundary as one matplotlib Path, ready for a PathPatch."""
+    from matplotlib.path import Path
+
+    arrays = load_boundary_arrays(boundary_file)
+    return Path(arrays["vertices"], arrays["codes"])
+
+
+def boundary_rings(boundary_file=BOUNDARY_FILE):
+    """
+    The boundary's polygons.
+
+    Returns:
+        list: One list of rings ([n, 2] lon/lat arrays) per polygon, exterior ring first.
+    """
+    arrays = load_boundary_arrays(boundary_file)
+    offsets = arrays["ring_offsets"]
+    rings = [arrays["vertices"][offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+    polygon_rings = arrays["polygon_rings"]
+    return [rings[polygon_rings[j]:polygon_rings[j + 1]] for j in range(len(polygon_rings) - 1)]
+
+
+def draw_boundary(ax, facecolor="lightgrey", edgecolor="black", **kwargs):
+    """Draw the boundary on an Axes and fit the view to it."""
+    from matplotlib.patches import PathPatch
+
+    path = load_boundary_path()
+    ax.add_patch(PathPatch(path, facecolor=facecolor, edgecolor=edgecolor, **kwargs))
+    (x0, y0), (x1, y1) = path.get_extents().get_points()
+    ax.set_xlim(x0, x1)
+    ax.set_ylim(y0, y1)
+    ax.set_aspect("equal")
@@ -0,0 +1,230 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.spatial import cKDTree
+
+from sg_boundary import boundary_rings, load_boundary_arrays
+
+# Kilometres per degree around Singapore (~1.35°N); close enough for an equirectangular
+# projection over an island 50 km across, so KD-tree distances are in km
+KM_PER_DEG_LAT = 110.57
+KM_PER_DEG_LON = 111.32 * np.cos(np.radians(1.35))
+
+DEFAULT_CELL_DEG = 0.005  # ~0.55 km
+DEFAULT_NEIGHBOURS = 8
+DEFAULT_POWER = 2.0
+
+
+def to_km(lons, lats):
+    """Project lon/lat degrees to local x/y kilometres."""
+    return np.column_stack([np.asarray(lons, np.float64) * KM_PER_DEG_LON,
+                            np.asarray(lats, np.float64) * KM_PER_DEG_LAT])
+
+
+def points_in_boundary(lons, lats):
+    """Boolean mask of points inside the Singapore boundary (exterior rings minus holes)."""
+    from matplotlib.path import Path
+
+    points = np.column_stack([lons, lats])
+    inside = np.zeros(len(points), dtype=bool)
+    for rings in boundary_rings():
+        exterior = Path(rings[0])
+        # Only test the points inside this polygon's bounding box
+        (x0, y0), (x1, y1) = exterior.get_extents().get_points()
+        candidates = np.flatnonzero(
+            (points[:, 0] >= x0) & (points[:, 0] <= x1) & (points[:, 1] >= y0) & (points[:, 1] <= y1)
+        )
+        if not len(candidates):
+            continue
+        in_polygon = exterior.contains_points(points[candidates])
+        for hole in rings[1:]:
+            in_polygon &= ~Path(hole).contains_points(points[candidates])
+        inside[candidates[in_polygon]] = True
+    return inside
+
+
+class BoundaryGrid:
+    """
+    A regular lon/lat raster over the boundary's extent, with the cells inside it flagged.
+
+    Interpolation only computes the `n_cells` masked cells; `to_raster` scatters them back
+    into [rows, cols] with NaN outside Singapore.
+    """
+
+    def __init__(self, cell_deg=DEFAULT_CELL_DEG):
+        vertices = load_boundary_arrays()["vertices"]
+        x0, y0 = vertices.min(axis=0)
+        x1, y1 = vertices.max(axis=0)
+        self.cell_deg = cell_deg
+        # Cell centres
+        self.lons = np.arange(x0 + cell_deg / 2, x1, cell_deg)
+        self.lats = np.arange(y0 + cell_deg / 2, y1, cell_deg)
+        self.extent = (x0, x0 + len(self.lons) * cell_deg, y0, y0 + len(self.lats) * cell_deg)
+
+        grid_lons, grid_lats = np.meshgrid(self.lons, self.lats)
+        self.mask = points_in_boundary(grid_lons.ravel(), grid_lats.ravel()).reshape(grid_lons.shape)
+        self.cell_index = np.flatnonzero(self.mask)
+        self.cell_lons = grid_lons.ravel()[self.cell_index]
+        self.cell_lats = grid_lats.ravel()[self.cell_index]
+
+    @property
+    def shape(self):
+        return self.mask.shape
+
+    @property
+    def n_cells(self):
+        return len(self.cell_index)
+
+    def to_raster(self, cell_values):
+        """
+        Scatter values of the masked cells back onto the full raster.
+
+        Args:
+            cell_values (np.ndarray): [..., n_cells], e.g. one row per timestamp.
+
+        Returns:
+            np.ndarray: [..., rows, cols] float32, NaN outside the boundary. Row 0 is the
+                southernmost latitude (use origin="lower" with imshow).
+        """
+        cell_values = np.asarray(cell_values)
+        raster = np.full(cell_values.shape[:-1] + (self.mask.size,), np.nan, dtype=np.float32)
+        raster[..., self.cell_index] = cell_values
+        return raster.reshape(cell_values.shape[:-1] + self.mask.shape)
+
+
+class IDWInterpolator:
+    """
+    Inverse-distance weighting from a fixed set of stations onto a BoundaryGrid.
+
+    The k nearest stations of every cell and their weights are found once with a KD-tree
+    and kept as a sparse [n_cells, n_stations] matrix, so gridding a timestamp is one
+    sparse matrix-vector product and a batch of timestamps one sparse matrix product.
+    """
+
+    def __init__(self, station_lons, station_lats, grid, k=DEFAULT_NEIGHBOURS, power=DEFAULT_POWER):
+        self.grid = grid
+        self.n_stations = len(station_lons)
+        self.k = min(k, self.n_stations)
+        self.power = power
+
+        tree = cKDTree(to_km(station_lons, station_lats))
+        distances, neighbours = tree.query(to_km(grid.cell_lons, grid.cell_lats), k=self.k)
+        distances = distances.reshape(grid.n_cells, self.k)
+        neighbours = neighbours.reshape(grid.n_cells, self.k)
+
+        with np.errstate(divide="ignore"):
+            weights = 1.0 / distances ** power
+        # A cell on top of a station takes that station's value
+        exact = distances == 0
+        on_station = exact.any(axis=1)
+        weights[on_station] = exact[on_station]
+        weights /= weights.sum(axis=1, keepdims=True)
+
+        rows = np.repeat(np.arange(grid.n_cells), self.k)
+        self.weights = csr_matrix(
+            (weights.ravel(), (rows, neighbours.ravel())), shape=(grid.n_cells, self.n_stations)
+        )
+
+    def interpolate_cells(self, values):
+        """
+        Grid station values onto the masked cells.
+
+        Stations with NaN are left out and each cell's weights renormalised over the
+        neighbours that reported; cells with no reporting neighbour are NaN.
+
+        Args:
+            values (np.ndarray): [n_stations] for one timestamp or [n_timestamps, n_stations].
+
+        Returns:
+            np.ndarray: [n_cells] or [n_timestamps, n_cells].
+        """
+        values = np.asarray(values, dtype=np.float64)
+        present = ~np.isnan(values)
+        if present.all():
+            # Weight rows sum to 1, so no renormalisation is needed
+            return (self.weights @ values.T).T
+
+        numerator = self.weights @ np.where(present, values, 0.0).T
+        denominator = self.weights @ present.T.astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (numerator / denominator).T
+
+    def interpolate(self, values):
+        """Like `interpolate_cells`, returned as [..., rows, cols] rasters clipped to the boundary."""
+        return self.grid.to_raster(self.interpolate_cells(values))
+
+
+_grids = {}
+_interpolators = {}
+
+
+def get_grid(cell_deg=DEFAULT_CELL_DEG):
+    """Return a memoized BoundaryGrid."""
+    if cell_deg not in _grids:
+        _grids[cell_deg] = BoundaryGrid(cell_deg)
+    return _grids[cell_deg]
+
+
+def get_interpolator(stations, cell_deg=DEFAULT_CELL_DEG, k=DEFAULT_NEIGHBOURS, power=DEFAULT_POWER):
+    """
+    Return the memoized IDWInterpolator of a station set.
+
+    Args:
+        stations (list): Station metadata ({"id", "location": {"latitude", "longitude"}}) in
+            the column order the values will use.
+
+    Returns:
+        IDWInterpolator: Reused for as long as the same stations (ids and positions) report.
+    """
+    key = (
+        tuple((station["id"], station["location"]["longitude"], station["location"]["latitude"])
+              for station in stations),
+        cell_deg, k, power,
+    )
+    if key not in _interpolators:
+        _interpolators[key] = IDWInterpolator(
+            [station["location"]["longitude"] for station in stations],
+            [station["location"]["latitude"] for station in stations],
+            get_grid(cell_deg), k, power,
+        )
+    return _interpolators[key]
+
+
+def readings_matrix(readings, station_ids):
+    """
+    Stack API readings into [n_timestamps, n_stations] following station_ids, NaN where missing.
+
+    Returns:
+        tuple: (timestamps list, float64 values array).
+    """
+    columns = {station_id: column for column, station_id in enumerate(station_ids)}
+    values = np.full((len(readings), len(station_ids)), np.nan)
+    for row, entry in enumerate(readings):
+        for data_point in entry["data"]:
+            column = columns.get(data_point["stationId"])
+            if column is not None:
+                values[row, column] = data_point["value"]
+    return [entry["timestamp"] for entry in readings], values
+
+
+def plot_heatmap(ax, raster, grid, cmap="Blues", **kwargs):
+    """Draw one gridded raster on an Axes in lon/lat coordinates, above a drawn boundary fill."""
+    kwargs.setdefault("zorder", 1.5)
+    return ax.imshow(raster, origin="lower", extent=grid.extent, cmap=cmap, **kwargs)
+
+
+if __name__ == "__main__":
+    import time
+
+    from helper_functions import get_station_metadata
+
+    # Grid a day's worth of 1-minute rainfall for every station and time the batch
+    stations = get_station_metadata("rainfall")
+    interpolator = get_interpolator(stations)
+    values = np.random.default_rng(0).gamma(0.3, 1.0, size=(1440, len(stations)))
+
+    start_time = time.perf_counter()
+    rasters = interpolator.interpolate(values)
+    elapsed = time.perf_counter() - start_time
+    print(f"Gridded {len(values)} timestamps onto {interpolator.grid.n_cells} cells "
+          f"({rasters.shape[1]}x{rasters.shape[2]} raster) in {elapsed:.3f}s "
+          f"({len(values) / elapsed:.0f} timestamps/s)")
@@ -0,0 +1,153 @@
+import glob
+import json
+import os
+
+import numpy as np
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+UNKNOWN_REGION = "Unknown"
+
+
+class StationRegistry:
+    """
+    Station metadata and region lookups built once from the district map and station lists.
+
+    Every lookup is a dict access: id -> name, id -> region, region -> ids, name -> region,
+    plus a stable small integer code per station id for indexing NumPy arrays.
+    """
+
+    def __init__(self, district_map, stations=()):
+        self.district_map = district_map
+        self.region_by_name = {
+            name: region
+            for region, station_names in district_map.items()
+            for name in station_names
+        }
+        self.stations = {}
+        self.ids = []
+        self.codes = {}
+        self.region_by_id = {}
+        self.ids_by_region = {region: [] for region in district_map}
+        self.add_stations(stations)
+
+    def add_stations(self, stations):
+        """
+        Register station metadata (API "stations" lists or *_stations.json contents).
+
+        Stations already known keep their code; new ones are appended. Refreshed metadata for a
+        known station replaces the old entry (as merge_stations(overwrite=True) does), so a
+        renamed or moved station is placed again instead of keeping its stale name and region.
+        A station named in the district map takes that region; any other is placed by its
+        coordinates in the region outlines (see region_polygons). Without an outline file, or
+        outside every outline, it stays "Unknown".
+        """
+        unnamed = []
+        for station in stations:
+            station_id = station["id"]
+            known = self.stations.get(station_id)
+            if known == station:
+                continue
+            if known is not None:
+                self._clear_region(station_id)
+            self.stations[station_id] = station
+            self.code(station_id)
+            region = self.region_by_name.get(station["name"])
+            if region is None:
+                unnamed.append(station)
+            else:
+                self._set_region(station_id, region)
+
+        if unnamed:
+            from region_polygons import locate_regions
+
+            for station, region in zip(unnamed, locate_regions(unnamed)):
+                self._set_region(station["id"], region)
+        return self
+
+    def _set_region(self, station_id, region):
+        self.region_by_id[station_id] = region
+        self.ids_by_region.setdefault(region, []).append(station_id)
+
+    def _clear_region(self, station_id):
+        region = self.region_by_id.pop(station_id, None)
+        if region is not None:
+            self.ids_by_region[region].remove(station_id)
+
+    def name(self, station_id):
+        """Station name, or the id itself when the station is unknown."""
+        station = self.stations.get(station_id)
+        return station["name"] if station else station_id
+
+    def region(self, station_id):
+        """Region of a station id, "Unknown" when it is neither named in the district map nor located."""
+        return self.region_by_id.get(station_id, UNKNOWN_REGION)
+
+    def region_for_name(self, station_name):
+        """Region of a station name, "Unknown" when it is not in the district map."""
+        return self.region_by_name.get(station_name, UNKNOWN_REGION)
+
+    def station_ids(self, region):
+        """Station ids registered in a region."""
+        return self.ids_by_region.get(region, [])
+
+    def code(self, station_id):
+        """Integer code of a station id, assigning the next code to unseen ids."""
+        code = self.codes.get(station_id)
+        if code is None:
+            code = self.codes[station_id] = len(self.ids)
+            self.ids.append(station_id)
+        return code
+
+    def codes_for(self, station_ids):
+        """Integer codes for a sequence of station ids as an int32 array."""
+        return np.array([self.code(station_id) for station_id in station_ids], dtype=np.int32)
+
+    def region_codes(self):
+        """
+        Map every station code to a region index.
+
+        Returns:
+            tuple: (regions list, int32 array of region index per station code).
+        """
+        regions = list(self.district_map) + [UNKNOWN_REGION]
+        region_index = {region: i for i, region in enumerate(regions)}
+        return regions, np.array(
+            [region_index.get(self.region(station_id), len(regions) - 1) for station_id in self.ids],
+            dtype=np.int32,
+        )
+
+
+def load_station_files(data_dir=DATA_DIR):
+    """Read every *_stations.json file in data_dir into one list."""
+    stations = []
+    for station_file in sorted(glob.glob(os.path.join(data_dir, "*_stations.json"))):
+        with open(station_file, "r") as f:
+            stations.extend(json.load(f))
+    return stations
+
+
+_registries_by_map = {}
+
+
+def get_station_registry(district_map=None):
+    """
+    Return a memoized StationRegistry.
+
+    Args:
+        district_map (dict): Optional region -> station names mapping. Defaults to the
+            one in sg_districts_and_colors.json. One registry is kept per map object.
+
+    Returns:
+        StationRegistry: Registry seeded with every *_stations.json file.
+    """
+    if district_map is None:
+        from helper_functions import import_dictionaries
+
+        district_map = import_dictionaries()[0]
+
+    cached = _registries_by_map.get(id(district_map))
+    # Holding the map in the registry keeps its id from being reused
+    if cached is None or cached.district_map is not district_map:
+        cached = StationRegistry(district_map, load_station_files())
+        _registries_by_map[id(district_map)] = cached
+    return cached
@@ -0,0 +1,318 @@
+import json
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from bulk_fetch import dateRange
+from helper_functions import (
+    DATA_DIR,
+    get_or_load_daily_average_data,
+    get_or_load_daily_total_data,
+    load_daily_cache,
+)
+
+# Regression variables and the daily station caches they are read from:
+# name -> (API data type, "total" or "average", cache file pattern)
+VARIABLES = {
+    "rainfall": ("rainfall", "total", "daily_rainfall_by_location_{year}.json"),
+    "total windspeed": ("wind-speed", "total", "daily_total_windspeed_by_location_{year}.json"),
+    "windspeed": ("wind-speed", "average", "daily_wind-speed_by_location_{year}.json"),
+    "humidity": ("relative-humidity", "average", "daily_relative-humidity_by_location_{year}.json"),
+    "temperature": ("air-temperature", "average", "daily_air-temperature_by_location_{year}.json"),
+}
+
+# Saved model state, so a later run only folds in the new days
+# One state per row granularity: region rows and station rows are different samples
+STATE_FILE = os.path.join(DATA_DIR, "regression_{target}_on_{predictors}_by_{by}.json")
+SAVE_EVERY_DAYS = 30
+
+
+class StreamingRegression:
+    """
+    Ordinary least squares kept as its sufficient statistics (XᵀX, Xᵀy, yᵀy, n).
+
+    Rows are folded in as they arrive and never stored, so memory is O(predictors²)
+    whatever the date range. Fitting solves the normal equations on demand, and
+    `merge` combines models built over separate ranges.
+    """
+
+    def __init__(self, predictors, target, fit_intercept=True):
+        self.predictors = list(predictors)
+        self.target = target
+        self.fit_intercept = fit_intercept
+        k = len(self.predictors) + int(fit_intercept)
+        self.xtx = np.zeros((k, k))
+        self.xty = np.zeros(k)
+        self.yty = 0.0
+        self.sum_y = 0.0
+        self.n = 0
+        self.dates = set()
+
+    def _design(self, X):
+        X = np.asarray(X, dtype=np.float64).reshape(-1, len(self.predictors))
+        if self.fit_intercept:
+            X = np.column_stack([np.ones(len(X)), X])
+        return X
+
+    def update(self, X, y, date=None):
+        """
+        Fold in rows of predictors X [rows, predictors] and targets y. Rows with a NaN are skipped.
+
+        Returns:
+            int: Number of rows added.
+        """
+        X = self._design(X)
+        y = np.asarray(y, dtype=np.float64).ravel()
+        keep = ~(np.isnan(X).any(axis=1) | np.isnan(y))
+        X, y = X[keep], y[keep]
+
+        self.xtx += X.T @ X
+        self.xty += X.T @ y
+        self.yty += float(y @ y)
+        self.sum_y += float(y.sum())
+        self.n += len(y)
+        if date is not None:
+            self.dates.add(date)
+        return len(y)
+
+    def merge(self, other):
+        """Add another model's statistics (same predictors and target) to this one."""
+        if other.predictors != self.predictors or other.target != self.target:
+            raise ValueError("Cannot merge regressions over different variables")
+        self.xtx += other.xtx
+        self.xty += other.xty
+        self.yty += other.yty
+        self.sum_y += other.sum_y
+        self.n += other.n
+        self.dates |= other.dates
+        return self
+
+    def coefficients(self):
+        """
+        Least squares coefficients, intercept first when fitted.
+
+        Falls back to the minimum-norm solution when XᵀX is singular (e.g. a constant predictor).
+        """
+        try:
+            return np.linalg.solve(self.xtx, self.xty)
+        except np.linalg.LinAlgError:
+            return np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+
+    def fit(self):
+        """
+        Returns:
+            dict: {
+                "intercept": float (0 without an intercept),
+                "coefficients": {predictor: slope},
+                "standard_errors": {predictor: standard error of the slope},
+                "r2": float,
+                "n": int,
+            }
+        """
+        if self.n <= len(self.xty):
+            raise ValueError(f"Need more than {len(self.xty)} rows to fit, have {self.n}")
+
+        beta = self.coefficients()
+        sse = max(self.yty - 2 * beta @ self.xty + beta @ self.xtx @ beta, 0.0)
+        sst = self.yty - self.sum_y ** 2 / self.n if self.fit_intercept else self.yty
+        r2 = 1 - sse / sst if sst > 0 else float("nan")
+
+        sigma2 = sse / (self.n - len(beta))
+        standard_errors = np.sqrt(np.abs(np.diag(np.linalg.pinv(self.xtx))) * sigma2)
+
+        offset = int(self.fit_intercept)
+        return {
+            "intercept": float(beta[0]) if self.fit_intercept else 0.0,
+            "coefficients": dict(zip(self.predictors, beta[offset:].tolist())),
+            "standard_errors": dict(zip(self.predictors, standard_errors[offset:].tolist())),
+            "r2": float(r2),
+            "n": self.n,
+        }
+
+    def predict(self, X):
+        return self._design(X) @ self.coefficients()
+
+    def equation(self):
+        """The fitted model as text, e.g. "rainfall = 0.52 * humidity - 40.10  |  R² = 0.31"."""
+        result = self.fit()
+        terms = " + ".join(f"{slope:.2f} * {name}" for name, slope in result["coefficients"].items())
+        return f"{self.target} = {terms} + {result['intercept']:.2f}  |  R² = {result['r2']:.2f}  (n = {self.n})"
+
+    def to_dict(self):
+        return {
+            "predictors": self.predictors,
+            "target": self.target,
+            "fit_intercept": self.fit_intercept,
+            "xtx": self.xtx.tolist(),
+            "xty": self.xty.tolist(),
+            "yty": self.yty,
+            "sum_y": self.sum_y,
+            "n": self.n,
+            "dates": sorted(self.dates),
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        model = cls(state["predictors"], state["target"], state["fit_intercept"])
+        model.xtx = np.array(state["xtx"], dtype=np.float64)
+        model.xty = np.array(state["xty"], dtype=np.float64)
+        model.yty = state["yty"]
+        model.sum_y = state["sum_y"]
+        model.n = state["n"]
+        model.dates = set(state["dates"])
+        return model
+
+    def save(self, path):
+        temp_file = os.path.join(os.path.dirname(os.path.abspath(path)), f".{os.path.basename(path)}.tmp")
+        with open(temp_file, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(temp_file, path)
+
+    @classmethod
+    def load(cls, path, predictors, target, fit_intercept=True):
+        """Load saved state, or start an empty model when there is none for these variables."""
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                model = cls.from_dict(json.load(f))
+            if (model.predictors == list(predictors) and model.target == target
+                    and model.fit_intercept == fit_intercept):
+                return model
+        return cls(predictors, target, fit_intercept)
+
+
+class DailyStationValues:
+    """
+    Daily per-station values of the regression variables, read through the yearly daily caches.
+
+    Only the caches of the year being read are held; days missing from a cache are fetched
+    once and appended to it, exactly as the yearly scripts do.
+    """
+
+    def __init__(self, variables):
+        for variable in variables:
+            if variable not in VARIABLES:
+                raise ValueError(f"Unknown variable '{variable}', expected one of {list(VARIABLES)}")
+        self.variables = list(variables)
+        self.year = None
+        self.caches = {}
+
+    def _cache(self, variable, year):
+        if year != self.year:
+            self.year, self.caches = year, {}
+        if variable not in self.caches:
+            cache_filename = os.path.join(DATA_DIR, VARIABLES[variable][2].format(year=year))
+            self.caches[variable] = (load_daily_cache(cache_filename), cache_filename)
+        return self.caches[variable]
+
+    def day(self, date):
+        """{variable: {stationId: value}} for one "YYYY-MM-DD" date."""
+        values = {}
+        for variable in self.variables:
+            data_type, data_format, _ = VARIABLES[variable]
+            cache, cache_filename = self._cache(variable, int(date[:4]))
+            load = get_or_load_daily_total_data if data_format == "total" else get_or_load_daily_average_data
+            values[variable] = load(date, cache, cache_filename, data_type)
+        return values
+
+
+def day_rows(day_values, predictors, target, registry=None, by="region"):
+    """
+    Turn one day of station values into regression rows.
+
+    Args:
+        day_values (dict): {variable: {stationId: value}}, from `DailyStationValues.day`.
+        by (str): "region" averages each variable over the stations of a region (one row per
+            region, as plotLinearRegression does for a single day). "station" keeps stations
+            that report every variable.
+
+    Returns:
+        tuple: (X [rows, predictors], y [rows]) float64 arrays, NaN where a region lacks a variable.
+    """
+    variables = list(predictors) + [target]
+    if by == "station":
+        stations = set.intersection(*(set(day_values[variable]) for variable in variables))
+        table = np.array([[day_values[variable][s] for variable in variables] for s in sorted(stations)])
+        table = table.reshape(-1, len(variables))
+        return table[:, :-1], table[:, -1]
+
+    from station_registry import UNKNOWN_REGION, get_station_registry
+
+    registry = registry or get_station_registry()
+    regions = [region for region in registry.district_map if region != UNKNOWN_REGION]
+    table = np.full((len(regions), len(variables)), np.nan)
+    for column, variable in enumerate(variables):
+        by_region = {}
+        for station_id, value in day_values[variable].items():
+            by_region.setdefault(registry.region(station_id), []).append(value)
+        for row, region in enumerate(regions):
+            if region in by_region:
+                table[row, column] = np.mean(by_region[region])
+    return table[:, :-1], table[:, -1]
+
+
+def fit_range(predictors, target, start, end, model=None, state_path=None, by="region"):
+    """
+    Fold every day between start and end into a streaming regression.
+
+    Days already in the model (or in its saved state) are skipped, so extending the range
+    only reads the new days. Only complete days are folded in: today and later dates, and
+    days where a variable has no data (including days whose fetch was cut short), are left
+    out and picked up by a later run.
+
+    Args:
+        predictors (list): Predictor variables, keys of VARIABLES (e.g. ["humidity", "windspeed"]).
+        target (str): Target variable, e.g. "rainfall".
+        model (StreamingRegression): Model to update. Loaded from state_path when not given.
+        state_path (str): Where the model state is kept. Defaults to STATE_FILE for the variables.
+
+    Returns:
+        StreamingRegression: The updated model.
+    """
+    from station_registry import get_station_registry
+
+    if state_path is None:
+        state_path = STATE_FILE.format(target=target, predictors="+".join(predictors), by=by).replace(" ", "_")
+    if model is None:
+        model = StreamingRegression.load(state_path, predictors, target)
+
+    registry = get_station_registry()
+    source = DailyStationValues(list(predictors) + [target])
+    today = datetime.now().strftime("%Y-%m-%d")
+    new_days = 0
+    skipped = []
+    for date in dateRange(start, end):
+        if date in model.dates:
+            continue
+        if date >= today:
+            # Still filling in upstream; recording it now would freeze a partial day
+            skipped.append(date)
+            continue
+        day_values = source.day(date)
+        if not all(day_values.values()):
+            skipped.append(date)
+            continue
+        X, y = day_rows(day_values, predictors, target, registry, by)
+        model.update(X, y, date)
+        new_days += 1
+        if new_days % SAVE_EVERY_DAYS == 0:
+            model.save(state_path)
+
+    model.save(state_path)
+    print(f"Added {new_days} days, {model.n} rows over {len(model.dates)} days in total")
+    if skipped:
+        print(f"Skipped {len(skipped)} incomplete or empty days, a later run retries them")
+    return model
+
+
+if __name__ == "__main__":
+    # python streaming_regression.py 2023-01-01 2024-12-31 [target] [predictor ...]
+    start, end = (sys.argv[1], sys.argv[2]) if len(sys.argv) > 2 else ("2024-01-01", "2024-12-31")
+    target = sys.argv[3] if len(sys.argv) > 3 else "rainfall"
+    predictors = sys.argv[4:] or ["humidity", "windspeed", "temperature"]
+
+    model = fit_range(predictors, target, start, end)
+    print(model.equation())
+    for predictor, error in model.fit()["standard_errors"].items():
+        print(f"  {predictor}: standard error {error:.3f}")
@@ -0,0 +1,117 @@
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+# data.gov.sg reports every reading as "YYYY-MM-DDTHH:MM:SS+08:00"
+SG_UTC_OFFSET = "+08:00"
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+
+
+@lru_cache(maxsize=8)
+def offset_seconds(offset=SG_UTC_OFFSET):
+    """
+    Convert a "+HH:MM" / "-HH:MM" / "Z" suffix to seconds east of UTC (memoized).
+    """
+    if not offset or offset == "Z":
+        return 0
+    sign = -1 if offset[0] == "-" else 1
+    return sign * (int(offset[1:3]) * SECONDS_PER_HOUR + int(offset[4:6]) * 60)
+
+
+def parse_timestamp(timestamp):
+    """
+    Parse one API timestamp into a naive local datetime using fixed-offset slicing.
+
+    Args:
+        timestamp (str): "YYYY-MM-DDTHH:MM:SS+08:00"
+
+    Returns:
+        datetime: The local wall-clock time.
+    """
+    return datetime(
+        int(timestamp[0:4]),
+        int(timestamp[5:7]),
+        int(timestamp[8:10]),
+        int(timestamp[11:13]),
+        int(timestamp[14:16]),
+        int(timestamp[17:19]),
+    )
+
+
+def format_timestamp(timestamp):
+    """Convert "YYYY-MM-DDTHH:MM:SS+08:00" to "YYYY-MM-DD HH:MM:SS" by slicing."""
+    return f"{timestamp[:10]} {timestamp[11:19]}"
+
+
+def parse_hour_label(label):
+    """Parse a "YYYY-MM-DD HH:MM" hourly label into a datetime."""
+    return datetime.fromisoformat(label)
+
+
+def to_datetime64(timestamps):
+    """
+    Batch-convert API timestamps to local wall-clock datetime64[s].
+
+    Args:
+        timestamps (list): "YYYY-MM-DDTHH:MM:SS+08:00" strings.
+
+    Returns:
+        np.ndarray: datetime64[s] array.
+    """
+    # NumPy parses the offset-free ISO prefix in C
+    return np.array([timestamp[:19] for timestamp in timestamps], dtype="datetime64[s]")
+
+
+def to_local_seconds(timestamps):
+    """
+    Batch-convert API timestamps to int64 local wall-clock seconds since 1970-01-01.
+
+    Bucketing these with `hour_bucket` / `day_bucket` gives the local hours and days
+    the API reports.
+    """
+    return to_datetime64(timestamps).astype(np.int64)
+
+
+def to_epoch_seconds(timestamps):
+    """
+    Batch-convert API timestamps to int64 UTC epoch seconds.
+
+    Timestamps sharing the same offset (normally all of them) are shifted by the
+    cached offset in one array operation.
+    """
+    local_seconds = to_local_seconds(timestamps)
+    if not len(local_seconds):
+        return local_seconds
+
+    offsets = {timestamp[19:] for timestamp in timestamps}
+    if len(offsets) == 1:
+        return local_seconds - offset_seconds(offsets.pop())
+
+    shifts = np.array([offset_seconds(timestamp[19:]) for timestamp in timestamps], dtype=np.int64)
+    return local_seconds - shifts
+
+
+def hour_bucket(seconds):
+    """Floor int64 seconds to the start of their hour."""
+    return seconds // SECONDS_PER_HOUR * SECONDS_PER_HOUR
+
+
+def day_bucket(seconds, utc_offset=0):
+    """
+    Floor int64 seconds to the start of their day.
+
+    Args:
+        seconds (np.ndarray): Local seconds, or UTC epoch seconds with utc_offset set.
+        utc_offset (int): Seconds east of UTC to align days to local midnight.
+    """
+    return (seconds + utc_offset) // SECONDS_PER_DAY * SECONDS_PER_DAY - utc_offset
+
+
+def format_hour_labels(seconds):
+    """
+    Format int64 local seconds as "YYYY-MM-DD HH:00" labels in one NumPy call.
+    """
+    labels = np.datetime_as_string(hour_bucket(seconds).astype("datetime64[s]"), unit="m")
+    return np.char.replace(labels, "T", " ").tolist()
@@ -1,9 +1,9 @@
-import requests
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 import geopandas as gpd
 from shapely.geometry import Point
 import os
+from helper_functions import http_get
 
 
 # Helper function to fetch all windspeed data for a date
@@ -15,7 +15,7 @@ def getAllWindSpeedData(date):
     while True:
         # Make the request with paginationToken if it exists
         params = {"paginationToken": pagination_token} if pagination_token else {}
-        response = requests.get(url, params=params)
+        response = http_get(url, params=params)
         data = response.json()
 
         # Collect readings from the current response
@@ -1,9 +1,9 @@
-import requests
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 import geopandas as gpd
 import numpy as np
 import os
+from helper_functions import http_get
 
 
 # Helper function to fetch all data for a given endpoint
@@ -14,7 +14,7 @@ def getAllData(endpoint, date):
 
     while True:
         params = {"paginationToken": pagination_token} if pagination_token else {}
-        response = requests.get(url, params=params)
+        response = http_get(url, params=params)
         data = response.json()
         all_readings.extend(data["data"]["readings"])
         pagination_token = data["data"].get("paginationToken")
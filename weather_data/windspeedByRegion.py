@@ -1,6 +1,7 @@
 import matplotlib.pyplot as plt 
 from windSpeedByDateScatterPlot import getAllWindSpeedData
 from helper_functions import import_dictionaries
+from station_registry import get_station_registry
 
 district_map, zone_color_map = import_dictionaries()
 
@@ -9,13 +10,7 @@ def calculateAverageWindSpeedByRegion(all_data):
     readings = all_data["readings"]
 
     # Map station IDs to their regions
-    station_to_region = {}
-    for station in stations:
-        station_name = station["name"]
-        for region, station_list in district_map.items():
-            if station_name in station_list:
-                station_to_region[station["id"]] = region
-                break
+    registry = get_station_registry(district_map).add_stations(stations)
 
     # Initialize data structure for region totals
     region_totals = {region: 0 for region in district_map.keys()}
@@ -26,9 +21,9 @@ def calculateAverageWindSpeedByRegion(all_data):
         for station_data in reading["data"]:
             station_id = station_data["stationId"]
             windspeed = station_data["value"]
-            region = station_to_region.get(station_id)
+            region = registry.region(station_id)
 
-            if region:
+            if region in region_totals:
                 region_totals[region] += windspeed
                 region_counts[region] += 1
 
@@ -41,25 +36,26 @@ def calculateAverageWindSpeedByRegion(all_data):
     return region_averages
 
 # Plot the average windspeed by region
-def plotAverageWindSpeed(region_averages, date):
+def plotAverageWindSpeed(region_averages, date, ax=None):
     regions = list(region_averages.keys())
     avg_windspeeds = list(region_averages.values())
     colors = [zone_color_map[region] for region in regions]
 
-    plt.figure(figsize=(10, 6))
-    bars = plt.bar(regions, avg_windspeeds, color=colors)
+    if ax is None:
+        ax = plt.figure(figsize=(10, 6)).gca()
+    bars = ax.bar(regions, avg_windspeeds, color=colors)
 
     # Add labels and title
-    plt.xlabel("Regions")
-    plt.ylabel("Average Windspeed (knots)")
-    plt.title(f"Average Windspeed by Region on {date}")
+    ax.set_xlabel("Regions")
+    ax.set_ylabel("Average Windspeed (knots)")
+    ax.set_title(f"Average Windspeed by Region on {date}")
 
     # Annotate bar heights
     for bar, avg_windspeed in zip(bars, avg_windspeeds):
-        plt.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.05,
-                 f"{avg_windspeed:.1f}", ha="center", va="bottom")
+        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.05,
+                f"{avg_windspeed:.1f}", ha="center", va="bottom")
 
-    plt.tight_layout()
+    ax.figure.tight_layout()
 
 # Calculate total windspeed by region
 def calculateTotalWindSpeedByRegion(all_data, district_map):
@@ -67,13 +63,7 @@ def calculateTotalWindSpeedByRegion(all_data, district_map):
     readings = all_data["readings"]
 
     # Map station names to regions
-    station_to_region = {}
-    for station in stations:
-        station_name = station["name"]
-        for region, station_list in district_map.items():
-            if station_name in station_list:
-                station_to_region[station["id"]] = region
-                break
+    registry = get_station_registry(district_map).add_stations(stations)
 
     # Initialize data structure for region totals
     region_totals = {region: 0 for region in district_map.keys()}
@@ -83,33 +73,34 @@ def calculateTotalWindSpeedByRegion(all_data, district_map):
         for station_data in reading["data"]:
             station_id = station_data["stationId"]
             windspeed = station_data["value"]
-            region = station_to_region.get(station_id)
+            region = registry.region(station_id)
 
-            if region:
+            if region in region_totals:
                 region_totals[region] += windspeed
 
     return region_totals
 
 # Plot total windspeed by region
-def plotTotalWindSpeed(region_totals, zone_color_map, date):
+def plotTotalWindSpeed(region_totals, zone_color_map, date, ax=None):
     regions = list(region_totals.keys())
     total_windspeeds = list(region_totals.values())
     colors = [zone_color_map[region] for region in regions]
 
-    plt.figure(figsize=(10, 6))
-    bars = plt.bar(regions, total_windspeeds, color=colors)
+    if ax is None:
+        ax = plt.figure(figsize=(10, 6)).gca()
+    bars = ax.bar(regions, total_windspeeds, color=colors)
 
     # Add labels and title
-    plt.xlabel("Regions")
-    plt.ylabel("Total Windspeed (knots)")
-    plt.title(f"Total Windspeed by Region on {date}")
+    ax.set_xlabel("Regions")
+    ax.set_ylabel("Total Windspeed (knots)")
+    ax.set_title(f"Total Windspeed by Region on {date}")
 
     # Annotate bar heights
     for bar, total_windspeed in zip(bars, total_windspeeds):
-        plt.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.1,
-                 f"{total_windspeed:.1f}", ha="center", va="bottom")
+        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.1,
+                f"{total_windspeed:.1f}", ha="center", va="bottom")
 
-    plt.tight_layout()
+    ax.figure.tight_layout()
     # plt.show()
 
 # Main program
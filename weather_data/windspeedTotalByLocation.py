@@ -1,5 +1,3 @@
-import os
-import json
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 
@@ -7,7 +5,7 @@ from datetime import datetime, timedelta
 # 1) Import your helper funcs
 # ----------------------------
 from helper_functions import (
-    getDataTypeFromDate,       # Already defined, uses pagination
+    get_station_metadata,      # TTL-cached station list
     load_daily_cache,  # Adds daily data into your rolling output dict
     get_or_load_daily_total_data,
     # station_json + weather_data -> station_id:[name,0]
@@ -15,6 +13,7 @@ from helper_functions import (
     cleanupStationNames,        # returns [locations],[rain_values]
     import_dictionaries,
 )
+from bulk_fetch import backfill_daily_cache
 
 
 # ----------------------------
@@ -31,18 +30,16 @@ if __name__ == "__main__":
     # 4.2) Load or initialize our daily cache
     daily_cache = load_daily_cache(f"daily_total_windspeed_by_location_{year}.json")
 
+    # Fetch every uncached day of the range concurrently
+    backfill_daily_cache(
+        "wind-speed", start_date, end_date, daily_cache,
+        f"daily_total_windspeed_by_location_{year}.json")
+
     # 4.3) Create an overall "yearly" accumulation dict:
     #      station_id -> [station_name, total_rainfall_for_the_range]
-    # We must seed it with some weather_data so createOutputDict has "stations" info.
-    # Let's just pick the first day in the range (or skip if no data).
-    initial_data = getDataTypeFromDate(
-        "wind-speed", start_date.strftime("%Y-%m-%d"))
-    if not initial_data:
-        initial_data = {"stations": []}  # fallback
-
-    # This merges station data from "rainfall_stations.json" plus the first day's stations
-    yearly_output_dict = createOutputDict(
-        "wind_stations.json", initial_data)
+    # Station metadata comes from the TTL cache instead of a live call for the first day
+    stations_list = get_station_metadata("wind-speed")
+    yearly_output_dict = createOutputDict(None, {"stations": stations_list})
 
     # 4.4) For each date in the range, get daily data from the cache or API
     current_date = start_date
@@ -64,20 +61,6 @@ if __name__ == "__main__":
         current_date += day_delta
 
     # 4.5) Convert station codes to proper names, get parallel lists
-    # We do NOT call your older station cleanup function that checks "S" + digit,
-    # because we have "cleanupStationNames(stations_list, output_dict)" which uses:
-    #   for reading in output_dict.values(): ...
-    #   ...
-    # But it requires a list of station objects => 'stations_list'
-    # So let's retrieve that from "rainfall_stations.json" or from an API call
-    if os.path.exists("wind_stations.json"):
-        with open("wind_stations.json", "r") as f:
-            # a list of dicts with "id" and "name"
-            stations_list = json.load(f)
-    else:
-        # fallback if file not found
-        stations_list = []
-
     # Now run your provided function:
     locations, rainfall_values = cleanupStationNames(
         stations_list, yearly_output_dict)
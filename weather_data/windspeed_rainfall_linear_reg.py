@@ -1,3 +1,5 @@
+import sys
+
 import matplotlib.pyplot as plt
 import numpy as np
 from scipy.stats import pearsonr
@@ -72,6 +74,16 @@ def plotLinearRegression(
 
 
 if __name__ == "__main__":
+    # python windspeed_rainfall_linear_reg.py START END fits over every day in the range from the
+    # daily caches, updating the saved models with only the days they have not seen
+    if len(sys.argv) > 2:
+        from streaming_regression import fit_range
+
+        for windspeed_type in ("total windspeed", "windspeed"):
+            model = fit_range([windspeed_type], "rainfall", sys.argv[1], sys.argv[2])
+            print(model.equation())
+        sys.exit()
+
     # Specify the date for data
     date = "2025-01-11"
 
@@ -5,9 +5,7 @@ import path from "path";
 import {
     getAvgIntervalQuery,
     getMultiDbAvgQuery,
-    // getMultiDbMonthlyAvgQuery,
-    // getMinutelyAvgIntervalQuery,
-    // getHourlyAvgIntervalQuery
+    getAvgParams,
 } from "@/utils/average_data_queries"; // Import optimized queries
 
 import {
@@ -20,6 +18,7 @@ import {
     getHourlyIntervalQuery,
     getDailyIntervalQuery,
     getMonthlyIntervalQuery,
+    getRangeParams,
 } from "@/utils/actual_data_queries"; // Import optimized queries
 
 import { Database } from "sqlite";
@@ -90,14 +89,18 @@ async function getWeatherData(
         `Querying data for interval: ${interval} from ${startDate} to ${endDate}`
     );
 
-    const intervalNum = parseInt(interval.substring(0, -1));
-    const year = parseInt(startDate.substring(0, 4));
-    const month = startDate.substring(5, 7);
-    const day = startDate.substring(8, 10);
     const hour = startDate.substring(11, 13);
     const minute = startDate.substring(14, 16);
+    // Every query filters on epoch seconds; calendar alignment comes from $start and
+    // averages take the rollup period boundaries of the range instead
+    const rangeParams = getRangeParams(startDate, endDate);
+
+    const queries = params.map((param) => {
+        const average = () =>
+            years.length > 1
+                ? getMultiDbAvgQuery(years, param)
+                : getAvgIntervalQuery(param);
 
-    const queryPromises = params.map((param) => {
         switch (interval) {
             case "1min":
             case "5min":
@@ -116,9 +119,7 @@ async function getWeatherData(
                               minute
                           );
                 } else {
-                    return years.length > 1
-                        ? getMultiDbAvgQuery(years)
-                        : getAvgIntervalQuery();
+                    return average();
                 }
             }
 
@@ -144,9 +145,7 @@ async function getWeatherData(
                               minute
                           );
                 } else {
-                    return years.length > 1
-                        ? getMultiDbAvgQuery(years)
-                        : getAvgIntervalQuery();
+                    return average();
                 }
 
             case "1day":
@@ -156,22 +155,11 @@ async function getWeatherData(
                         ? getMultiDbDailyIntervalQuery(
                               years,
                               param,
-                              parseInt(interval),
-                              startDate,
-                              hour,
-                              minute
+                              parseInt(interval)
                           )
-                        : getDailyIntervalQuery(
-                              param,
-                              parseInt(interval),
-                              startDate,
-                              hour,
-                              minute
-                          );
+                        : getDailyIntervalQuery(param, parseInt(interval));
                 } else {
-                    return years.length > 1
-                        ? getMultiDbAvgQuery(years)
-                        : getAvgIntervalQuery();
+                    return average();
                 }
             case "1month":
             case "6month":
@@ -180,38 +168,21 @@ async function getWeatherData(
                         ? getMultiDbMonthlyIntervalQuery(
                               years,
                               param,
-                              parseInt(interval),
-                              day,
-                              hour,
-                              minute,
-                              startDate
+                              parseInt(interval)
                           )
-                        : getMonthlyIntervalQuery(
-                              param,
-                              parseInt(interval),
-                              day,
-                              hour,
-                              minute,
-                              startDate
-                          );
+                        : getMonthlyIntervalQuery(param, parseInt(interval));
                 } else {
-                    return years.length > 1
-                        ? getMultiDbAvgQuery(years)
-                        : getAvgIntervalQuery();
+                    return average();
                 }
             case "1year":
                 if (heatmapMode === "snapshot") {
                     return getMultiDbYearlyIntervalQuery(
                         years,
                         param,
-                        parseInt(interval),
-                        month,
-                        day,
-                        hour,
-                        minute
+                        parseInt(interval)
                     );
                 } else {
-                    return getMultiDbAvgQuery(years);
+                    return getMultiDbAvgQuery(years, param);
                 }
 
             default:
@@ -220,15 +191,15 @@ async function getWeatherData(
     });
 
     // Run queries in parallel
-
     const queryResults = await Promise.all(
-        queryPromises.map(async (q) => {
-            // Dynamically generate the correct number of parameters
-            const queryParams = years.flatMap(() => [startDate, endDate]);
-
-            const result = await db.all(q, queryParams);
-            return result;
-        })
+        queries.map((q, i) =>
+            db.all(
+                q,
+                heatmapMode === "snapshot"
+                    ? rangeParams
+                    : getAvgParams(params[i], startDate, endDate)
+            )
+        )
     );
 
     await db.close();
@@ -1,190 +1,138 @@
-export const getMinutelyIntervalQuery = (table: string, interval: number, minute: string ) => {
-    console.log("running snapshot minute")
-    return `SELECT 
-        strftime('%Y-%m-%d %H:%M:00', timestamp) AS interval_start, 
-        *
-    FROM ${table}
-    WHERE timestamp BETWEEN ? AND ?
-    AND ((CAST(strftime('%M', timestamp) AS INTEGER) - ${minute}) % ${interval}) = 0
-    ORDER BY interval_start, stationId;
-    `;
+// Parameter rows live in {param}_data tables keyed by integer station code and UTC epoch
+// seconds (ts); station_codes maps the codes back to station ids. Every query takes its range
+// as the named parameters $start and $end (epoch seconds, inclusive), so the ts index does the
+// filtering, and returns rows in the original (date, timestamp, stationId, value) shape.
+export const SG_UTC_OFFSET_SECONDS = 8 * 3600;
+export const WIND_COMBINED = "wind_combined";
+
+// 'YYYY-MM-DD HH:mm' in Singapore time -> UTC epoch seconds
+export const toEpochSeconds = (localDateTime: string) =>
+    Math.floor(Date.parse(`${localDateTime.replace(" ", "T")}+08:00`) / 1000);
+
+export const getRangeParams = (startDate: string, endDate: string) => ({
+    $start: toEpochSeconds(startDate),
+    $end: toEpochSeconds(endDate),
+});
+
+// Local wall-clock time of a row in epoch seconds, for calendar conditions
+const localTs = (ts: string) => `${ts} + ${SG_UTC_OFFSET_SECONDS}`;
+
+// Rows of a table (in an attached database when schema is "weather_{year}.") between $start
+// and $end, with ts as an extra column
+export const getRangeQuery = (table: string, schema = "") => {
+    if (table === WIND_COMBINED) {
+        // wind_combined keeps its text timestamps: narrow by its leading date key, then compare epochs
+        return `SELECT w.*
+        FROM (
+            SELECT *, CAST(strftime('%s', timestamp) AS INTEGER) - ${SG_UTC_OFFSET_SECONDS} AS ts
+            FROM ${schema}${WIND_COMBINED}
+            WHERE date BETWEEN date(${localTs("$start")}, 'unixepoch') AND date(${localTs("$end")}, 'unixepoch')
+        ) w
+        WHERE w.ts BETWEEN $start AND $end`;
+    }
+    return `SELECT
+            date(${localTs("d.ts")}, 'unixepoch') AS date,
+            datetime(${localTs("d.ts")}, 'unixepoch') AS timestamp,
+            s.stationId AS stationId,
+            d.value AS value,
+            d.ts AS ts
+        FROM ${schema}${table}_data d
+        JOIN ${schema}station_codes s ON s.code = d.station
+        WHERE d.ts BETWEEN $start AND $end`;
 };
 
-export const getHourlyIntervalQuery = (table: string, interval: number, hour: string, minute: string) => {
-    console.log(interval,  hour, minute)
-    return `SELECT 
-        strftime('%Y-%m-%d %H:%M:00', timestamp) AS hour_start, 
-        *
-    FROM ${table}
-    WHERE timestamp BETWEEN ? AND ?
-    AND ((CAST(strftime('%H', timestamp) AS INTEGER) - ${hour}) % ${interval}) = 0
-    AND strftime('%M', timestamp) = '${minute}'
-    ORDER BY hour_start, stationId;
+// One query per year database, merged and ordered
+const acrossYears = (years: number[], part: (schema: string) => string, orderBy: string) =>
+    years.map((year) => part(`weather_${year}.`)).join("\nUNION ALL\n") + `\nORDER BY ${orderBy};`;
+
+const minutelyPart = (table: string, interval: number, minute: string) => (schema: string) => `
+        SELECT
+            strftime('%Y-%m-%d %H:%M:00', ${localTs("r.ts")}, 'unixepoch') AS interval_start,
+            r.*
+        FROM (${getRangeQuery(table, schema)}) r
+        WHERE ((r.ts / 60 % 60) - ${Number(minute)}) % ${interval} = 0
     `;
-};
 
+const hourlyPart = (table: string, interval: number, hour: string, minute: string) => (schema: string) => `
+        SELECT
+            strftime('%Y-%m-%d %H:%M:00', ${localTs("r.ts")}, 'unixepoch') AS hour_start,
+            r.*
+        FROM (${getRangeQuery(table, schema)}) r
+        WHERE (((${localTs("r.ts")}) / 3600 % 24) - ${Number(hour)}) % ${interval} = 0
+        AND r.ts / 60 % 60 = ${Number(minute)}
+    `;
 
-export const getDailyIntervalQuery = (table: string, interval: number, startDate: string, hour: string, minute: string) => {
-    return `SELECT 
-        timestamp AS day_start, 
-        *
-    FROM ${table}
-    WHERE timestamp BETWEEN ? AND ?
-    AND timestamp LIKE '% ${hour}:${minute}:00'  -- Fast time filtering using LIKE
-    AND (
-        timestamp = '${startDate} ${hour}:${minute}:00'  -- Explicitly include start date
-        OR 
-        (
-            -- Efficient month-based interval calculation using Julian days
-            (CAST(julianday(timestamp) AS INTEGER) - CAST(julianday('${startDate}') AS INTEGER)) % ${interval} = 0
-        )
-    )
-    ORDER BY day_start, stationId;`;
-};
+// Every interval-th day at the start's time of day
+const dailyPart = (table: string, interval: number) => (schema: string) => `
+        SELECT
+            r.timestamp AS day_start,
+            r.*
+        FROM (${getRangeQuery(table, schema)}) r
+        WHERE (r.ts - $start) % ${interval * 86400} = 0
+    `;
 
+// Every interval-th month on the start's day of month and time of day
+const monthlyPart = (table: string, interval: number) => (schema: string) => `
+        SELECT
+            r.timestamp AS month_start,
+            r.*
+        FROM (${getRangeQuery(table, schema)}) r
+        WHERE strftime('%d %H:%M:%S', ${localTs("r.ts")}, 'unixepoch') = strftime('%d %H:%M:%S', ${localTs("$start")}, 'unixepoch')
+        AND (
+            CAST(strftime('%Y', ${localTs("r.ts")}, 'unixepoch') AS INTEGER) * 12 + CAST(strftime('%m', ${localTs("r.ts")}, 'unixepoch') AS INTEGER)
+            - CAST(strftime('%Y', ${localTs("$start")}, 'unixepoch') AS INTEGER) * 12 - CAST(strftime('%m', ${localTs("$start")}, 'unixepoch') AS INTEGER)
+        ) % ${interval} = 0
+    `;
 
+// Every interval-th year on the start's date and time of day
+const yearlyPart = (table: string, interval: number) => (schema: string) => `
+        SELECT
+            r.timestamp AS year_start,
+            r.*
+        FROM (${getRangeQuery(table, schema)}) r
+        WHERE strftime('%m-%d %H:%M:%S', ${localTs("r.ts")}, 'unixepoch') = strftime('%m-%d %H:%M:%S', ${localTs("$start")}, 'unixepoch')
+        AND (
+            CAST(strftime('%Y', ${localTs("r.ts")}, 'unixepoch') AS INTEGER)
+            - CAST(strftime('%Y', ${localTs("$start")}, 'unixepoch') AS INTEGER)
+        ) % ${interval} = 0
+    `;
 
-export const getMonthlyIntervalQuery = (table: string, interval: number, day: string, hour: string, minute: string, startDate: string) => {
-    return `SELECT 
-        strftime('%Y-%m-%d ${hour}:${minute}:00', timestamp) AS month_start, 
-        *
-    FROM ${table}
-    WHERE timestamp BETWEEN ? AND ?
-    AND (
-        (CAST(strftime('%Y', timestamp) AS INTEGER) - CAST(strftime('%Y', '${startDate}') AS INTEGER)) * 12
-        + (CAST(strftime('%m', timestamp) AS INTEGER) - CAST(strftime('%m', '${startDate}') AS INTEGER))
-    ) % ${interval} = 0  -- Ensures interval from the start date
-    AND CAST(strftime('%d', timestamp) AS INTEGER) = ${day}  -- Ensure exact day match
-    AND strftime('%H:%M', timestamp) = '${hour}:${minute}'  -- Ensure exact time match
-    ORDER BY month_start, stationId;`;
+export const getMinutelyIntervalQuery = (table: string, interval: number, minute: string) => {
+    console.log("running snapshot minute");
+    return minutelyPart(table, interval, minute)("") + "ORDER BY interval_start, stationId;";
 };
 
-export const getMultiDbMinutelyIntervalQuery = (
-    years: number[],
-    table: string,
-    interval: number,
-    minute: string
-) => {
-    const queries = years.map(
-        (year) => `
-        SELECT 
-            strftime('%Y-%m-%d %H:%M:00', timestamp) AS interval_start, 
-            *
-        FROM weather_${year}.${table}
-        WHERE timestamp BETWEEN ? AND ?
-        AND ((CAST(strftime('%M', timestamp) AS INTEGER) - ${minute}) % ${interval}) = 0
-    `
-    );
-    return queries.join("\nUNION ALL\n") + "\nORDER BY interval_start, stationId;";
+export const getHourlyIntervalQuery = (table: string, interval: number, hour: string, minute: string) => {
+    console.log(interval, hour, minute);
+    return hourlyPart(table, interval, hour, minute)("") + "ORDER BY hour_start, stationId;";
 };
 
+export const getDailyIntervalQuery = (table: string, interval: number) =>
+    dailyPart(table, interval)("") + "ORDER BY day_start, stationId;";
 
-export const getMultiDbHourlyIntervalQuery = (
-    years: number[],
-    table: string,
-    interval: number,
-    hour: string,
-    minute: string
-) => {
-    const queries = years.map(
-        (year) => `
-        SELECT  
-            strftime('%Y-%m-%d %H:%M:00', timestamp) AS hour_start, 
-            *
-        FROM weather_${year}.${table}
-        WHERE timestamp BETWEEN ? AND ?
-        AND ((CAST(strftime('%H', timestamp) AS INTEGER) - ${hour}) % ${interval}) = 0
-        AND strftime('%M', timestamp) = '${minute}'
-    `
-    );
-    return queries.join("\nUNION ALL\n") + "\nORDER BY hour_start, stationId;";
-};
+export const getMonthlyIntervalQuery = (table: string, interval: number) =>
+    monthlyPart(table, interval)("") + "ORDER BY month_start, stationId;";
 
-export const getMultiDbDailyIntervalQuery = (
+export const getMultiDbMinutelyIntervalQuery = (
     years: number[],
     table: string,
     interval: number,
-    startDate: string,
-    hour: string,
     minute: string
-) => {
-    const queries = years.map(
-        (year) => `
-        SELECT 
-            timestamp AS day_start, 
-            *
-        FROM weather_${year}.${table}
-        WHERE timestamp BETWEEN ? AND ?
-        AND timestamp LIKE '% ${hour}:${minute}:00'  -- Faster than strftime('%H:%M', timestamp)
-        AND (
-            timestamp = '${startDate} ${hour}:${minute}:00'  -- Explicitly include start date
-            OR 
-            (
-                (CAST((strftime('%s', timestamp) - strftime('%s', '${startDate}')) / 86400 AS INTEGER)) % ${interval} = 0
-            )
-        )
-        `
-    );
-
-    return queries.join("\nUNION ALL\n") + "\nORDER BY day_start, stationId;";
-};
-
+) => acrossYears(years, minutelyPart(table, interval, minute), "interval_start, stationId");
 
-export const getMultiDbMonthlyIntervalQuery = (
+export const getMultiDbHourlyIntervalQuery = (
     years: number[],
     table: string,
     interval: number,
-    day: string,
     hour: string,
-    minute: string,
-    startDate: string
-) => {
-    const queries = years.map(
-        (year) => `
-        SELECT 
-            timestamp AS month_start, 
-            *
-        FROM weather_${year}.${table}
-        WHERE timestamp BETWEEN ? AND ?
-        AND timestamp LIKE '% ${hour}:${minute}:00' -- Fast filtering of time without function calls
-        AND substr(timestamp, 9, 2) = '${day}' -- Direct substring match for day
-        AND (
-            timestamp = '${startDate} ${hour}:${minute}:00' -- Ensure start date is included
-            OR 
-            (
-                (CAST(substr(timestamp, 1, 4) AS INTEGER) - CAST(substr('${startDate}', 1, 4) AS INTEGER)) * 12
-                + (CAST(substr(timestamp, 6, 2) AS INTEGER) - CAST(substr('${startDate}', 6, 2) AS INTEGER))
-            ) % ${interval} = 0
-        )
-        `
-    );
-
-    return queries.join("\nUNION ALL\n") + "\nORDER BY month_start, stationId;";
-};
-
-
+    minute: string
+) => acrossYears(years, hourlyPart(table, interval, hour, minute), "hour_start, stationId");
 
+export const getMultiDbDailyIntervalQuery = (years: number[], table: string, interval: number) =>
+    acrossYears(years, dailyPart(table, interval), "day_start, stationId");
 
+export const getMultiDbMonthlyIntervalQuery = (years: number[], table: string, interval: number) =>
+    acrossYears(years, monthlyPart(table, interval), "month_start, stationId");
 
-export const getMultiDbYearlyIntervalQuery = (
-    years: number[],
-    table: string,
-    interval: number,
-    month: string,
-    day: string,
-    hour: string,
-    minute: string
-) => {
-    const queries = years.map(
-        (year) => `
-        SELECT 
-            strftime('%Y-${month}-${day} ${hour}:${minute}:00', timestamp, '-' || (strftime('%Y', timestamp) % ${interval}) || ' years') AS year_start, 
-            *
-        FROM weather_${year}.${table}
-        WHERE timestamp BETWEEN ? AND ?
-        AND (strftime('%Y', timestamp) % ${interval}) = 0
-        AND strftime('%m-%d %H:%M', timestamp) = '${month}-${day} ${hour}:${minute}'
-    `
-    );
-    return queries.join("\nUNION ALL\n") + "\nORDER BY year_start, stationId;";
-};
+export const getMultiDbYearlyIntervalQuery = (years: number[], table: string, interval: number) =>
+    acrossYears(years, yearlyPart(table, interval), "year_start, stationId");
@@ -1,150 +1,114 @@
-export const getAvgIntervalQuery = () => {
-    console.log("run avg");
-    return `SELECT 
-        date,
-        stationId,
-        AVG(value) as value
-    FROM rainfall
-    WHERE timestamp BETWEEN ? AND ?
-    GROUP BY stationId
-    ORDER BY stationId;
-    `;
+import {
+    getRangeParams,
+    getRangeQuery,
+    SG_UTC_OFFSET_SECONDS,
+    toEpochSeconds,
+    WIND_COMBINED,
+} from "@/utils/actual_data_queries";
+
+// Averages read the {param}_rollup_hourly / _daily / _weekly tables the ingester keeps, which
+// hold a sum and count per station and period. A range is tiled with the coarsest periods that
+// fit inside it: whole weeks, then whole days, then whole hours, and only the minutes left at
+// either end are read from {param}_data. Weekly rows are keyed by their Monday, and a week that
+// spans new year is split between the two year databases, so the sums and counts of every
+// attached database are added up before dividing.
+const HOUR = 3600;
+const DAY = 24 * HOUR;
+const WEEK = 7 * DAY;
+// Local midnight of 1970-01-01, and of Monday 1970-01-05 for week boundaries
+const LOCAL_DAY_ORIGIN = -SG_UTC_OFFSET_SECONDS;
+const LOCAL_WEEK_ORIGIN = 4 * DAY - SG_UTC_OFFSET_SECONDS;
+
+const ceilTo = (ts: number, unit: number, origin = 0) => Math.ceil((ts - origin) / unit) * unit + origin;
+const floorTo = (ts: number, unit: number, origin = 0) => Math.floor((ts - origin) / unit) * unit + origin;
+
+// Period boundaries (epoch seconds) of the tiling of [start, stop)
+export const getRollupParams = (startDate: string, endDate: string) => {
+    const $start = toEpochSeconds(startDate);
+    const $stop = toEpochSeconds(endDate) + 60; // The end minute is inclusive
+
+    let $hourStart = ceilTo($start, HOUR);
+    let $hourEnd = floorTo($stop, HOUR);
+    if ($hourStart >= $hourEnd) $hourStart = $hourEnd = $stop;
+    let $dayStart = ceilTo($hourStart, DAY, LOCAL_DAY_ORIGIN);
+    let $dayEnd = floorTo($hourEnd, DAY, LOCAL_DAY_ORIGIN);
+    if ($dayStart >= $dayEnd) $dayStart = $dayEnd = $hourEnd;
+    let $weekStart = ceilTo($dayStart, WEEK, LOCAL_WEEK_ORIGIN);
+    let $weekEnd = floorTo($dayEnd, WEEK, LOCAL_WEEK_ORIGIN);
+    if ($weekStart >= $weekEnd) $weekStart = $weekEnd = $dayEnd;
+
+    return { $start, $hourStart, $dayStart, $weekStart, $weekEnd, $dayEnd, $hourEnd, $stop };
 };
 
-export const getMultiDbAvgQuery = (years: number[]) => {
-    const queries = years.map(
-        (year) => `
-        SELECT 
-            stationId,
-            AVG(value) AS avg_value
-        FROM weather_${year}.rainfall   
-        WHERE timestamp BETWEEN ? AND ?
+// Named parameters of the average query of a table
+export const getAvgParams = (table: string, startDate: string, endDate: string) =>
+    table === WIND_COMBINED ? getRangeParams(startDate, endDate) : getRollupParams(startDate, endDate);
+
+const localDate = (ts: string) => `date(${ts} + ${SG_UTC_OFFSET_SECONDS}, 'unixepoch')`;
+const localHour = (ts: string) => `datetime(${ts} + ${SG_UTC_OFFSET_SECONDS}, 'unixepoch')`;
+
+const rawSums = (table: string, schema: string, from: string, to: string) => `
+        SELECT s.stationId AS stationId, SUM(d.value) AS sum, COUNT(d.value) AS count
+        FROM ${schema}${table}_data d
+        JOIN ${schema}station_codes s ON s.code = d.station
+        WHERE d.ts >= ${from} AND d.ts < ${to}
+        GROUP BY d.station`;
+
+// The hourly primary key leads with the date, so bound it as well as the hour
+const hourlySums = (table: string, schema: string, from: string, to: string) => `
+        SELECT stationId, sum, count
+        FROM ${schema}${table}_rollup_hourly
+        WHERE date BETWEEN ${localDate(from)} AND ${localDate(to)}
+        AND hour >= ${localHour(from)} AND hour < ${localHour(to)}`;
+
+const dailySums = (table: string, schema: string, from: string, to: string) => `
+        SELECT stationId, sum, count
+        FROM ${schema}${table}_rollup_daily
+        WHERE date >= ${localDate(from)} AND date < ${localDate(to)}`;
+
+const weeklySums = (table: string, schema: string, from: string, to: string) => `
+        SELECT stationId, sum, count
+        FROM ${schema}${table}_rollup_weekly
+        WHERE week >= ${localDate(from)} AND week < ${localDate(to)}`;
+
+// Per-station sums and counts of one database
+const sumsPart = (table: string) => (schema: string) =>
+    table === WIND_COMBINED
+        ? `
+        SELECT stationId, SUM(speed) AS sum, COUNT(speed) AS count, SUM(u) AS u_sum, SUM(v) AS v_sum
+        FROM (${getRangeQuery(table, schema)})
         GROUP BY stationId
     `
-    );
+        : [
+              rawSums(table, schema, "$start", "$hourStart"),
+              hourlySums(table, schema, "$hourStart", "$dayStart"),
+              dailySums(table, schema, "$dayStart", "$weekStart"),
+              weeklySums(table, schema, "$weekStart", "$weekEnd"),
+              dailySums(table, schema, "$weekEnd", "$dayEnd"),
+              hourlySums(table, schema, "$dayEnd", "$hourEnd"),
+              rawSums(table, schema, "$hourEnd", "$stop"),
+          ].join("\nUNION ALL\n");
 
-    // Wrap the UNION ALL query inside another SELECT to get the final average
-    return `
-        SELECT stationId, AVG(avg_value) AS value 
-        FROM (
-            ${queries.join("\nUNION ALL\n")}
-        ) 
+const averageOf = (table: string, sums: string) =>
+    table === WIND_COMBINED
+        ? `
+        SELECT stationId, SUM(sum) / SUM(count) AS speed,
+               SUM(u_sum) / SUM(count) AS u, SUM(v_sum) / SUM(count) AS v
+        FROM (${sums})
+        GROUP BY stationId
+        ORDER BY stationId;
+    `
+        : `
+        SELECT stationId, SUM(sum) / SUM(count) AS value, SUM(sum) AS total
+        FROM (${sums})
         GROUP BY stationId
         ORDER BY stationId;
     `;
-};
-
-// export const getHourlyAvgIntervalQuery = (table: string, interval: number) => {
-//     return `SELECT
-//             date,
-//             strftime('%Y-%m-%d %H:00:00', timestamp, '-' || (strftime('%H', timestamp) % ${interval}) || ' hours') AS interval_start,
-//             station_id,
-//             AVG(value) AS avg_value
-//         FROM ${table}
-//         WHERE timestamp BETWEEN ? AND ?
-//         GROUP BY interval_start, station_id
-//         ORDER BY interval_start, station_id;
-//     `;
-// };
 
-// export const getDailyAvgIntervalQuery = (tableName: string) => {
-//     return `SELECT
-//         strftime('%Y-%m-%d', timestamp) || ' ' || "01:00" AS day_start,
-//         station_id,
-//         AVG(value) AS avg_value
-//     FROM ${tableName}
-//     WHERE timestamp BETWEEN "2021-01-01" AND "2021-12-31"
-//     AND strftime('%H:%M', timestamp) = "01:00"
-//     GROUP BY day_start, station_id
-//     ORDER BY day_start, station_id;
-//     `;
-// };
-
-// export const getMonthlyAvgIntervalQuery = (tableName: string) => {
-//     const query = `SELECT
-//         strftime('%Y-%m', timestamp) || '-' || "01" || ' ' || "01:00" AS month_start,
-//         station_id,
-//         AVG(value) AS avg_value
-//     FROM ${tableName}
-//     WHERE timestamp BETWEEN "2021-01-01" AND "2021-12-31"
-//     AND strftime('%d', timestamp) = "01"
-//     AND strftime('%H:%M', timestamp) = "01:00"
-//     GROUP BY month_start, station_id
-//     ORDER BY month_start, station_id;
-//     `;
-//     return query;
-// };
-
-// export const getMultiDbHourlyAvgQuery = (
-//     years: number[],
-//     table: string,
-//     interval: number
-// ) => {
-//     const queries = years.flatMap(
-//         (year) =>
-//             `SELECT
-//             '${year}' AS db_year,
-//             '${table}' AS table_name,
-//             date,
-//             strftime('%Y-%m-%d %H:00:00', timestamp, '-' || (strftime('%H', timestamp) % ${interval}) || ' hours') AS interval_start,
-//             station_id,
-//             AVG(value) AS avg_value
-//         FROM weather_${year}.${table}
-//         WHERE timestamp BETWEEN ? AND ?
-//         GROUP BY interval_start, station_id
-//     `
-//     );
-//     return (
-//         queries.join("\nUNION ALL\n") + "\nORDER BY interval_start, station_id;"
-//     );
-// };
-
-// export const getMultiDbDailyAvgQuery = (
-//     years: number[],
-//     table: string,
-//     hour: string,
-//     minute: string
-// ) => {
-//     const queries = years.flatMap(
-//         (year) =>
-//             `SELECT
-//             '${year}' AS db_year,
-//             '${table}' AS table_name,
-//             strftime('%Y-%m-%d', timestamp) || ' ${hour}:${minute}:00' AS day_start,
-//             station_id,
-//             AVG(value) AS avg_value
-//         FROM weather_${year}.${table}
-//         WHERE timestamp BETWEEN ? AND ?
-//         AND strftime('%H:%M', timestamp) = '${hour}:${minute}'
-//         GROUP BY day_start, station_id
-//     `
-//     );
-//     return queries.join("\nUNION ALL\n") + "\nORDER BY day_start, station_id;";
-// };
+export const getAvgIntervalQuery = (table: string) => {
+    console.log("run avg");
+    return averageOf(table, sumsPart(table)(""));
+};
 
-// export const getMultiDbMonthlyAvgQuery = (
-//     years: number[],
-//     table: string,
-//     day: string,
-//     hour: string,
-//     minute: string
-// ) => {
-//     const queries = years.flatMap(
-//         (year) =>
-//             `SELECT
-//             '${year}' AS db_year,
-//             '${table}' AS table_name,
-//             strftime('%Y-%m', timestamp) || '-${day} ${hour}:${minute}:00' AS month_start,
-//             station_id,
-//             AVG(value) AS avg_value
-//         FROM weather_${year}.${table}
-//         WHERE timestamp BETWEEN ? AND ?
-//         AND strftime('%d', timestamp) = '${day}'
-//         AND strftime('%H:%M', timestamp) = '${hour}:${minute}'
-//         GROUP BY month_start, station_id
-//     `
-//     );
-//     return (
-//         queries.join("\nUNION ALL\n") + "\nORDER BY month_start, station_id;"
-//     );
-// };
+export const getMultiDbAvgQuery = (years: number[], table: string) =>
+    averageOf(table, years.map((year) => sumsPart(table)(`weather_${year}.`)).join("\nUNION ALL\n"));
@@ -0,0 +1,81 @@
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+from weather_data_to_sqlite import format_timestamp, join_wind_readings
+
+# Checks join_wind_readings against the old nested scan on a synthetic full day of
+# per-minute wind readings, then times both.
+#   python benchmark_wind_join.py
+STATIONS = [f"S{i}" for i in range(100, 120)]
+MINUTES_PER_DAY = 1440
+
+
+def make_day(date="2024-01-01", missing_rate=0.05, seed=0):
+    """Build API-shaped speed and direction readings with a few gaps and nulls on each side."""
+    rng = random.Random(seed)
+    start = datetime.fromisoformat(date)
+    speed_readings, direction_readings = [], []
+    for minute in range(MINUTES_PER_DAY):
+        timestamp = (start + timedelta(minutes=minute)).strftime("%Y-%m-%dT%H:%M:%S+08:00")
+        speed_data, direction_data = [], []
+        for station_id in STATIONS:
+            if rng.random() > missing_rate:
+                speed_data.append({"stationId": station_id, "value": round(rng.uniform(0, 15), 1)})
+            if rng.random() > missing_rate:
+                value = None if rng.random() < missing_rate else rng.randrange(0, 360)
+                direction_data.append({"stationId": station_id, "value": value})
+        speed_readings.append({"timestamp": timestamp, "data": speed_data})
+        direction_readings.append({"timestamp": timestamp, "data": direction_data})
+    return speed_readings, direction_readings
+
+
+def nested_scan_join(wind_speed_readings, wind_direction_readings):
+    """The previous O(T^2 * S) merge, with the timestamp formats made comparable."""
+    rows = []
+    for reading in wind_speed_readings:
+        timestamp = format_timestamp(reading["timestamp"])
+        for entry in reading["data"]:
+            station_id = entry["stationId"]
+            speed = entry["value"]
+            direction_entry = next((d for d in wind_direction_readings if format_timestamp(d["timestamp"]) == timestamp), None)
+            direction = next((d["value"] for d in direction_entry["data"] if d["stationId"] == station_id), None) if direction_entry else None
+
+            if speed is not None and direction is not None:
+                new_direction = (direction + 180) % 360
+                radians = (new_direction * math.pi) / 180
+                rows.append((timestamp, station_id, speed, new_direction, speed * math.sin(radians), speed * math.cos(radians)))
+    return rows
+
+
+def expected_row_count(wind_speed_readings, wind_direction_readings):
+    """Count (timestamp, stationId) pairs with a value on both sides."""
+    def keys(readings):
+        return {(reading["timestamp"], entry["stationId"])
+                for reading in readings for entry in reading["data"] if entry["value"] is not None}
+    return len(keys(wind_speed_readings) & keys(wind_direction_readings))
+
+
+if __name__ == "__main__":
+    speed_readings, direction_readings = make_day()
+    points = sum(len(reading["data"]) for reading in speed_readings)
+
+    started = time.perf_counter()
+    rows = join_wind_readings(speed_readings, direction_readings)
+    join_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    reference = nested_scan_join(speed_readings, direction_readings)
+    scan_seconds = time.perf_counter() - started
+
+    expected = expected_row_count(speed_readings, direction_readings)
+    assert len(rows) == expected, f"joined {len(rows)} rows, expected {expected}"
+    assert len(reference) == expected, f"nested scan joined {len(reference)} rows, expected {expected}"
+    for row, reference_row in zip(rows, reference):
+        assert row[:2] == reference_row[:2]
+        assert all(math.isclose(a, b, abs_tol=1e-9) for a, b in zip(row[2:], reference_row[2:]))
+
+    print(f"{points} speed points, {len(rows)} joined rows (expected {expected})")
+    print(f"Hash join:   {join_seconds * 1000:.1f} ms")
+    print(f"Nested scan: {scan_seconds * 1000:.1f} ms ({scan_seconds / join_seconds:.0f}x slower)")
@@ -0,0 +1,142 @@
+import argparse
+import glob
+import os
+import sqlite3
+import time
+
+from weather_data_to_sqlite import (
+    SG_UTC_OFFSET_SECONDS,
+    api_urls,
+    day_bounds,
+    ensure_rollup_tables,
+    migrate_parameter_table,
+    table_exists,
+)
+
+# Migrate weather_{year}.db files in place to the compact parameter schema, build their
+# rollup tables and time the dashboard's range queries before and after.
+#   python migrate_weather_schema.py                 -> every weather_*.db in this folder
+#   python migrate_weather_schema.py weather_2021.db --no-benchmark
+BENCHMARK_RUNS = 5
+
+
+def time_query(conn, sql, params):
+    """Best of BENCHMARK_RUNS wall-clock timings in milliseconds, plus the row count."""
+    timings = []
+    for _ in range(BENCHMARK_RUNS):
+        started = time.perf_counter()
+        rows = conn.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings), len(rows)
+
+
+def benchmark_queries(conn, param, migrated):
+    """
+    Run a one-station week range and an all-station day range against either schema, plus the
+    dashboard's 3-hourly snapshot and per-station average over a week as actual_data_queries.ts
+    and average_data_queries.ts issue them (legacy text filters before; epoch filters and the
+    rollup tables after).
+    """
+    day, station_id = conn.execute(f"SELECT date, stationId FROM {param} LIMIT 1").fetchone()
+    week_end = conn.execute("SELECT date(?, '+6 days')", (day,)).fetchone()[0]
+    start_ts, _ = day_bounds(day)
+    _, week_end_ts = day_bounds(week_end)
+
+    if migrated:
+        code = conn.execute("SELECT code FROM station_codes WHERE stationId = ?", (station_id,)).fetchone()[0]
+        week_rows = f"""
+            SELECT date(d.ts + {SG_UTC_OFFSET_SECONDS}, 'unixepoch') AS date,
+                   datetime(d.ts + {SG_UTC_OFFSET_SECONDS}, 'unixepoch') AS timestamp,
+                   s.stationId AS stationId, d.value AS value, d.ts AS ts
+            FROM {param}_data d JOIN station_codes s ON s.code = d.station
+            WHERE d.ts BETWEEN :start AND :end
+        """
+        week = {"start": start_ts, "end": week_end_ts - 60}  # The dashboard sends HH:mm bounds, inclusive
+        queries = {
+            "station week": (f"SELECT ts, value FROM {param}_data WHERE station = ? AND ts >= ? AND ts < ?",
+                             (code, start_ts, week_end_ts)),
+            "all stations day": (f"SELECT ts, station, value FROM {param}_data WHERE ts >= ? AND ts < ?",
+                                 (start_ts, start_ts + 86400)),
+            "dashboard 3h snapshot": (f"""
+                SELECT strftime('%Y-%m-%d %H:%M:00', r.ts + {SG_UTC_OFFSET_SECONDS}, 'unixepoch') AS hour_start, r.*
+                FROM ({week_rows}) r
+                WHERE (((r.ts + {SG_UTC_OFFSET_SECONDS}) / 3600 % 24) - 0) % 3 = 0 AND r.ts / 60 % 60 = 0
+                ORDER BY hour_start, stationId
+            """, week),
+            # A day-aligned week is tiled with whole days (and a Monday-to-Sunday week with one weekly row)
+            "dashboard week average": (f"""
+                SELECT stationId, SUM(sum) / SUM(count) AS value, SUM(sum) AS total
+                FROM {param}_rollup_daily
+                WHERE date >= ? AND date <= ?
+                GROUP BY stationId ORDER BY stationId
+            """, (day, week_end)),
+        }
+    else:
+        week = (f"{day} 00:00", f"{week_end} 23:59")
+        queries = {
+            "station week": (f"SELECT timestamp, value FROM {param} WHERE stationId = ? AND timestamp BETWEEN ? AND ?",
+                             (station_id, f"{day} 00:00:00", f"{week_end} 23:59:59")),
+            "all stations day": (f"SELECT timestamp, stationId, value FROM {param} WHERE timestamp BETWEEN ? AND ?",
+                                 (f"{day} 00:00:00", f"{day} 23:59:59")),
+            "dashboard 3h snapshot": (f"""
+                SELECT strftime('%Y-%m-%d %H:%M:00', timestamp) AS hour_start, *
+                FROM {param}
+                WHERE timestamp BETWEEN ? AND ?
+                AND ((CAST(strftime('%H', timestamp) AS INTEGER) - 0) % 3) = 0
+                AND strftime('%M', timestamp) = '00'
+                ORDER BY hour_start, stationId
+            """, week),
+            "dashboard week average": (f"""
+                SELECT stationId, AVG(value) AS value FROM {param}
+                WHERE timestamp BETWEEN ? AND ?
+                GROUP BY stationId ORDER BY stationId
+            """, week),
+        }
+    return {name: time_query(conn, sql, params) for name, (sql, params) in queries.items()}
+
+
+def migrate_database(db_path, benchmark=True):
+    conn = sqlite3.connect(db_path)
+    size_before = os.path.getsize(db_path)
+    before = {}
+    migrated = {}
+
+    for param in api_urls.keys():
+        if not table_exists(conn, param):
+            continue
+        if benchmark and conn.execute(f"SELECT 1 FROM {param} LIMIT 1").fetchone():
+            before[param] = benchmark_queries(conn, param, migrated=False)
+        started = time.perf_counter()
+        with conn:
+            rows = migrate_parameter_table(conn, param)
+            # Days stored before the ingester kept rollups get them here
+            ensure_rollup_tables(conn, param)
+            migrated[param] = (rows, time.perf_counter() - started)
+
+    if not migrated:
+        print(f"{db_path}: nothing to migrate.")
+        conn.close()
+        return
+
+    # Reclaim the pages of the dropped TEXT tables
+    conn.execute("VACUUM")
+    print(f"{db_path}: {size_before / 1e6:.1f} MB -> {os.path.getsize(db_path) / 1e6:.1f} MB")
+    for param, (rows, seconds) in migrated.items():
+        print(f"  {param}: {rows} rows migrated in {seconds:.1f}s")
+        if param in before:
+            after = benchmark_queries(conn, param, migrated=True)
+            for name, (ms_before, rows_before) in before[param].items():
+                ms_after, rows_after = after[name]
+                print(f"    {name}: {ms_before:.2f} ms -> {ms_after:.2f} ms "
+                      f"({rows_before} -> {rows_after} rows)")
+    conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate weather databases to the compact schema.")
+    parser.add_argument("databases", nargs="*", help="weather_{year}.db files to migrate")
+    parser.add_argument("--no-benchmark", action="store_true", help="Skip the before/after query timings")
+    args = parser.parse_args()
+
+    for db_path in args.databases or sorted(glob.glob("weather_*.db")):
+        migrate_database(db_path, benchmark=not args.no_benchmark)
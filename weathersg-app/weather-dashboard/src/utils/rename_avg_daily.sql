@@ -1,8 +0,0 @@
--- Rename the table for 1-hour interval
--- ALTER TABLE rainfall_avg_1d RENAME TO rainfall_avg_1day;
-
--- Rename the table for 2-hour interval
--- ALTER TABLE rainfall_avg_7d RENAME TO rainfall_avg_7day;
-
-DROP TABLE rainfall_avg_1d;
-DROP TABLE rainfall_avg_7d;
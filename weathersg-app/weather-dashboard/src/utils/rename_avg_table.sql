@@ -1,17 +0,0 @@
--- Rename the table for 1-hour interval
-ALTER TABLE rainfall_avg_1hour RENAME TO rainfall_avg_1h;
-
--- Rename the table for 2-hour interval
-ALTER TABLE rainfall_avg_2hour RENAME TO rainfall_avg_2h;
-
--- Rename the table for 3-hour interval
-ALTER TABLE rainfall_avg_3hour RENAME TO rainfall_avg_3h;
-
--- Rename the table for 4-hour interval
-ALTER TABLE rainfall_avg_4hour RENAME TO rainfall_avg_4h;
-
--- Rename the table for 6-hour interval
-ALTER TABLE rainfall_avg_6hour RENAME TO rainfall_avg_6h;
-
--- Rename the table for 12-hour interval
-ALTER TABLE rainfall_avg_12hour RENAME TO rainfall_avg_12h;
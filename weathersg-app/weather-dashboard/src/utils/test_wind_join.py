@@ -0,0 +1,67 @@
+import importlib
+import math
+import os
+import sqlite3
+
+import pytest
+
+# Checks the wind hash join on a small day stored in an in-memory database.
+#   python -m pytest test_wind_join.py
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATE = "2021-01-01"
+
+
+@pytest.fixture
+def wind(monkeypatch):
+    # The module reads wind_stations.json from the working directory on import
+    monkeypatch.chdir(HERE)
+    monkeypatch.syspath_prepend(HERE)
+    return importlib.import_module("weather_data_to_sqlite")
+
+
+def reading(time, values):
+    return {"timestamp": f"{DATE}T{time}+08:00",
+            "data": [{"stationId": station_id, "value": value} for station_id, value in values.items()]}
+
+
+@pytest.fixture
+def conn(wind):
+    conn = sqlite3.connect(":memory:")
+    wind.ensure_checkpoint_table(conn)
+    wind.store_weather_data_sqlite(conn, "wind_speed", DATE, [
+        reading("00:00:00", {"S1": 2.0, "S2": 4.0, "S3": None}),
+        reading("00:01:00", {"S1": 3.0, "S2": 5.0}),
+    ])
+    wind.store_weather_data_sqlite(conn, "wind_direction", DATE, [
+        # S2 has no direction at 00:00, S3 has a speed of None and S1 lacks a speed at 00:01
+        reading("00:00:00", {"S1": 0.0, "S3": 90.0}),
+        reading("00:01:00", {"S1": None, "S2": 270.0}),
+    ])
+    yield conn
+    conn.close()
+
+
+def test_join_wind_readings(wind, conn):
+    rows = wind.join_wind_readings(wind.load_readings(conn, "wind_speed", DATE),
+                                   wind.load_readings(conn, "wind_direction", DATE))
+
+    assert len(rows) == 2
+    (timestamp, station_id, speed, direction, u, v), second = rows
+    assert (timestamp, station_id, speed, direction) == ("2021-01-01 00:00:00", "S1", 2.0, 180.0)
+    assert u == pytest.approx(0.0, abs=1e-12)
+    assert v == pytest.approx(-2.0)
+
+    timestamp, station_id, speed, direction, u, v = second
+    assert (timestamp, station_id, speed, direction) == ("2021-01-01 00:01:00", "S2", 5.0, 90.0)
+    assert u == pytest.approx(5.0)
+    assert v == pytest.approx(0.0, abs=1e-12)
+
+
+def test_store_wind_combined_day(wind, conn):
+    assert wind.store_wind_combined_day(conn, DATE) == 2
+
+    rows = conn.execute("SELECT timestamp, stationId, speed, direction, u, v FROM wind_combined "
+                        "ORDER BY timestamp").fetchall()
+    assert [row[:4] for row in rows] == [("2021-01-01 00:00:00", "S1", 2.0, 180.0),
+                                         ("2021-01-01 00:01:00", "S2", 5.0, 90.0)]
+    assert all(math.isclose(math.hypot(u, v), speed) for _, _, speed, _, u, v in rows)
@@ -1,14 +1,23 @@
 import requests
-import math
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
 import pandas as pd
 import json
+import queue
 import sqlite3
-from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 
 # Number of threads for parallel API calls
 MAX_THREADS = 10
 
+# Retry policy for the shared HTTP session
+MAX_RETRIES = 5
+RETRY_BACKOFF_FACTOR = 0.5
+
 # API Endpoints
 api_urls = {
     "wind_speed": "https://api-open.data.gov.sg/v2/real-time/api/wind-speed?date=",
@@ -18,102 +27,508 @@ api_urls = {
     "air_temperature": "https://api-open.data.gov.sg/v2/real-time/api/air-temperature?date="
 }
 
+# Single SQLite writer: queued pages it may hold before fetch threads block, and pages per transaction
+WRITE_QUEUE_SIZE = 100
+WRITE_BATCH_SIZE = 200
+SQLITE_CACHE_SIZE_KB = 65536
+
+# Parameter rows live in WITHOUT ROWID {param}_data tables keyed by integer station code and UTC
+# epoch seconds; a {param} view keeps the original (date, timestamp, stationId, value) columns
+SG_TIMEZONE = timezone(timedelta(hours=8))
+SG_UTC_OFFSET_SECONDS = 8 * 3600
+STATION_CODES_TABLE = "station_codes"
+
+# Rollup tables kept per parameter at ingest: {param}_rollup_hourly / _daily / _weekly
+ROLLUP_PERIODS = ("hourly", "daily", "weekly")
+
+# Completed (param, date) pairs and the page to resume from live in every year's database
+CHECKPOINT_TABLE = "backfill_checkpoint"
+WIND_COMBINED = "wind_combined"
+
 # Load station mappings from JSON
 with open("wind_stations.json", "r") as f:
     station_mappings = {station["id"]: station for station in json.load(f)}
 
+http_stats = {"requests": 0, "retries": 0}
+
+def create_http_session(max_connections_per_host=MAX_THREADS):
+    """Create a keep-alive session with gzip, retries with backoff and a per-host connection limit."""
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=max_connections_per_host, pool_maxsize=max_connections_per_host,
+                          max_retries=retry, pool_block=True)
+    session = requests.Session()
+    session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+    session.mount("https://", adapter)
+    return session
+
+# Shared by every worker thread so paginated calls reuse open connections
+http_session = create_http_session()
+
+def http_get(url):
+    """GET a URL through the shared session and count retries."""
+    response = http_session.get(url)
+    http_stats["requests"] += 1
+    retries = getattr(response.raw, "retries", None)
+    if retries is not None:
+        http_stats["retries"] += len(retries.history)
+    return response
+
+def get_http_client_stats():
+    """Return request, retry and connection-reuse counters for the shared session."""
+    pools = http_session.get_adapter("https://").poolmanager.pools
+    connections_opened = sum(pools[key].num_connections for key in pools.keys())
+    pool_requests = sum(pools[key].num_requests for key in pools.keys())
+    return {**http_stats, "connections_opened": connections_opened,
+            "connections_reused": max(pool_requests - connections_opened, 0)}
+
 def get_db_connection(year):
     """Return a SQLite connection for the given year."""
-    return sqlite3.connect(f"weather_{year}.db")
+    return sqlite3.connect(f"weather_{year}.db", timeout=30)
+
+def configure_write_connection(conn):
+    """Tune a connection for bulk ingestion: WAL journal, NORMAL sync and a larger page cache."""
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    return conn
+
+class SQLiteWriter:
+    """
+    Owns one persistent connection per year database and applies every write on one thread.
+
+    Fetch threads call submit(); the bounded queue blocks them when the writer falls behind.
+    Writes are grouped WRITE_BATCH_SIZE at a time into one transaction, and pending writes
+    are committed whenever the queue runs dry.
+
+    Each write runs in its own savepoint, so a failed write leaves nothing behind, and its
+    future carries the error back to the fetcher. Once a write of a day fails, the day's
+    later writes are skipped, so no checkpoint is committed past the page that failed.
+    """
+
+    def __init__(self, max_queue=WRITE_QUEUE_SIZE, batch_size=WRITE_BATCH_SIZE):
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self.connections = {}
+        self.rows_written = 0
+        self.transactions = 0
+        self.elapsed = 0.0  # Seconds spent writing and committing, idle waits excluded
+        self.failed_days = set()
+        self.thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def submit(self, year, write, *args, day=None):
+        """
+        Queue write(conn, *args) against the year's database; write returns rows stored.
+
+        Returns a Future resolved with the rows stored once the write is applied, or with its
+        error. Writes sharing a day key (e.g. (param, date)) are skipped after one of them fails.
+        """
+        future = Future()
+        self.queue.put((str(year), write, args, day, future))
+        return future
+
+    def close(self):
+        """Flush the queue, commit, close the connections and return the ingest stats."""
+        self.queue.put(None)
+        self.thread.join()
+        return self.stats()
+
+    def stats(self):
+        rows_per_sec = self.rows_written / self.elapsed if self.elapsed else 0.0
+        return {"rows": self.rows_written, "transactions": self.transactions,
+                "seconds": round(self.elapsed, 2), "rows_per_sec": round(rows_per_sec)}
+
+    def _connection(self, year):
+        if year not in self.connections:
+            self.connections[year] = configure_write_connection(get_db_connection(year))
+        return self.connections[year]
+
+    def _commit(self):
+        started = time.perf_counter()
+        for conn in self.connections.values():
+            if conn.in_transaction:
+                conn.commit()
+        self.transactions += 1
+        self.elapsed += time.perf_counter() - started
+
+    def _apply(self, conn, write, args):
+        # Open the batch transaction first so the savepoint nests in it instead of committing on release
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        conn.execute("SAVEPOINT write")
+        try:
+            rows = write(conn, *args) or 0
+        except Exception:
+            conn.execute("ROLLBACK TO write")
+            conn.execute("RELEASE write")
+            raise
+        conn.execute("RELEASE write")
+        return rows
+
+    def _run(self):
+        pending = 0
+        while True:
+            try:
+                # Commit as soon as the fetchers go quiet instead of holding a partial batch
+                item = self.queue.get(timeout=1) if pending else self.queue.get()
+            except queue.Empty:
+                self._commit()
+                pending = 0
+                continue
+            if item is None:
+                break
 
-def table_exists(conn, param):
-    """Check if a table exists in SQLite."""
+            year, write, args, day, future = item
+            started = time.perf_counter()
+            if day is not None and day in self.failed_days:
+                future.set_exception(RuntimeError(f"Skipped {write.__name__}{args[:2]} after an earlier write of the day failed"))
+            else:
+                try:
+                    rows = self._apply(self._connection(year), write, args)
+                    self.rows_written += rows
+                    future.set_result(rows)
+                except Exception as e:
+                    print(f"Error writing {write.__name__}{args[:2]}: {e}")
+                    if day is not None:
+                        self.failed_days.add(day)
+                    future.set_exception(e)
+            self.elapsed += time.perf_counter() - started
+            pending += 1
+            if pending >= self.batch_size:
+                self._commit()
+                pending = 0
+
+        if pending:
+            self._commit()
+        for conn in self.connections.values():
+            conn.close()
+
+def table_exists(conn, param, types=("table",)):
+    """Check if a table (or any of the given schema object types) exists in SQLite."""
     cursor = conn.cursor()
-    cursor.execute("SELECT count(name) FROM sqlite_master WHERE type='table' AND name=?", (param,))
+    cursor.execute(f"SELECT count(name) FROM sqlite_master WHERE type IN ({', '.join('?' * len(types))}) AND name=?",
+                   (*types, param))
     return cursor.fetchone()[0] > 0
 
-def data_exists(year, param, date):
-    """Check if data exists for a given parameter and date in the specified year's database."""
-    conn = get_db_connection(year)
+def day_bounds(date):
+    """UTC epoch seconds of local midnight at the start and end of a 'YYYY-MM-DD' date."""
+    start = int(datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=SG_TIMEZONE).timestamp())
+    return start, start + 86400
+
+def to_epoch(timestamp):
+    """Convert an API 'YYYY-MM-DDTHH:MM:SS+08:00' timestamp to UTC epoch seconds."""
+    return int(datetime.fromisoformat(timestamp).timestamp())
+
+def create_parameter_schema(conn, param):
+    """Create the compact storage table, its covering indexes and the legacy-shaped view."""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {STATION_CODES_TABLE} (
+            code INTEGER PRIMARY KEY,
+            stationId TEXT UNIQUE
+        )
+    """)
+    # The primary key doubles as the covering (station, ts) index
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {param}_data (
+            ts INTEGER, -- UTC epoch seconds
+            station INTEGER, -- {STATION_CODES_TABLE}.code
+            value REAL,
+            PRIMARY KEY (station, ts)
+        ) WITHOUT ROWID
+    """)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS {param}_data_ts ON {param}_data (ts, station, value)")
+    conn.execute(f"""
+        CREATE VIEW IF NOT EXISTS {param} AS
+        SELECT date(d.ts + {SG_UTC_OFFSET_SECONDS}, 'unixepoch') AS date,
+               datetime(d.ts + {SG_UTC_OFFSET_SECONDS}, 'unixepoch') AS timestamp,
+               s.stationId AS stationId,
+               d.value AS value
+        FROM {param}_data d JOIN {STATION_CODES_TABLE} s ON s.code = d.station
+    """)
+
+def migrate_parameter_table(conn, param):
+    """
+    Convert a legacy {param} table (TEXT date/timestamp/stationId) to the compact schema in place.
+
+    Returns the number of rows migrated, or None if there was no legacy table.
+    """
     if not table_exists(conn, param):
-        conn.close()
-        return False  # If table doesn't exist, assume data does not exist
+        return None
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {STATION_CODES_TABLE} (
+            code INTEGER PRIMARY KEY,
+            stationId TEXT UNIQUE
+        )
+    """)
+    conn.execute(f"INSERT OR IGNORE INTO {STATION_CODES_TABLE} (stationId) SELECT DISTINCT stationId FROM {param}")
+    conn.execute(f"ALTER TABLE {param} RENAME TO {param}_legacy")
+    create_parameter_schema(conn, param)
+    # Legacy timestamps are local wall-clock text, shift them back to UTC
+    cursor = conn.execute(f"""
+        INSERT OR IGNORE INTO {param}_data (ts, station, value)
+        SELECT CAST(strftime('%s', l.timestamp) AS INTEGER) - {SG_UTC_OFFSET_SECONDS}, s.code, l.value
+        FROM {param}_legacy l JOIN {STATION_CODES_TABLE} s ON s.stationId = l.stationId
+    """)
+    conn.execute(f"DROP TABLE {param}_legacy")
+    return cursor.rowcount
+
+def station_codes(conn, station_ids):
+    """Return {stationId: code}, assigning codes to ids not seen before."""
+    conn.executemany(f"INSERT OR IGNORE INTO {STATION_CODES_TABLE} (stationId) VALUES (?)",
+                     [(station_id,) for station_id in station_ids])
+    return dict(conn.execute(f"SELECT stationId, code FROM {STATION_CODES_TABLE}").fetchall())
+
+def ensure_checkpoint_table(conn):
+    """Create the backfill checkpoint table, marking days already in older databases as complete."""
+    if table_exists(conn, CHECKPOINT_TABLE):
+        return
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+            param TEXT,
+            date TEXT,
+            page_token TEXT, -- Token of the next page to fetch, NULL once the day is complete
+            complete INTEGER,
+            PRIMARY KEY (param, date)
+        )
+    """)
+    for param in list(api_urls.keys()) + [WIND_COMBINED]:
+        if table_exists(conn, param, types=("table", "view")):
+            conn.execute(f"INSERT OR IGNORE INTO {CHECKPOINT_TABLE} SELECT DISTINCT ?, date, NULL, 1 FROM {param}",
+                         (param,))
+    conn.commit()
 
-    cursor = conn.cursor()
-    cursor.execute(f"SELECT COUNT(*) FROM {param} WHERE date = ?", (date,))
-    result = cursor.fetchone()
+def record_checkpoint(conn, param, date, page_token):
+    """Record the next page to fetch for (param, date); a None token marks the day complete."""
+    conn.execute(f"INSERT OR REPLACE INTO {CHECKPOINT_TABLE} VALUES (?, ?, ?, ?)",
+                 (param, date, page_token, 0 if page_token else 1))
+
+def load_checkpoints(year):
+    """Return {(param, date): (page_token, complete)} for a year in one query."""
+    conn = get_db_connection(year)
+    ensure_checkpoint_table(conn)
+    rows = conn.execute(f"SELECT param, date, page_token, complete FROM {CHECKPOINT_TABLE}").fetchall()
     conn.close()
-    return result[0] > 0 if result else False
+    return {(param, date): (page_token, bool(complete)) for param, date, page_token, complete in rows}
+
+def load_readings(conn, param, date):
+    """Read a stored day back in the API readings shape (timestamps already formatted)."""
+    rows = conn.execute(f"""
+        SELECT datetime(d.ts + {SG_UTC_OFFSET_SECONDS}, 'unixepoch'), s.stationId, d.value
+        FROM {param}_data d JOIN {STATION_CODES_TABLE} s ON s.code = d.station
+        WHERE d.ts >= ? AND d.ts < ?
+        ORDER BY d.ts
+    """, day_bounds(date)).fetchall()
+    readings = []
+    for timestamp, station_id, value in rows:
+        if not readings or readings[-1]["timestamp"] != timestamp:
+            readings.append({"timestamp": timestamp, "data": []})
+        readings[-1]["data"].append({"stationId": station_id, "value": value})
+    return readings
 
 def format_timestamp(timestamp):
-    """Convert timestamp to 'YYYY-MM-DD HH:MM:SS' format."""
-    return datetime.strptime(timestamp[:19], "%Y-%m-%dT%H:%M:%S").strftime("%Y-%m-%d %H:%M:%S")
+    """Convert timestamp to 'YYYY-MM-DD HH:MM:SS' format by fixed-offset slicing (API timestamps are fixed-width ISO-8601)."""
+    return f"{timestamp[:10]} {timestamp[11:19]}"
 
-def fetch_data(param, date):
-    """Fetch API data for a given parameter and date, handling pagination."""
-    year = date.split("-")[0]  # Extract year
-    if data_exists(year, param, date):
-        return param, date, None  # Skip if data exists
+def fetch_data(writer, param, date, page_token=None):
+    """
+    Fetch API data for a given parameter and date page by page, resuming from page_token, and queue each page.
 
+    The day is reported complete only once its last page carried data and every page was written.
+    """
+    year = date.split("-")[0]  # Extract year
     base_url = api_urls[param] + date
-    all_readings = []
-    pagination_token = None
+    pagination_token = page_token
+    day = (param, date)
 
     while True:
         url = base_url if not pagination_token else f"{base_url}&paginationToken={pagination_token}"
         try:
             print(f"Fetching {param} data for {date} with paginationToken: {pagination_token}")
-            response = requests.get(url)
+            response = http_get(url)
             if response.status_code != 200:
                 print(f"Failed to fetch {param} for {date}: {response.status_code}")
-                return param, date, None
-            
-            data = response.json()
-            readings = data.get("data", {}).get("readings", [])
-            all_readings.extend(readings)
-
-            # Check for pagination token
-            pagination_token = data.get("data", {}).get("paginationToken")
+                return param, date, False
+
+            data = response.json().get("data")
+            if data is None and pagination_token:
+                # The day stopped part-way: keep the checkpoint at this page so a later run retries it
+                print(f"Incomplete {param} for {date}: no data at paginationToken {pagination_token}")
+                return param, date, False
+            data = data or {}
+            readings = data.get("readings", [])
+
+            # Persist the page and the token of the next one together, so a restart resumes here
+            pagination_token = data.get("paginationToken")
+            written = writer.submit(year, store_weather_data_sqlite, param, date, readings, pagination_token, day=day)
             if not pagination_token:
-                break
+                # The last page is written after every earlier one, and skipped if any of them failed
+                written.result()
+                return param, date, True
 
         except Exception as e:
             print(f"Error fetching {param} for {date}: {e}")
-            break
+            return param, date, False
+
+def store_weather_data_sqlite(conn, param, date, readings, next_page_token=None):
+    """Store one page of weather data and its checkpoint in the writer's current transaction."""
+    cursor = conn.cursor()
 
-    return param, date, all_readings
+    # Databases written before the compact schema are migrated on first write
+    if migrate_parameter_table(conn, param) is None:
+        create_parameter_schema(conn, param)
 
-def store_weather_data_sqlite(year, param, date, readings):
-    """Store weather data in separate SQLite tables per year."""
-    if not readings:
-        return
+    codes = station_codes(conn, {entry["stationId"] for reading in readings for entry in reading.get("data", [])})
+    data_list = [(ts, codes[entry["stationId"]], entry["value"])
+                 for reading in readings for ts in (to_epoch(reading["timestamp"]),)
+                 for entry in reading.get("data", [])]
 
-    conn = get_db_connection(year)
-    cursor = conn.cursor()
+    cursor.executemany(f"INSERT OR IGNORE INTO {param}_data VALUES (?, ?, ?)", data_list)
+    record_checkpoint(conn, param, date, next_page_token)
+    if not next_page_token:
+        update_rollups(conn, param, date)
+    return len(data_list)
 
-    cursor.execute(f"""
-        CREATE TABLE IF NOT EXISTS {param} (
+def ensure_rollup_tables(conn, param):
+    """Create the rollup tables of a parameter, filling them from rows stored before they existed."""
+    if table_exists(conn, f"{param}_rollup_weekly"):
+        return
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {param}_rollup_hourly (
             date TEXT,
-            timestamp TEXT, -- Stored in 'YYYY-MM-DD HH:MM:SS' format
+            hour TEXT, -- Start of the hour in 'YYYY-MM-DD HH:00:00' format
             stationId TEXT,
-            value REAL,
-            PRIMARY KEY (date, timestamp, stationId)
+            sum REAL,
+            count INTEGER,
+            min REAL,
+            max REAL,
+            PRIMARY KEY (date, hour, stationId)
         )
     """)
-
-    data_list = [(date, format_timestamp(reading["timestamp"]), entry["stationId"], entry["value"])  # Ensure timestamp format
-                 for reading in readings for entry in reading.get("data", [])]
-
-    cursor.executemany(f"INSERT OR IGNORE INTO {param} VALUES (?, ?, ?, ?)", data_list)
-    conn.commit()
-    conn.close()
-
-def store_wind_combined_data(year, date, wind_speed_readings, wind_direction_readings):
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {param}_rollup_daily (
+            date TEXT,
+            stationId TEXT,
+            sum REAL,
+            count INTEGER,
+            min REAL,
+            max REAL,
+            PRIMARY KEY (date, stationId)
+        )
+    """)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {param}_rollup_weekly (
+            week TEXT, -- Monday of the week in 'YYYY-MM-DD' format, the days stored in this database
+            stationId TEXT,
+            sum REAL,
+            count INTEGER,
+            min REAL,
+            max REAL,
+            PRIMARY KEY (week, stationId)
+        )
+    """)
+    dates = [row[0] for row in conn.execute(f"SELECT DISTINCT date FROM {param}")]
+    for date in dates:
+        rollup_day(conn, param, date)
+    for week in sorted({week_start(date) for date in dates}):
+        rollup_week(conn, param, week)
+
+def week_start(date):
+    """Monday of the week containing a 'YYYY-MM-DD' date."""
+    day = datetime.strptime(date, "%Y-%m-%d")
+    return (day - timedelta(days=day.weekday())).strftime("%Y-%m-%d")
+
+def rollup_day(conn, param, date):
+    """Recompute the hourly and daily rollups of one stored day."""
+    conn.execute(f"""
+        INSERT OR REPLACE INTO {param}_rollup_hourly
+        SELECT ?, datetime(d.ts / 3600 * 3600 + {SG_UTC_OFFSET_SECONDS}, 'unixepoch') AS hour, s.stationId,
+               SUM(d.value), COUNT(d.value), MIN(d.value), MAX(d.value)
+        FROM {param}_data d JOIN {STATION_CODES_TABLE} s ON s.code = d.station
+        WHERE d.ts >= ? AND d.ts < ?
+        GROUP BY hour, d.station
+    """, (date, *day_bounds(date)))
+    conn.execute(f"""
+        INSERT OR REPLACE INTO {param}_rollup_daily
+        SELECT date, stationId, SUM(sum), SUM(count), MIN(min), MAX(max)
+        FROM {param}_rollup_hourly
+        WHERE date = ?
+        GROUP BY stationId
+    """, (date,))
+
+def rollup_week(conn, param, week):
+    """
+    Recompute one week's rollup from the daily rollups of this database.
+
+    A week spanning new year keeps the days of each year in that year's database under the
+    same Monday key, so its two parts add up to the whole week; average_data_queries.ts sums
+    the rollups of every attached database before dividing.
+    """
+    conn.execute(f"""
+        INSERT OR REPLACE INTO {param}_rollup_weekly
+        SELECT ?, stationId, SUM(sum), SUM(count), MIN(min), MAX(max)
+        FROM {param}_rollup_daily
+        WHERE date BETWEEN ? AND date(?, '+6 days')
+        GROUP BY stationId
+    """, (week, week, week))
+
+def update_rollups(conn, param, date):
+    """Fold a completed day into the hourly, daily and weekly rollups of its parameter."""
+    ensure_rollup_tables(conn, param)
+    rollup_day(conn, param, date)
+    rollup_week(conn, param, week_start(date))
+
+def join_wind_readings(wind_speed_readings, wind_direction_readings):
+    """
+    Hash-join speed and direction readings on (timestamp, stationId) and compute U/V with NumPy.
+
+    Returns [(timestamp, stationId, speed, direction, u, v), ...] in speed reading order, where
+    direction is rotated 180 degrees (the direction the wind blows towards).
+    """
+    directions = {
+        (format_timestamp(reading["timestamp"]), entry["stationId"]): entry["value"]
+        for reading in wind_direction_readings for entry in reading["data"] if entry["value"] is not None
+    }
+
+    keys = []
+    speeds = []
+    raw_directions = []
+    for reading in wind_speed_readings:
+        timestamp = format_timestamp(reading["timestamp"])  # Both sides use the same timestamp format
+        for entry in reading["data"]:
+            direction = directions.get((timestamp, entry["stationId"]))
+            if entry["value"] is not None and direction is not None:
+                keys.append((timestamp, entry["stationId"]))
+                speeds.append(entry["value"])
+                raw_directions.append(direction)
+
+    speed = np.array(speeds, dtype=np.float64)
+    direction = (np.array(raw_directions, dtype=np.float64) + 180) % 360
+    radians = np.deg2rad(direction)
+    u = speed * np.sin(radians)
+    v = speed * np.cos(radians)
+
+    return [(timestamp, station_id, *values)
+            for (timestamp, station_id), values in zip(keys, zip(speed.tolist(), direction.tolist(), u.tolist(), v.tolist()))]
+
+def store_wind_combined_day(conn, date):
+    """Combine a stored day of wind speed and direction once both are complete."""
+    return store_wind_combined_data(conn, date, load_readings(conn, "wind_speed", date),
+                                    load_readings(conn, "wind_direction", date))
+
+def store_wind_combined_data(conn, date, wind_speed_readings, wind_direction_readings):
     """Store combined wind speed, direction, and computed U/V components in a new SQLite table."""
     if not wind_speed_readings or not wind_direction_readings:
-        return
+        return 0
 
-    conn = get_db_connection(year)
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -129,58 +544,59 @@ def store_wind_combined_data(year, date, wind_speed_readings, wind_direction_rea
         )
     """)
 
-    data_list = []
-    for reading in wind_speed_readings:
-        timestamp = format_timestamp(reading["timestamp"])  # Convert timestamp format
-        for entry in reading["data"]:
-            station_id = entry["stationId"]
-            speed = entry["value"]
-            direction_entry = next((d for d in wind_direction_readings if d["timestamp"] == timestamp), None)
-            direction = next((d["value"] for d in direction_entry["data"] if d["stationId"] == station_id), None) if direction_entry else None
-
-            if speed is not None and direction is not None:
-                new_direction = (direction + 180) % 360
-                radians = (new_direction * math.pi) / 180
-                u = speed * math.sin(radians)
-                v = speed * math.cos(radians)
-
-                data_list.append((date, timestamp, station_id, speed, new_direction, u, v))
+    data_list = [(date, *row) for row in join_wind_readings(wind_speed_readings, wind_direction_readings)]
 
     cursor.executemany("INSERT OR IGNORE INTO wind_combined VALUES (?, ?, ?, ?, ?, ?, ?)", data_list)
-    conn.commit()
-    conn.close()
+    record_checkpoint(conn, WIND_COMBINED, date, None)
+    return len(data_list)
 
 def fetch_and_store_data():
-    """Fetch and store weather data for the defined year range."""
+    """Fetch and store weather data for the defined year range, resuming from the checkpoints."""
     start_date = datetime(START_YEAR, 1, 1)
     end_date = datetime(END_YEAR, 12, 31)
+    checkpoints = {}
+    for year in range(START_YEAR, END_YEAR + 1):
+        checkpoints.update(load_checkpoints(year))
+    completed = {key for key, (_, complete) in checkpoints.items() if complete}
     tasks = []
-    results = {}
+    writer = SQLiteWriter().start()
 
     with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
         current_date = start_date
         while current_date <= end_date:
             formatted_date = current_date.strftime("%Y-%m-%d")
-            year = current_date.year
-            if all(data_exists(year, param, formatted_date) for param in api_urls.keys()):
+            missing = [param for param in api_urls.keys() if (param, formatted_date) not in completed]
+            if not missing:
                 print(f"Skipping {formatted_date}, data already exists.")
-            else:
-                for param in api_urls.keys():
-                    tasks.append(executor.submit(fetch_data, param, formatted_date))
+            for param in missing:
+                page_token = checkpoints.get((param, formatted_date), (None, False))[0]
+                tasks.append(executor.submit(fetch_data, writer, param, formatted_date, page_token))
             current_date += timedelta(days=1)
 
+        # Days interrupted after both wind parameters finished still need their combined rows
+        wind_dates = {date for param, date in completed if param == "wind_speed"}
+        pending_wind = [date for date in sorted(wind_dates)
+                        if ("wind_direction", date) in completed and (WIND_COMBINED, date) not in completed]
+
         for future in as_completed(tasks):
-            param, date, readings = future.result()
-            if readings:
-                year = date.split("-")[0]
-                store_weather_data_sqlite(year, param, date, readings)
-                results.setdefault(date, {})[param] = readings
-                store_wind_combined_data(year, date, results.get(date, {}).get("wind_speed"), results.get(date, {}).get("wind_direction"))
+            param, date, complete = future.result()
+            if complete:
+                completed.add((param, date))
+                if param in ("wind_speed", "wind_direction") and \
+                        ("wind_speed", date) in completed and ("wind_direction", date) in completed:
+                    pending_wind.append(date)
+
+        for date in pending_wind:
+            writer.submit(date.split("-")[0], store_wind_combined_day, date)
 
+    ingest_stats = writer.close()
     print("All weather data stored in SQLite.")
+    print(f"Ingest stats: {ingest_stats}")
+    print(f"HTTP client stats: {get_http_client_stats()}")
 
 MAX_THREADS = 10
 START_YEAR = 2021
 END_YEAR = 2021
 
-fetch_and_store_data()
+if __name__ == "__main__":
+    fetch_and_store_data()